@@ -12,6 +12,7 @@ from pydantic import ValidationError
 
 from app.auth.models import TokenPayload
 from app.config import settings
+from app.identity_map import IdentityMap, get_identity_map
 from app.user.models import User
 from app.user.service import UserService
 
@@ -25,7 +26,9 @@ optional_oauth = OAuth2PasswordBearer(
 
 
 async def _base_current_user(
-    aggregate: bool, token: str = Depends(reuseable_oauth)
+    aggregate: bool,
+    token: str = Depends(reuseable_oauth),
+    identity_map: Optional[IdentityMap] = None,
 ) -> User:
     """Base function for user authentication"""
     try:
@@ -47,10 +50,13 @@ async def _base_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await UserService.get_by_id(
-        id=token_data.sub,
-        aggregate=aggregate,
-    )
+    if identity_map and not aggregate:
+        user = await identity_map.get_user(token_data.sub)
+    else:
+        user = await UserService.get_by_id(
+            id=token_data.sub,
+            aggregate=aggregate,
+        )
 
     if not user:
         raise HTTPException(
@@ -61,8 +67,18 @@ async def _base_current_user(
     return user
 
 
-async def get_current_user(token: str = Depends(reuseable_oauth)) -> User:
+async def get_current_user(
+    token: str = Depends(reuseable_oauth),
+    identity_map: IdentityMap = Depends(get_identity_map),
+) -> User:
     """Standard user dependency"""
+    return await _base_current_user(
+        aggregate=False, token=token, identity_map=identity_map
+    )
+
+
+async def get_token_user(token: str) -> User:
+    """User of a token sent in the request body instead of the headers"""
     return await _base_current_user(aggregate=False, token=token)
 
 
@@ -73,6 +89,7 @@ async def get_current_user_aggregate(token: str = Depends(reuseable_oauth)) -> U
 
 async def get_current_user_optional(
     token: Optional[str] = Depends(optional_oauth),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ) -> Optional[User]:
     """Optional user dependency that does not raise errors on invalid/missing tokens"""
     if not token:
@@ -83,7 +100,7 @@ async def get_current_user_optional(
             token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-        user = await UserService.get_by_id(id=token_data.sub, aggregate=False)
+        user = await identity_map.get_user(token_data.sub)
         return user if user else None
     except (JWTError, ValidationError, HTTPException):
         return None
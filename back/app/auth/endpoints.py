@@ -2,7 +2,6 @@
 Module for handling authentication-related routes.
 """
 
-from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
@@ -10,19 +9,39 @@ from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
 from pydantic import ValidationError
 
-from app.auth.dependencies import get_current_user
-from app.auth.lockout import LockoutConfig
+from app.auth.dependencies import get_token_user
 from app.auth.models import ResetPasswordCreate, TokenPayload, TokenSchema
 from app.auth.security import create_access_token, create_refresh_token
 from app.auth.service import AuthService
 from app.config import settings
 from app.email.service import EmailService
 from app.models import ErrorResponse
+from app.rate_limit import RateLimit, form_field, json_field, query_param
+from app.service import update_document
 from app.user.models import UserCreate, UserOut
 from app.user.service import UserService
 
 auth_router = APIRouter()
 
+login_rate_limit = RateLimit(
+    "login",
+    per_ip=settings.RATE_LIMIT_AUTH_PER_IP,
+    per_credential=settings.RATE_LIMIT_AUTH_PER_CREDENTIAL,
+    credential=form_field("username"),
+)
+register_rate_limit = RateLimit(
+    "register",
+    per_ip=settings.RATE_LIMIT_AUTH_PER_IP,
+    per_credential=settings.RATE_LIMIT_AUTH_PER_CREDENTIAL,
+    credential=json_field("email"),
+)
+forgot_password_rate_limit = RateLimit(
+    "forgot-password",
+    per_ip=settings.RATE_LIMIT_AUTH_PER_IP,
+    per_credential=settings.RATE_LIMIT_AUTH_PER_CREDENTIAL,
+    credential=query_param("email"),
+)
+
 
 @auth_router.post(
     "/auth/login",
@@ -30,77 +49,21 @@ auth_router = APIRouter()
     responses={
         401: {"model": ErrorResponse},
         403: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
     },
+    dependencies=[Depends(login_rate_limit)],
 )
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     """Authenticate user and return access and refresh tokens."""
-    user = None
-    if "@" in form_data.username:
-        user = await UserService.get_by_email(email=form_data.username)
-    else:
-        user = await UserService.get_by_username(username=form_data.username)
-
-    # Check account status
-    # if user and not user.is_verified:
-    #     raise HTTPException(status_code=403, detail="Please verify your email first")
-    if user and not user.is_active:
-        raise HTTPException(status_code=403, detail="Account is inactive")
-
-    # Check if user is currently locked out
-    if (
-        user
-        and user.lockout_until
-        and user.lockout_until > datetime.now(UTC).replace(tzinfo=None)
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account temporarily locked due to multiple failed login attempts.",
-        )
-
-    # Reset when inactivity for users who are not locked out
-    if (
-        user
-        and not user.lockout_until
-        and user.last_login_attempt
-        and (datetime.now(UTC).replace(tzinfo=None) - user.last_login_attempt)
-        >= timedelta(minutes=5)
-    ):
-        user.login_attempts = 0
-
-    # Reset when inactivity for users who are locked out
-    if (
-        user
-        and user.lockout_until
-        and (datetime.now(UTC).replace(tzinfo=None) - user.last_login_attempt)
-        >= timedelta(days=1)
-    ):
-        user.login_attempts = 0
-        user.lockout_until = None
-
-    authenticated_user = await AuthService.authenticate(
+    user = await AuthService.authenticate(
         credential=form_data.username, password=form_data.password
     )
-
-    if not authenticated_user:
-        if user:
-            user.login_attempts += 1
-            user.last_login_attempt = datetime.now(UTC)
-            user.lockout_until = LockoutConfig.calculate_lockout_duration(
-                user.login_attempts, user.lockout_until
-            )
-            await user.save()
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
-    # Reset on successful login
-    if user:
-        user.login_attempts = 0
-        user.lockout_until = None
-        user.last_login_attempt = None
-        await user.save()
-
     return {
         "access_token": create_access_token(user.id),
         "refresh_token": create_refresh_token(user.id),
@@ -112,7 +75,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     response_model=UserOut,
     responses={
         409: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
     },
+    dependencies=[Depends(register_rate_limit)],
 )
 async def register(user: UserCreate) -> UserOut:
     """Register a new user."""
@@ -137,6 +102,10 @@ async def register(user: UserCreate) -> UserOut:
 
 @auth_router.post(
     "/auth/forgot-password",
+    responses={
+        429: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(forgot_password_rate_limit)],
 )
 async def forgot_password(
     email: str,
@@ -164,7 +133,7 @@ async def reset_password(
     body: ResetPasswordCreate,
 ):
     """Reset the password for a user using the provided token."""
-    user = await get_current_user(body.token)
+    user = await get_token_user(body.token)
 
     await AuthService.reset_password(user, body.password)
     return {"msg": "Password has been reset successfully."}
@@ -173,10 +142,10 @@ async def reset_password(
 @auth_router.post("/auth/verify")
 async def verify_email(token: str = Body(...)):
     """Verify user's email address."""
-    user = await get_current_user(token)
+    user = await get_token_user(token)
     if not user.is_verified:
         user.is_verified = True
-        await user.save()
+        await update_document(user, {"$set": {"is_verified": True}})
 
 
 @auth_router.post(
@@ -0,0 +1,222 @@
+"""
+Module for hashing passwords off the event loop, with backpressure.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+
+from app.auth.models import PasswordHashCost
+from app.auth.security import (
+    get_password,
+    needs_rehash,
+    set_password_rounds,
+    verify_password,
+)
+from app.config import settings
+
+T = TypeVar("T")
+
+# Upper bounds of the latency histogram, in seconds
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+# Range of bcrypt costs picked by calibration
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+class LatencyStats:
+    """Count, total and histogram of the latencies of an operation."""
+
+    def __init__(self, buckets: List[float]):
+        """Initialize the stats"""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {bound: 0 for bound in buckets}
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for bound in self.buckets:
+            if seconds <= bound:
+                self.buckets[bound] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the stats, with cumulative bucket counts as in Prometheus."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "buckets": {str(bound): count for bound, count in self.buckets.items()},
+        }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool, so that logins do not block the
+    event loop.
+
+    bcrypt releases the GIL while hashing, so threads run in parallel. Up to
+    `workers` operations run at once and `queue_size` more wait; beyond
+    that, requests are rejected with a 503 and Retry-After instead of
+    piling up.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        retry_after: int,
+        batch_workers: Optional[int] = None,
+    ):
+        """Initialize the hasher"""
+        self.workers = workers
+        self.batch_workers = batch_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.pending = 0
+        self.rejected = 0
+        self.latency = {
+            "hash": LatencyStats(LATENCY_BUCKETS),
+            "verify": LatencyStats(LATENCY_BUCKETS),
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run("hash", get_password, password)
+
+    async def verify(self, password: str, hashed_pass: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._run("verify", verify_password, password, hashed_pass)
+
+    async def verify_and_update(
+        self, password: str, hashed_pass: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, with a new hash if the stored one has another cost.
+
+        This upgrades hashes lazily, as only a login knows the password.
+        """
+        return await self._run("verify", _verify_and_update, password, hashed_pass)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash passwords of a bulk import in parallel.
+
+        A separate pool of `batch_workers` threads is used, so that imports
+        neither wait in nor fill the queue of logins.
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(
+            max_workers=self.batch_workers, thread_name_prefix="password-hash-batch"
+        ) as executor:
+            return await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, get_password, password)
+                    for password in passwords
+                )
+            )
+
+    async def calibrate(self, target: float) -> int:
+        """
+        Use the highest cost hashing within `target` seconds on this host.
+
+        Each extra round doubles the time, so one hash at the lowest cost is
+        enough to estimate the others.
+        """
+        loop = asyncio.get_running_loop()
+        seconds = await loop.run_in_executor(self._executor, _time_hash, MIN_ROUNDS)
+        rounds = MIN_ROUNDS
+        while rounds < MAX_ROUNDS and seconds * 2 <= target:
+            rounds += 1
+            seconds *= 2
+        set_password_rounds(rounds)
+        return rounds
+
+    async def calibrate_once(self, target: float) -> int:
+        """
+        Use the cost calibrated by the first worker, calibrating if none is.
+
+        Workers calibrating on their own could pick different costs from
+        timing noise. Delete the stored cost to calibrate again.
+        """
+        cost = await PasswordHashCost.find_one({"name": "bcrypt"})
+        if not cost:
+            rounds = await self.calibrate(target)
+            try:
+                await PasswordHashCost(name="bcrypt", rounds=rounds).insert()
+                return rounds
+            except DuplicateKeyError:
+                # Calibrated concurrently by another worker
+                cost = await PasswordHashCost.find_one({"name": "bcrypt"})
+        set_password_rounds(cost.rounds)
+        return cost.rounds
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get the pool usage and latencies, including time waiting in queue."""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "latency": {name: stats.snapshot() for name, stats in self.latency.items()},
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool after the running operations."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _run(self, name: str, function: Callable[..., T], *args: Any) -> T:
+        """Run an operation in the pool, unless the pool and queue are full."""
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=[{"msg": "Too many authentication requests. Try again."}],
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, function, *args)
+        finally:
+            self.pending -= 1
+            self.latency[name].observe(time.perf_counter() - start)
+
+
+def _verify_and_update(password: str, hashed_pass: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, rehashing it if needed."""
+    if not verify_password(password, hashed_pass):
+        return False, None
+    if needs_rehash(hashed_pass):
+        return True, get_password(password)
+    return True, None
+
+
+def _time_hash(rounds: int) -> float:
+    """Get the time to hash a password at a bcrypt cost."""
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+    return time.perf_counter() - start
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+    batch_workers=settings.PASSWORD_HASH_BATCH_WORKERS,
+)
@@ -3,6 +3,7 @@ Module for handling account lockout.
 """
 
 from datetime import UTC, datetime, timedelta
+from typing import List
 
 
 class LockoutConfig:
@@ -13,6 +14,8 @@ class LockoutConfig:
     INITIAL_LOCKOUT_THRESHOLD = 5  # Attempts required for initial lockout
     EXTRA_TRIES_AFTER_LOCKOUT = 5  # Additional tries after each lockout
     LOCKOUT_DURATIONS = [5, 15, 30, 60]  # Lockout durations in minutes
+    ATTEMPTS_RESET_AFTER = timedelta(minutes=5)  # Inactivity to forget attempts
+    LOCKOUT_RESET_AFTER = timedelta(days=1)  # Inactivity to forget lockouts
 
     @staticmethod
     def calculate_lockout_duration(attempts: int, locked_time) -> timedelta:
@@ -37,3 +40,90 @@ class LockoutConfig:
         ):
             return locked_time + timedelta(minutes=LockoutConfig.LOCKOUT_DURATIONS[-1])
         return locked_time
+
+    @staticmethod
+    def failed_attempt_update() -> List[dict]:
+        """
+        Build the update pipeline recording a failed login attempt.
+
+        It applies the inactivity resets, increments the attempts and sets
+        the lockout as `calculate_lockout_duration`, all in one atomic write,
+        so that concurrent attempts are all counted.
+        """
+        threshold = LockoutConfig.INITIAL_LOCKOUT_THRESHOLD
+        extra_tries = LockoutConfig.EXTRA_TRIES_AFTER_LOCKOUT
+        durations = LockoutConfig.LOCKOUT_DURATIONS
+
+        def inactive_for(delta: timedelta) -> dict:
+            inactivity = {"$subtract": ["$$NOW", "$last_login_attempt"]}
+            return {"$gte": [inactivity, delta // timedelta(milliseconds=1)]}
+
+        def locked_for(minutes: int) -> dict:
+            return {"$add": ["$$NOW", minutes * 60_000]}
+
+        is_locked = {"$toBool": {"$ifNull": ["$lockout_until", False]}}
+        reset_lockout = {
+            "$and": [is_locked, inactive_for(LockoutConfig.LOCKOUT_RESET_AFTER)]
+        }
+        reset_attempts = {
+            "$or": [
+                reset_lockout,
+                {
+                    "$and": [
+                        {"$not": [is_locked]},
+                        inactive_for(LockoutConfig.ATTEMPTS_RESET_AFTER),
+                    ]
+                },
+            ]
+        }
+        attempts = {"$ifNull": ["$login_attempts", 0]}
+
+        lockouts = [
+            {
+                "case": {"$eq": ["$login_attempts", threshold + i * extra_tries]},
+                "then": locked_for(duration),
+            }
+            for i, duration in enumerate(durations)
+        ]
+        return [
+            # Stage expressions see the document before the stage
+            {
+                "$set": {
+                    "login_attempts": {
+                        "$add": [{"$cond": [reset_attempts, 0, attempts]}, 1]
+                    },
+                    "lockout_until": {"$cond": [reset_lockout, None, "$lockout_until"]},
+                    "last_login_attempt": "$$NOW",
+                }
+            },
+            {
+                "$set": {
+                    "lockout_until": {
+                        "$switch": {
+                            "branches": [
+                                {
+                                    "case": {
+                                        "$and": [
+                                            {"$lt": ["$login_attempts", threshold]},
+                                            {"$not": [is_locked]},
+                                        ]
+                                    },
+                                    "then": None,
+                                },
+                                *lockouts,
+                                {
+                                    "case": {
+                                        "$gt": [
+                                            "$login_attempts",
+                                            threshold + len(durations) * extra_tries,
+                                        ]
+                                    },
+                                    "then": locked_for(durations[-1]),
+                                },
+                            ],
+                            "default": "$$NOW",
+                        }
+                    }
+                }
+            },
+        ]
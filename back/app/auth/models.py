@@ -2,8 +2,11 @@
 Module for handling authentication-related models.
 """
 
-from beanie import PydanticObjectId
+from datetime import UTC, datetime
+
+from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
+from pymongo import IndexModel
 
 
 class TokenSchema(BaseModel):
@@ -33,3 +36,17 @@ class ResetPasswordCreate(BaseModel):
     #     if not re.match(pattern, v):
     #         raise ValueError('Password must contain upper and lower case letters and digits.')
     #     return v
+
+
+class PasswordHashCost(Document):
+    """Model for the bcrypt cost picked by calibration, shared by all workers."""
+
+    name: str
+    rounds: int
+    calibrated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        """Settings for password hash cost document."""
+
+        name = "password_hash_costs"
+        indexes = [IndexModel([("name", 1)], unique=True)]
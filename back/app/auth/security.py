@@ -21,7 +21,14 @@ class SolveBugBcryptWarning:
 # https://github.com/pyca/bcrypt/issues/684
 setattr(bcrypt, "__about__", SolveBugBcryptWarning())
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost until calibrated, when PASSWORD_HASH_ROUNDS is 0
+DEFAULT_ROUNDS = 12
+
+password_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS or DEFAULT_ROUNDS,
+)
 
 
 def create_access_token(subject: Union[str, Any], expires_delta: int = None) -> str:
@@ -62,3 +69,26 @@ def get_password(password: str) -> str:
 def verify_password(password: str, hashed_pass: str) -> bool:
     """Verify password."""
     return password_context.verify(password, hashed_pass)
+
+
+def get_password_rounds() -> int:
+    """Get the bcrypt cost of new hashes."""
+    return password_context.to_dict()["bcrypt__rounds"]
+
+
+def set_password_rounds(rounds: int) -> None:
+    """Set the bcrypt cost of new hashes."""
+    password_context.update(bcrypt__rounds=rounds)
+
+
+def needs_rehash(hashed_pass: str) -> bool:
+    """
+    Check if a hash has a lower cost than new hashes, or a deprecated scheme.
+
+    Hashes are only upgraded, so workers with different costs do not keep
+    rehashing the same passwords back and forth.
+    """
+    # bcrypt hashes look like $2b$<rounds>$<salt and hash>
+    if hashed_pass.startswith("$2"):
+        return int(hashed_pass.split("$")[2]) < get_password_rounds()
+    return password_context.needs_update(hashed_pass)
@@ -2,34 +2,75 @@
 Module for handling auth-related operations.
 """
 
+from datetime import UTC, datetime
 from typing import Optional
 
-from app.auth.security import get_password, verify_password
-from app.user.models import User
-from app.user.service import UserService
+from fastapi import HTTPException, status
+
+from app.auth.hashing import password_hasher
+from app.auth.lockout import LockoutConfig
+from app.service import update_document
+from app.user.cache import user_cache
+from app.user.models import User, UserCredentials
 
 
 class AuthService:
     """Service class for Auth operations."""
 
     @staticmethod
-    async def authenticate(credential: str, password: str) -> Optional[User]:
-        """Authenticate a user."""
-        if "@" in credential:
-            user = await UserService.get_by_email(email=credential)
-        else:
-            user = await UserService.get_by_username(username=credential)
+    async def authenticate(credential: str, password: str) -> Optional[UserCredentials]:
+        """
+        Authenticate a user by email or username, tracking failed attempts.
 
+        Only the credentials and lockout fields are read, and each attempt
+        writes at most once: the atomic failed attempt update, or the reset
+        after failed attempts.
+        """
+        key = "email" if "@" in credential else "username"
+        user = await User.find_one(
+            {key: credential, "is_active": True}, projection_model=UserCredentials
+        )
         if not user:
             return None
-        if not verify_password(password=password, hashed_pass=user.hashed_password):
+
+        now = datetime.now(UTC).replace(tzinfo=None)
+        if user.lockout_until and user.lockout_until > now:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Account temporarily locked due to multiple failed login attempts.",
+            )
+
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not valid:
+            await User.get_motor_collection().update_one(
+                {"_id": user.id}, LockoutConfig.failed_attempt_update()
+            )
+            user_cache.invalidate(user.id)
             return None
 
+        update = {}
+        if user.login_attempts or user.lockout_until or user.last_login_attempt:
+            update = {
+                "login_attempts": 0,
+                "lockout_until": None,
+                "last_login_attempt": None,
+            }
+        if new_hash:
+            update["hashed_password"] = new_hash
+        if update:
+            # Skipped if the password changed meanwhile
+            await User.find_one(
+                {"_id": user.id, "hashed_password": user.hashed_password}
+            ).update({"$set": update})
+            user_cache.invalidate(user.id)
         return user
 
     @staticmethod
     async def reset_password(user: User, new_password: str):
         """Reset a user's password."""
-        hashed_password = get_password(new_password)
-        await user.update({"$set": {"hashed_password": hashed_password}})
+        hashed_password = await password_hasher.hash(new_password)
+        await update_document(user, {"$set": {"hashed_password": hashed_password}})
+        user.hashed_password = hashed_password
         return user
@@ -6,14 +6,11 @@ from typing import Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from beanie.odm.queries.find import AggregationQuery
-from fastapi_pagination.links import Page
 
 from app.auth.dependencies import get_current_user, get_current_user_optional
 from app.cafe.announcement.models import (
+    Announcement,
     AnnouncementAggregateOut,
     AnnouncementCreate,
     AnnouncementOut,
@@ -21,15 +18,17 @@ from app.cafe.announcement.models import (
 )
 from app.cafe.announcement.service import AnnouncementService
 from app.cafe.permissions import AdminPermission
-from app.cafe.service import CafeService
+from app.identity_map import IdentityMap, get_identity_map
+from app.interaction.service import InteractionService
 from app.models import ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 from app.user.models import User
 
 T = TypeVar("T")
 
 
-class AnnouncementParams(Params):
+class AnnouncementParams(CursorParams):
     """Custom pagination parameters."""
 
     size: int = Query(20, ge=1, le=100, description="Page size")
@@ -45,6 +44,10 @@ AnnouncementPage = CustomizedPage[
     UseParams(AnnouncementParams),
 ]
 
+announcement_filter = QueryFilter(
+    Announcement, filters=["cafe_id"], sorts=["updated_at"]
+)
+
 
 announcement_router = APIRouter()
 
@@ -58,28 +61,16 @@ async def list_announcements(
     current_user: User = Depends(get_current_user_optional),
 ):
     """Get a list of announcements."""
-    filters = parse_query_params(dict(request.query_params))
+    filters = announcement_filter.compile(request.query_params)
     announcements = await AnnouncementService.get_all(
-        to_list=False,
-        aggregate=True,
-        current_user_id=current_user.id if current_user else None,
-        **filters,
+        to_list=False, aggregate=True, **filters
+    )
+    return await paginate(
+        announcements,
+        transformer=lambda items: InteractionService.apply_user_interactions(
+            items, current_user.id if current_user else None
+        ),
     )
-
-    if isinstance(announcements, AggregationQuery):
-        items = await announcements.to_list()
-        # Manual pagination for list
-        params = AnnouncementParams()
-        start = (params.page - 1) * params.size
-        end = start + params.size
-        paginated_items = items[start:end]
-        
-        return Page.create(
-            items=paginated_items,
-            total=len(items),
-            params=params
-        )
-    return await paginate(announcements)
 
 
 @announcement_router.post(
@@ -96,9 +87,10 @@ async def create_announcement(
     data: AnnouncementCreate,
     slug: str = Path(..., description="Slug of the cafe"),
     current_user: User = Depends(get_current_user),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Create an announcement. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,9 +114,10 @@ async def update_announcement(
     data: AnnouncementUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the announcement"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update an announcement. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -153,9 +146,10 @@ async def update_announcement(
 async def delete_announcement(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the announcement"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Delete an announcement. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -7,8 +7,9 @@ from typing import List, Optional
 
 from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
 
-from app.interaction.models import InteractionOut
+from app.interaction.models import InteractionCounts, InteractionOut
 from app.models import CafeId, Id
 from app.user.models import UserOut
 
@@ -24,7 +25,7 @@ class AnnouncementBase(BaseModel):
     tags: List[str] = []
 
 
-class Announcement(Document, AnnouncementBase, CafeId):
+class Announcement(Document, AnnouncementBase, CafeId, InteractionCounts):
     """Announcement document model."""
 
     author_id: PydanticObjectId
@@ -33,6 +34,10 @@ class Announcement(Document, AnnouncementBase, CafeId):
         """Document settings."""
 
         name = "announcements"
+        indexes = [
+            IndexModel([("updated_at", ASCENDING)]),
+            IndexModel([("cafe_id", ASCENDING), ("updated_at", ASCENDING)]),
+        ]
 
 
 class AnnouncementCreate(BaseModel):
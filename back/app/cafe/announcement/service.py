@@ -14,7 +14,11 @@ from app.cafe.announcement.models import (
     AnnouncementUpdate,
 )
 from app.cafe.models import Cafe
-from app.service import set_attributes
+from app.service import (
+    interaction_counts_expression,
+    set_attributes,
+    update_fields,
+)
 from app.user.models import User
 
 
@@ -26,7 +30,6 @@ class AnnouncementService:
     async def get_all(
         to_list: Literal[True] = True,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> List[Announcement]: ...
 
@@ -35,7 +38,6 @@ class AnnouncementService:
     async def get_all(
         to_list: Literal[False] = False,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> FindMany[Announcement]: ...
 
@@ -44,7 +46,6 @@ class AnnouncementService:
     async def get_all(
         to_list: Literal[True] = True,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> List[dict]: ...
 
@@ -53,7 +54,6 @@ class AnnouncementService:
     async def get_all(
         to_list: Literal[False] = False,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> AggregationQuery[dict]: ...
 
@@ -61,7 +61,6 @@ class AnnouncementService:
     async def get_all(
         to_list: bool = True,
         aggregate: bool = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> Union[
         List[Announcement], FindMany[Announcement], List[dict], AggregationQuery[dict]
@@ -73,7 +72,6 @@ class AnnouncementService:
             pipeline = AnnouncementService._build_pipeline(
                 filters=filters,
                 sort_by=sort_by,
-                current_user_id=current_user_id,
             )
             query = Announcement.aggregate(pipeline)
             return await query.to_list() if to_list else query
@@ -159,8 +157,8 @@ class AnnouncementService:
         data: AnnouncementUpdate,
     ) -> Announcement:
         """Update an announcement."""
-        set_attributes(announcement, data)
-        await announcement.save()
+        previous = set_attributes(announcement, data)
+        await update_fields(announcement, previous)
         return announcement
 
     @staticmethod
@@ -173,7 +171,6 @@ class AnnouncementService:
         filters: Optional[dict] = None,
         sort_by: Optional[str] = None,
         announcement_id: Optional[PydanticObjectId] = None,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> list:
         """Build aggregation pipeline."""
         pipeline = []
@@ -185,6 +182,12 @@ class AnnouncementService:
         elif filters:
             pipeline.append({"$match": filters})
 
+        # Sorting, before the lookups so pages can be cut early
+        if sort_by and not announcement_id:
+            direction = DESCENDING if sort_by.startswith("-") else ASCENDING
+            field = sort_by.lstrip("-")
+            pipeline.append({"$sort": {field: direction}})
+
         # Author lookup
         pipeline.extend(
             [
@@ -214,85 +217,22 @@ class AnnouncementService:
         )
 
         # Interaction
-        pipeline.extend(
-            [
-                {
-                    "$lookup": {
-                        "from": "interactions",
-                        "localField": "_id",
-                        "foreignField": "announcement_id",
-                        "as": "all_interactions",
-                    }
-                },
-                {
-                    "$addFields": {
-                        "interactions": {
-                            "$map": {
-                                "input": {"$setUnion": "$all_interactions.type"},
-                                "as": "type",
-                                "in": {
-                                    "type": "$$type",
-                                    "count": {
-                                        "$size": {
-                                            "$filter": {
-                                                "input": "$all_interactions",
-                                                "as": "ia",
-                                                "cond": {
-                                                    "$eq": ["$$ia.type", "$$type"]
-                                                },
-                                            }
-                                        }
-                                    },
-                                    "me": {
-                                        "$cond": [
-                                            {"$ifNull": [current_user_id, False]},
-                                            {
-                                                "$anyElementTrue": {
-                                                    "$map": {
-                                                        "input": "$all_interactions",
-                                                        "as": "ia",
-                                                        "in": {
-                                                            "$and": [
-                                                                {
-                                                                    "$eq": [
-                                                                        "$$ia.user_id",
-                                                                        current_user_id,
-                                                                    ]
-                                                                },
-                                                                {
-                                                                    "$eq": [
-                                                                        "$$ia.type",
-                                                                        "$$type",
-                                                                    ]
-                                                                },
-                                                            ]
-                                                        },
-                                                    }
-                                                }
-                                            },
-                                            False,
-                                        ]
-                                    },
-                                },
-                            }
-                        }
-                    }
-                },
-            ]
+        pipeline.append(
+            {
+                "$addFields": {
+                    "interactions": interaction_counts_expression(
+                        "$interaction_counts"
+                    )
+                }
+            }
         )
 
         # Projection
         pipeline.extend(
             [
                 {"$addFields": {"id": "$_id"}},
-                {"$unset": ["_id", "author_id", "all_interactions"]},
+                {"$unset": ["_id", "author_id", "interaction_counts"]},
             ]
         )
 
-        # Sorting
-        if sort_by and not announcement_id:
-            direction = DESCENDING if sort_by.startswith("-") else ASCENDING
-            field = sort_by.lstrip("-")
-            pipeline.append({"$sort": {field: direction}})
-
         return pipeline
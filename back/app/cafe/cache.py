@@ -0,0 +1,92 @@
+"""
+Module for handling the cafe cache.
+"""
+
+import asyncio
+from typing import Dict, Optional, Set
+
+from beanie import Document, PydanticObjectId
+
+from app.cache import TTLCache
+from app.config import settings
+
+
+class CafeCache:
+    """Process-wide cache of cafes by slug, previous slug or ID."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize the cache"""
+        self._cafes = TTLCache(maxsize, ttl)
+        self._roles = TTLCache(maxsize, ttl)
+        self._keys: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, key: str) -> Optional[Document]:
+        """Get a copy of a cached cafe, safe for the caller to modify."""
+        cafe = self._cafes.get(key)
+        return cafe.model_copy(deep=True) if cafe else None
+
+    def set(self, key: str, cafe: Document) -> None:
+        """Cache a copy of a cafe under a key and its ID."""
+        cafe_id = str(cafe.id)
+        cafe = cafe.model_copy(deep=True)
+        for cache_key in {key, cafe_id}:
+            self._cafes.set(cache_key, cafe)
+            self._keys.setdefault(cafe_id, set()).add(cache_key)
+
+    def get_roles(self, key: str) -> Optional[Dict[str, str]]:
+        """Get the cached roles of a cafe, by user ID."""
+        return self._roles.get(key)
+
+    def set_roles(
+        self, key: str, cafe_id: PydanticObjectId, roles: Dict[str, str]
+    ) -> None:
+        """Cache the roles of a cafe under a key and its ID."""
+        cafe_id = str(cafe_id)
+        for cache_key in {key, cafe_id}:
+            self._roles.set(cache_key, roles)
+            self._keys.setdefault(cafe_id, set()).add(cache_key)
+
+    def invalidate(self, cafe_id: PydanticObjectId, *keys: str) -> None:
+        """Remove a cafe from the cache, by ID and any additional keys."""
+        for key in self._keys.pop(str(cafe_id), set()) | set(keys):
+            self._cafes.pop(key)
+            self._roles.pop(key)
+
+    def clear(self) -> None:
+        """Remove all cafes from the cache."""
+        self._cafes.clear()
+        self._roles.clear()
+        self._keys.clear()
+
+    async def start(self):
+        """Start listening for changes made by other workers"""
+        if settings.CAFE_CACHE_INVALIDATION == "change_stream":
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Stop listening for changes made by other workers"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self):
+        """Invalidate cafes changed in the cafes collection"""
+        # Imported here, the cafe model invalidates this cache on save
+        from app.cafe.models import Cafe
+
+        while True:
+            try:
+                async with Cafe.get_motor_collection().watch() as stream:
+                    async for change in stream:
+                        self.invalidate(change["documentKey"]["_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cafe change stream interrupted: {e}")
+                # Changes may have been missed
+                self.clear()
+                await asyncio.sleep(5)
+
+
+cafe_cache = CafeCache(maxsize=settings.CAFE_CACHE_SIZE, ttl=settings.CAFE_CACHE_TTL)
@@ -6,15 +6,14 @@ from typing import Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from fastapi_pagination.links import Page
 from pymongo.errors import DuplicateKeyError
 
 from app.auth.dependencies import get_current_user, get_current_user_optional
+from app.identity_map import IdentityMap, get_identity_map
 from app.menu.models import MenuUpdate
 from app.cafe.models import (
+    Cafe,
     CafeAggregateOut,
     CafeCreate,
     CafeOut,
@@ -25,17 +24,21 @@ from app.cafe.permissions import AdminPermission
 from app.cafe.service import CafeService
 from app.cafe.staff.enums import Role
 from app.cafe.staff.service import StaffService
+from app.interaction.service import InteractionService
 from app.models import ErrorConflictResponse, ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CountStrategy, CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 from app.user.models import User
 from app.user.service import UserService
 
 T = TypeVar("T")
 
 
-class CafeParams(Params):
+class CafeParams(CursorParams):
     """Custom pagination parameters."""
 
+    count_strategy = CountStrategy.ESTIMATED
+
     size: int = Query(20, ge=1, le=100, description="Page size")
     page: int = Query(1, ge=1, description="Page number")
     sort_by: Optional[str] = Query(None, description="Sort by a specific field")
@@ -47,6 +50,10 @@ CafePage = CustomizedPage[
     UseParams(CafeParams),
 ]
 
+cafe_filter = QueryFilter(
+    Cafe, filters=["slug", "is_open", "location.pavillon"], sorts=["name", "_id"]
+)
+
 
 cafe_router = APIRouter()
 
@@ -59,7 +66,7 @@ async def list_cafes(
     request: Request,
 ):
     """Get a list of cafes with basic information."""
-    filters = parse_query_params(dict(request.query_params))
+    filters = cafe_filter.compile(request.query_params)
     cafes = await CafeService.get_all(to_list=False, **filters)
     return await paginate(cafes)
 
@@ -75,16 +82,20 @@ async def get_cafe(
     current_user: User = Depends(get_current_user_optional),
 ):
     """Get a cafe with full details."""
-    cafe = await CafeService.get(
-        slug,
-        aggregate=True,
-        current_user_id=current_user.id if current_user else None,
-    )
+    cafe = await CafeService.get(slug, aggregate=True)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=[{"msg": "A cafe with this slug does not exist."}],
         )
+
+    if current_user:
+        items = [
+            item
+            for category in cafe["menu"]["categories"]
+            for item in category["items"]
+        ]
+        await InteractionService.apply_user_interactions(items, current_user.id)
     return cafe
 
 
@@ -103,9 +114,10 @@ async def update_cafe(
     data: CafeUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
     current_user: User = Depends(get_current_user),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update a cafe. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -170,9 +182,10 @@ async def update_cafe(
 async def update_menu(
     data: MenuUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update a cafe menu. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
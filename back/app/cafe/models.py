@@ -6,11 +6,23 @@ from datetime import datetime
 from typing import List, Optional
 
 import pymongo
-from beanie import DecimalAnnotation, Insert, PydanticObjectId, Save, before_event
+from beanie import (
+    DecimalAnnotation,
+    Delete,
+    Document,
+    Insert,
+    PydanticObjectId,
+    Replace,
+    Save,
+    Update,
+    after_event,
+    before_event,
+)
 from pydantic import BaseModel, EmailStr, Field, HttpUrl, field_validator
 from pymongo import IndexModel
 from slugify import slugify
 
+from app.cafe.cache import cafe_cache
 from app.cafe.enums import Days, Feature, PaymentMethod
 from app.menu.enums import Layout
 from app.menu.models import Menu, MenuOut
@@ -184,9 +196,19 @@ class Cafe(CustomDocument, CafeBase):
             await Cafe.find({"previous_slugs": new_slug}).update_many(
                 {"$pull": {"previous_slugs": new_slug}}
             )
+            await CafeView.find({"previous_slugs": new_slug}).update_many(
+                {"$pull": {"previous_slugs": new_slug}}
+            )
+            # Other cafes may have lost a previous slug
+            cafe_cache.clear()
 
             self.slug = new_slug
 
+    @after_event([Insert, Save, Replace, Update, Delete])
+    def invalidate_cache(self):
+        """Invalidate cached copies."""
+        cafe_cache.invalidate(self.id, self.slug, *self.previous_slugs)
+
     class Settings:
         """Settings for cafe document."""
 
@@ -194,12 +216,43 @@ class Cafe(CustomDocument, CafeBase):
         indexes = [
             IndexModel([("name", pymongo.ASCENDING)], unique=True),
             IndexModel([("slug", pymongo.ASCENDING)], unique=True),
+            IndexModel([("previous_slugs", pymongo.ASCENDING)]),
             IndexModel([("description", pymongo.ASCENDING)]),
-            IndexModel([("location.pavillon", pymongo.ASCENDING)]),
+            IndexModel([("is_open", pymongo.ASCENDING), ("name", pymongo.ASCENDING)]),
+            IndexModel([("is_open", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]),
+            IndexModel(
+                [("location.pavillon", pymongo.ASCENDING), ("name", pymongo.ASCENDING)]
+            ),
+            IndexModel(
+                [("location.pavillon", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]
+            ),
             IndexModel([("location.local", pymongo.ASCENDING)]),
         ]
 
 
+class CafeView(Document):
+    """
+    Materialized cafe detail document.
+
+    Holds the anonymous `CafeAggregateOut` payload (owner, staff, menu with
+    items and interaction counts) so `GET /cafes/{slug}` is a single indexed
+    read. Rebuilt per cafe by `CafeService.refresh_view` from the write paths,
+    except item interaction counts, adjusted in place on each interaction.
+    """
+
+    slug: Optional[str] = None
+    previous_slugs: List[str] = []
+
+    class Settings:
+        """Settings for cafe view document."""
+
+        name = "cafe_views"
+        indexes = [
+            IndexModel([("slug", pymongo.ASCENDING)]),
+            IndexModel([("previous_slugs", pymongo.ASCENDING)]),
+        ]
+
+
 class CafeCreate(BaseModel):
     """Cafe creation model."""
 
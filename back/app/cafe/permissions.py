@@ -5,13 +5,10 @@ Module for handling cafe permissions.
 from fastapi import Depends, HTTPException, Request, status
 
 from app.auth.dependencies import get_current_user
-from app.cafe.models import Cafe
-from app.cafe.service import CafeService
-from app.cafe.staff.enums import Role
+from app.cafe.staff.enums import OWNER, Role
+from app.identity_map import IdentityMap, get_identity_map
 from app.user.models import User
 
-OWNER = "OWNER"
-
 
 class BasePermission:
     """Base class for cafe permissions"""
@@ -22,6 +19,7 @@ class BasePermission:
         self,
         request: Request,
         current_user: User = Depends(get_current_user),
+        identity_map: IdentityMap = Depends(get_identity_map),
     ):
         """Core permission check logic"""
         slug = request.path_params.get("slug")
@@ -31,26 +29,16 @@ class BasePermission:
                 detail=[{"msg": "Slug parameter is required"}],
             )
 
-        cafe = await CafeService.get(slug)
-        if not cafe:
+        roles = await identity_map.get_roles(slug)
+        if roles is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=[{"msg": "A cafe with this slug does not exist."}],
             )
 
-        user_role = self._get_user_role(current_user, cafe)
+        user_role = roles.get(str(current_user.id))
         await self._verify_permission(user_role)
 
-    def _get_user_role(self, user: User, cafe: Cafe):
-        """Determine user's role in the cafe"""
-        if user.id == cafe.owner_id:
-            return OWNER
-        if user.id in cafe.staff.admin_ids:
-            return Role.ADMIN
-        if user.id in cafe.staff.volunteer_ids:
-            return Role.VOLUNTEER
-        return None
-
     async def _verify_permission(self, user_role: str):
         """Core permission check logic"""
         if self.required_role is None:
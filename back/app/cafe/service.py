@@ -2,7 +2,7 @@
 Module for handling cafe-related operations.
 """
 
-from typing import List, Literal, Optional, Union, overload
+from typing import Dict, List, Literal, Optional, Union, overload
 
 from beanie import PydanticObjectId
 from beanie.odm.queries.find import FindMany
@@ -10,8 +10,18 @@ from bson.errors import InvalidId
 from pymongo import ASCENDING, DESCENDING
 
 from app.menu.models import MenuUpdate
-from app.cafe.models import Cafe, CafeCreate, CafeUpdate
-from app.service import set_attributes
+from app.cafe.cache import cafe_cache
+from app.cafe.models import Cafe, CafeCreate, CafeUpdate, CafeView
+from app.cafe.staff.enums import OWNER, Role
+from app.config import settings
+from app.search.service import index_cafes
+from app.search.suggest import suggestion_index
+from app.service import (
+    interaction_counts_expression,
+    set_attributes,
+    update_document,
+    update_fields,
+)
 
 
 class CafeService:
@@ -32,7 +42,7 @@ class CafeService:
     async def get(
         cafe_slug_or_id: str,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
+        cached: bool = True,
     ) -> Optional[Cafe]: ...
 
     @overload
@@ -40,22 +50,33 @@ class CafeService:
     async def get(
         cafe_slug_or_id: str,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
+        cached: bool = True,
     ) -> Optional[dict]: ...
 
     @staticmethod
     async def get(
         cafe_slug_or_id: str,
         aggregate: bool = False,
-        current_user_id: Optional[PydanticObjectId] = None,
+        cached: bool = True,
     ) -> Union[Optional[Cafe], Optional[dict]]:
-        """Get a cafe by slug or ID."""
+        """
+        Get a cafe by slug or ID.
+
+        Write paths pass `cached=False`: a cached cafe may be stale when
+        another worker changed it, and updates are guarded on its values.
+        The aggregate is anonymous: per-user `me` flags are overlaid by
+        `InteractionService.apply_user_interactions`.
+        """
         if not aggregate:
+            cafe = cafe_cache.get(cafe_slug_or_id) if cached else None
+            if cafe:
+                return cafe
+
             try:
                 cafe_id = PydanticObjectId(cafe_slug_or_id)
-                return await Cafe.find_one({"_id": cafe_id})
+                cafe = await Cafe.find_one({"_id": cafe_id})
             except InvalidId:
-                return await Cafe.find_one(
+                cafe = await Cafe.find_one(
                     {
                         "$or": [
                             {"slug": cafe_slug_or_id},
@@ -64,6 +85,10 @@ class CafeService:
                     }
                 )
 
+            if cafe:
+                cafe_cache.set(cafe_slug_or_id, cafe)
+            return cafe
+
         try:
             cafe_id = PydanticObjectId(cafe_slug_or_id)
             filters = {"_id": cafe_id}
@@ -72,11 +97,144 @@ class CafeService:
                 "$or": [{"slug": cafe_slug_or_id}, {"previous_slugs": cafe_slug_or_id}]
             }
 
+        return await CafeService._get_view(filters)
+
+    @staticmethod
+    def get_cached_roles(cafe_slug_or_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get the cached roles of a cafe by user ID, if any.
+
+        Roles are cached only when other workers invalidate the cache too:
+        otherwise a revoked staff member would keep access on the other
+        workers until the entry expires.
+        """
+        if settings.CAFE_CACHE_INVALIDATION != "change_stream":
+            return None
+        return cafe_cache.get_roles(cafe_slug_or_id)
+
+    @staticmethod
+    def get_roles(cafe: Cafe, cafe_slug_or_id: str) -> Dict[str, str]:
+        """Get the roles of a loaded cafe by user ID."""
+        roles = {str(id): Role.VOLUNTEER for id in cafe.staff.volunteer_ids}
+        roles.update({str(id): Role.ADMIN for id in cafe.staff.admin_ids})
+        roles[str(cafe.owner_id)] = OWNER
+        if settings.CAFE_CACHE_INVALIDATION == "change_stream":
+            cafe_cache.set_roles(cafe_slug_or_id, cafe.id, roles)
+        return roles
+
+    @staticmethod
+    async def _get_view(filters: dict) -> Optional[dict]:
+        """Get the materialized detail document of a cafe, building it if missing."""
+        pipeline = [{"$match": filters}, {"$limit": 1}, {"$unset": "_id"}]
+        result = await CafeView.aggregate(pipeline).to_list()
+        if result:
+            return result[0]
+
+        cafe = await Cafe.find_one(filters)
+        if not cafe:
+            return None
+
+        await CafeService.refresh_view(cafe.id)
+        result = await CafeView.aggregate(pipeline).to_list()
+        return result[0] if result else None
+
+    @staticmethod
+    async def refresh_view(*cafe_ids: PydanticObjectId) -> None:
+        """Rebuild the materialized detail document of the given cafes."""
+        if not cafe_ids:
+            return
+
         pipeline = CafeService._build_pipeline(
-            filters=filters, current_user_id=current_user_id
+            filters={"_id": {"$in": list(set(cafe_ids))}}
+        )
+        pipeline.extend(
+            [
+                {"$addFields": {"_id": "$id"}},
+                {
+                    "$merge": {
+                        "into": CafeView.get_collection_name(),
+                        "on": "_id",
+                        "whenMatched": "replace",
+                        "whenNotMatched": "insert",
+                    }
+                },
+            ]
+        )
+        await Cafe.aggregate(pipeline).to_list()
+
+    @staticmethod
+    async def increment_view_interactions(
+        cafe_id: PydanticObjectId,
+        item_id: PydanticObjectId,
+        interaction_type: str,
+        amount: int,
+    ) -> None:
+        """
+        Adjust an item interaction count in the detail document of a cafe.
+
+        The count is changed in place by an update pipeline, instead of
+        rebuilding the whole document. A missing view is left to be built.
+        """
+        counts = {
+            "$arrayToObject": {
+                "$map": {
+                    "input": "$$item.interactions",
+                    "in": {"k": "$$this.type", "v": "$$this.count"},
+                }
+            }
+        }
+        counts = {
+            "$mergeObjects": [
+                counts,
+                {
+                    interaction_type: {
+                        "$add": [
+                            {
+                                "$ifNull": [
+                                    {
+                                        "$getField": {
+                                            "field": interaction_type,
+                                            "input": counts,
+                                        }
+                                    },
+                                    0,
+                                ]
+                            },
+                            amount,
+                        ]
+                    }
+                },
+            ]
+        }
+        items = {
+            "$map": {
+                "input": "$$category.items",
+                "as": "item",
+                "in": {
+                    "$cond": [
+                        {"$eq": ["$$item.id", item_id]},
+                        {
+                            "$mergeObjects": [
+                                "$$item",
+                                {"interactions": interaction_counts_expression(counts)},
+                            ]
+                        },
+                        "$$item",
+                    ]
+                },
+            }
+        }
+        categories = {
+            "$map": {
+                "input": "$menu.categories",
+                "as": "category",
+                "in": {"$mergeObjects": ["$$category", {"items": items}]},
+            }
+        }
+        await CafeView.get_motor_collection().update_one(
+            {"_id": cafe_id, "menu.categories.items.id": item_id},
+            [{"$set": {"menu.categories": categories}}],
         )
-        result = await Cafe.aggregate(pipeline).to_list()
-        return result[0] if result else None
 
     @staticmethod
     async def create(
@@ -85,7 +243,11 @@ class CafeService:
     ) -> Cafe:
         """Create a new cafe."""
         cafe = Cafe(**data.model_dump(), owner_id=owner_id)
-        return await cafe.insert()
+        await cafe.insert()
+        await CafeService.refresh_view(cafe.id)
+        await index_cafes(cafe)
+        await suggestion_index.add_cafes(cafe)
+        return cafe
 
     @staticmethod
     async def update(
@@ -93,21 +255,29 @@ class CafeService:
         data: CafeUpdate,
     ) -> Cafe:
         """Update a cafe."""
-        set_attributes(cafe, data)
-        await cafe.save()
+        previous = set_attributes(cafe, data)
+        update = {}
+        if "name" in previous:
+            await cafe.handle_slug()
+            update["$set"] = {"slug": cafe.slug, "previous_slugs": cafe.previous_slugs}
+        await update_fields(cafe, previous, update)
+        await CafeService.refresh_view(cafe.id)
+        await index_cafes(cafe)
+        await suggestion_index.add_cafes(cafe)
         return cafe
 
     @staticmethod
     async def update_menu(cafe: Cafe, data: MenuUpdate) -> Cafe:
         """Update a cafe menu."""
         cafe.menu.layout = data.layout
-        await cafe.save()
+        await update_document(cafe, {"$set": {"menu.layout": data.layout}})
+        await CafeService.refresh_view(cafe.id)
+        return cafe
 
     @staticmethod
     def _build_pipeline(
         filters: Optional[dict] = None,
         sort_by: Optional[str] = None,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> list:
         """Build aggregation pipeline."""
         pipeline = []
@@ -149,15 +319,6 @@ class CafeService:
                         "as": "menu_items",
                     }
                 },
-                # Lookup interactions
-                {
-                    "$lookup": {
-                        "from": "interactions",
-                        "localField": "menu_items._id",
-                        "foreignField": "item_id",
-                        "as": "all_item_interactions",
-                    }
-                },
                 # Lookup admins
                 {
                     "$lookup": {
@@ -269,79 +430,9 @@ class CafeService:
                                                                 "in_stock": "$$item.in_stock",
                                                                 "is_highlighted": "$$item.is_highlighted",
                                                                 "options": "$$item.options",
-                                                                "interactions": {
-                                                                    "$let": {
-                                                                        "vars": {
-                                                                            "item_interactions": {
-                                                                                "$filter": {
-                                                                                    "input": "$all_item_interactions",
-                                                                                    "cond": {
-                                                                                        "$eq": [
-                                                                                            "$$this.item_id",
-                                                                                            "$$item._id",
-                                                                                        ]
-                                                                                    },
-                                                                                }
-                                                                            }
-                                                                        },
-                                                                        "in": {
-                                                                            "$map": {
-                                                                                "input": {
-                                                                                    "$setUnion": "$$item_interactions.type"
-                                                                                },
-                                                                                "as": "type",
-                                                                                "in": {
-                                                                                    "type": "$$type",
-                                                                                    "count": {
-                                                                                        "$size": {
-                                                                                            "$filter": {
-                                                                                                "input": "$$item_interactions",
-                                                                                                "cond": {
-                                                                                                    "$eq": [
-                                                                                                        "$$this.type",
-                                                                                                        "$$type",
-                                                                                                    ]
-                                                                                                },
-                                                                                            }
-                                                                                        }
-                                                                                    },
-                                                                                    "me": {
-                                                                                        "$cond": [
-                                                                                            {
-                                                                                                "$ifNull": [
-                                                                                                    current_user_id,
-                                                                                                    False,
-                                                                                                ]
-                                                                                            },
-                                                                                            {
-                                                                                                "$in": [
-                                                                                                    current_user_id,
-                                                                                                    {
-                                                                                                        "$map": {
-                                                                                                            "input": {
-                                                                                                                "$filter": {
-                                                                                                                    "input": "$$item_interactions",
-                                                                                                                    "cond": {
-                                                                                                                        "$eq": [
-                                                                                                                            "$$this.type",
-                                                                                                                            "$$type",
-                                                                                                                        ]
-                                                                                                                    },
-                                                                                                                }
-                                                                                                            },
-                                                                                                            "in": "$$this.user_id",
-                                                                                                        }
-                                                                                                    },
-                                                                                                ]
-                                                                                            },
-                                                                                            False,
-                                                                                        ]
-                                                                                    },
-                                                                                },
-                                                                            }
-                                                                        },
-                                                                    }
-                                                                },
+                                                                "interactions": interaction_counts_expression(
+                                                                    "$$item.interaction_counts"
+                                                                ),
                                                             },
                                                         }
                                                     },
@@ -385,79 +476,9 @@ class CafeService:
                                                             "in_stock": "$$item.in_stock",
                                                             "is_highlighted": "$$item.is_highlighted",
                                                             "options": "$$item.options",
-                                                            "interactions": {
-                                                                "$let": {
-                                                                    "vars": {
-                                                                        "item_interactions": {
-                                                                            "$filter": {
-                                                                                "input": "$all_item_interactions",
-                                                                                "cond": {
-                                                                                    "$eq": [
-                                                                                        "$$this.item_id",
-                                                                                        "$$item._id",
-                                                                                    ]
-                                                                                },
-                                                                            }
-                                                                        }
-                                                                    },
-                                                                    "in": {
-                                                                        "$map": {
-                                                                            "input": {
-                                                                                "$setUnion": "$$item_interactions.type"
-                                                                            },
-                                                                            "as": "type",
-                                                                            "in": {
-                                                                                "type": "$$type",
-                                                                                "count": {
-                                                                                    "$size": {
-                                                                                        "$filter": {
-                                                                                            "input": "$$item_interactions",
-                                                                                            "cond": {
-                                                                                                "$eq": [
-                                                                                                    "$$this.type",
-                                                                                                    "$$type",
-                                                                                                ]
-                                                                                            },
-                                                                                        }
-                                                                                    }
-                                                                                },
-                                                                                "me": {
-                                                                                    "$cond": [
-                                                                                        {
-                                                                                            "$ifNull": [
-                                                                                                current_user_id,
-                                                                                                False,
-                                                                                            ]
-                                                                                        },
-                                                                                        {
-                                                                                            "$in": [
-                                                                                                current_user_id,
-                                                                                                {
-                                                                                                    "$map": {
-                                                                                                        "input": {
-                                                                                                            "$filter": {
-                                                                                                                "input": "$$item_interactions",
-                                                                                                                "cond": {
-                                                                                                                    "$eq": [
-                                                                                                                        "$$this.type",
-                                                                                                                        "$$type",
-                                                                                                                    ]
-                                                                                                                },
-                                                                                                            }
-                                                                                                        },
-                                                                                                        "in": "$$this.user_id",
-                                                                                                    }
-                                                                                                },
-                                                                                            ]
-                                                                                        },
-                                                                                        False,
-                                                                                    ]
-                                                                                },
-                                                                            },
-                                                                        }
-                                                                    },
-                                                                }
-                                                            },
+                                                            "interactions": interaction_counts_expression(
+                                                                "$$item.interaction_counts"
+                                                            ),
                                                         },
                                                     }
                                                 },
@@ -480,7 +501,6 @@ class CafeService:
                         "volunteers",
                         "staff.admin_ids",
                         "staff.volunteer_ids",
-                        "all_item_interactions",
                     ]
                 },
             ]
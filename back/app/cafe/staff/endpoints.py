@@ -8,10 +8,10 @@ from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, status, Query
 
 from app.cafe.permissions import AdminPermission
-from app.cafe.service import CafeService
 from app.cafe.staff.enums import Role
 from app.cafe.staff.models import StaffWithOwnerOut
 from app.cafe.staff.service import StaffService
+from app.identity_map import IdentityMap, get_identity_map
 from app.models import ErrorResponse
 from app.user.service import UserService
 
@@ -87,9 +87,10 @@ async def add_staff(
         ..., description="Role of the staff"
     ),
     id: PydanticObjectId = Path(..., description="ID of the user"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Add a staff member to a cafe. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -135,9 +136,10 @@ async def remove_staff(
         ..., description="Role of the staff"
     ),
     id: PydanticObjectId = Path(..., description="ID of the user"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Remove a staff member from a cafe. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -10,3 +10,7 @@ class Role(str, Enum):
 
     ADMIN = "ADMIN"
     VOLUNTEER = "VOLUNTEER"
+
+
+# Cafe owners rank above admins, but are not staff members
+OWNER = "OWNER"
@@ -8,7 +8,9 @@ from beanie import PydanticObjectId
 from bson.errors import InvalidId
 
 from app.cafe.models import Cafe
+from app.cafe.service import CafeService
 from app.cafe.staff.enums import Role
+from app.service import update_document
 
 
 class StaffService:
@@ -47,8 +49,9 @@ class StaffService:
             else cafe.staff.volunteer_ids
         )
         if id not in staff_list:
+            await update_document(cafe, {"$addToSet": {StaffService._field(role): id}})
             staff_list.append(id)
-            await cafe.save()
+            await CafeService.refresh_view(cafe.id)
 
     @staticmethod
     async def remove(cafe: Cafe, role: Role, id: PydanticObjectId) -> None:
@@ -59,8 +62,9 @@ class StaffService:
             else cafe.staff.volunteer_ids
         )
         if id in staff_list:
+            await update_document(cafe, {"$pull": {StaffService._field(role): id}})
             staff_list.remove(id)
-            await cafe.save()
+            await CafeService.refresh_view(cafe.id)
 
     @staticmethod
     async def add_many(cafe: Cafe, role: Role, ids: List[PydanticObjectId]) -> None:
@@ -72,8 +76,11 @@ class StaffService:
         )
         new_ids = [id for id in ids if id not in staff_list]
         if new_ids:
+            await update_document(
+                cafe, {"$addToSet": {StaffService._field(role): {"$each": new_ids}}}
+            )
             staff_list.extend(new_ids)
-            await cafe.save()
+            await CafeService.refresh_view(cafe.id)
 
     @staticmethod
     async def remove_many(cafe: Cafe, role: Role, ids: List[PydanticObjectId]) -> None:
@@ -86,7 +93,17 @@ class StaffService:
         original_count = len(staff_list)
         staff_list[:] = [id for id in staff_list if id not in ids]
         if len(staff_list) != original_count:
-            await cafe.save()
+            await update_document(
+                cafe, {"$pull": {StaffService._field(role): {"$in": ids}}}
+            )
+            await CafeService.refresh_view(cafe.id)
+
+    @staticmethod
+    def _field(role: Role) -> str:
+        """Get the stored list of staff ids of a role."""
+        if role.upper() == Role.ADMIN:
+            return "staff.admin_ids"
+        return "staff.volunteer_ids"
 
     @staticmethod
     def _build_pipeline(filters: Optional[dict] = None) -> list:
@@ -2,9 +2,9 @@ from typing import Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from app.cafe.service import CafeService
 from app.cafe.stock.stock_model import Stock
 from app.cafe.stock.stock_service import StockService
+from app.identity_map import IdentityMap, get_identity_map
 from app.models import ErrorResponse
 from app.service import parse_query_params
 
@@ -20,9 +20,10 @@ stock_router = APIRouter()
 async def list_stock_items(
     request: Request,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Get a list of stock items for a cafe."""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,9 +48,10 @@ async def list_stock_items(
 async def get_item(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the stock item"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Get a stock item."""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
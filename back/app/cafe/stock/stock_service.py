@@ -5,7 +5,7 @@ from beanie.odm.queries.find import FindMany
 
 from app.cafe.stock.stock_model import Stock, StockCreate, StockUpdate
 from app.cafe.models import Cafe
-from app.service import set_attributes
+from app.service import set_attributes, update_fields
 
 class StockService:
     """Service class for CRUD and search operations on Menu."""
@@ -46,8 +46,8 @@ class StockService:
     @staticmethod
     async def update(item: Stock, data: StockUpdate) -> Stock:
         """Update a stock item."""
-        set_attributes(item, data)
-        await item.save()
+        previous = set_attributes(item, data)
+        await update_fields(item, previous)
         return item
 
     @staticmethod
@@ -21,6 +21,49 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[str] = config(
         "BACKEND_CORS_ORIGINS", cast=lambda v: v.split(",")
     )
+    # Authenticated users are cached for a short time, and invalidated on change
+    USER_CACHE_SIZE: int = config("USER_CACHE_SIZE", default=1024, cast=int)
+    USER_CACHE_TTL: int = config("USER_CACHE_TTL", default=30, cast=int)
+    # Password hashing runs in a thread pool, with at most this many waiting
+    # requests; further requests get a 503 with Retry-After (seconds)
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=4, cast=int)
+    PASSWORD_HASH_QUEUE_SIZE: int = config(
+        "PASSWORD_HASH_QUEUE_SIZE", default=32, cast=int
+    )
+    PASSWORD_HASH_RETRY_AFTER: int = config(
+        "PASSWORD_HASH_RETRY_AFTER", default=1, cast=int
+    )
+    # bcrypt cost of new password hashes, or 0 to pick the highest cost
+    # hashing within PASSWORD_HASH_TARGET_MS, calibrated once by the first
+    # worker and stored. Hashes of a lower cost are upgraded at the next login.
+    PASSWORD_HASH_ROUNDS: int = config("PASSWORD_HASH_ROUNDS", default=12, cast=int)
+    PASSWORD_HASH_TARGET_MS: int = config(
+        "PASSWORD_HASH_TARGET_MS", default=250, cast=int
+    )
+    # Threads hashing bulk imports, apart from logins (0 for one per CPU)
+    PASSWORD_HASH_BATCH_WORKERS: int = config(
+        "PASSWORD_HASH_BATCH_WORKERS", default=0, cast=int
+    )
+    # Requests per client IP, and per email or username, within a sliding
+    # window of RATE_LIMIT_PERIOD seconds. Counters are kept in "memory" (per
+    # worker, up to RATE_LIMIT_MAX_KEYS keys) or in "mongo" (shared).
+    RATE_LIMIT_ENABLED: bool = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+    RATE_LIMIT_STORE: str = config("RATE_LIMIT_STORE", default="memory", cast=str)
+    RATE_LIMIT_MAX_KEYS: int = config("RATE_LIMIT_MAX_KEYS", default=100_000, cast=int)
+    RATE_LIMIT_PERIOD: int = config("RATE_LIMIT_PERIOD", default=60, cast=int)
+    # Reverse proxies in front of the app (1 on Render), whose X-Forwarded-For
+    # entries are trusted for the client IP. With 0, forwarded requests come
+    # from a shared proxy IP, so they skip the per-IP limits.
+    RATE_LIMIT_TRUSTED_PROXIES: int = config(
+        "RATE_LIMIT_TRUSTED_PROXIES", default=0, cast=int
+    )
+    RATE_LIMIT_AUTH_PER_IP: int = config("RATE_LIMIT_AUTH_PER_IP", default=20, cast=int)
+    RATE_LIMIT_AUTH_PER_CREDENTIAL: int = config(
+        "RATE_LIMIT_AUTH_PER_CREDENTIAL", default=10, cast=int
+    )
+    RATE_LIMIT_SEARCH_PER_IP: int = config(
+        "RATE_LIMIT_SEARCH_PER_IP", default=120, cast=int
+    )
     BASE_URL: str = config("BASE_URL", cast=str)
     PROJECT_NAME: str = "Café sans-fil"
     VERSION: str = "0.3.0"
@@ -29,8 +72,59 @@ class Settings(BaseSettings):
     MONGO_CONNECTION_STRING: str = config("MONGO_CONNECTION_STRING", cast=str)
     MONGO_DB_NAME: str = config("MONGO_DB_NAME", cast=str)
 
+    # Cafe cache, invalidated locally on save, and optionally across workers
+    # by a change stream ("local" or "change_stream"). Staff roles are only
+    # cached with "change_stream", so that revoked access ends on every worker.
+    CAFE_CACHE_SIZE: int = config("CAFE_CACHE_SIZE", default=256, cast=int)
+    CAFE_CACHE_TTL: int = config("CAFE_CACHE_TTL", default=60, cast=int)
+    CAFE_CACHE_INVALIDATION: str = config(
+        "CAFE_CACHE_INVALIDATION", default="local", cast=str
+    )
+
+    # Cached page totals, per collection and filter
+    COUNT_CACHE_SIZE: int = config("COUNT_CACHE_SIZE", default=1024, cast=int)
+    COUNT_CACHE_TTL: int = config("COUNT_CACHE_TTL", default=30, cast=int)
+    # Allow ?explain=true on list endpoints, returning the query plan (debug)
+    QUERY_EXPLAIN: bool = config("QUERY_EXPLAIN", default=False, cast=bool)
+
+    # Search suggestions trie size limit, in nodes (about 200 bytes each)
+    SUGGEST_MAX_NODES: int = config("SUGGEST_MAX_NODES", default=500_000, cast=int)
+
+    # Orders
+    # Order numbers restart every business day, in this timezone
+    ORDER_NUMBER_TIMEZONE: str = config(
+        "ORDER_NUMBER_TIMEZONE", default="America/Toronto", cast=str
+    )
+    # Order numbers reserved per database round trip (gaps on restart if > 1)
+    ORDER_NUMBER_BLOCK_SIZE: int = config(
+        "ORDER_NUMBER_BLOCK_SIZE", default=1, cast=int
+    )
+
+    # Cancel expired orders in the background (one worker at a time)
+    ORDER_SCHEDULER_ENABLED: bool = config(
+        "ORDER_SCHEDULER_ENABLED", default=True, cast=bool
+    )
+
+    # Real-time order events: "memory" (single worker) or "change_stream"
+    ORDER_BROKER: str = config("ORDER_BROKER", default="memory", cast=str)
+
     # Mail
     SENDGRID_API_KEY: str = config("SENDGRID_API_KEY", cast=str)
+    EMAIL_FROM: str = config("EMAIL_FROM", default="info@cafesansfil.com", cast=str)
+    # Emails are queued in the outbox and sent in the background, through
+    # "sendgrid" or "memory" (kept in memory, for development and tests)
+    EMAIL_TRANSPORT: str = config("EMAIL_TRANSPORT", default="sendgrid", cast=str)
+    EMAIL_WORKER_ENABLED: bool = config("EMAIL_WORKER_ENABLED", default=True, cast=bool)
+    EMAIL_BATCH_SIZE: int = config("EMAIL_BATCH_SIZE", default=20, cast=int)
+    # Seconds between checks for due retries (new emails wake the worker)
+    EMAIL_POLL_INTERVAL: int = config("EMAIL_POLL_INTERVAL", default=10, cast=int)
+    # Attempts before an email is dead-lettered, retried after a delay in
+    # seconds doubling up to the max
+    EMAIL_MAX_ATTEMPTS: int = config("EMAIL_MAX_ATTEMPTS", default=6, cast=int)
+    EMAIL_RETRY_DELAY: int = config("EMAIL_RETRY_DELAY", default=30, cast=int)
+    EMAIL_RETRY_MAX_DELAY: int = config("EMAIL_RETRY_MAX_DELAY", default=3600, cast=int)
+    # Days sent and dead emails are kept in the outbox
+    EMAIL_RETENTION_DAYS: int = config("EMAIL_RETENTION_DAYS", default=7, cast=int)
     # Disable email sending because of Render blocking SMTP requests
     # MAIL_USERNAME: str = config("MAIL_USERNAME", cast=str)
     # MAIL_PASSWORD: str = config("MAIL_PASSWORD", cast=str)
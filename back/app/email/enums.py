@@ -0,0 +1,14 @@
+"""
+Module for handling email-related enumerations
+"""
+
+from enum import Enum
+
+
+class EmailStatus(str, Enum):
+    """Outbox email status enumeration."""
+
+    PENDING = "PENDING"  # Waiting for a (first or next) attempt
+    SENDING = "SENDING"  # Claimed by a worker
+    SENT = "SENT"
+    DEAD = "DEAD"  # Given up after the last attempt
@@ -0,0 +1,46 @@
+"""
+Module for handling email-related models.
+"""
+
+from datetime import UTC, datetime
+from typing import Optional
+
+import pymongo
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+from app.email.enums import EmailStatus
+
+
+class OutboxEmail(Document):
+    """Email waiting in the outbox, sent by the email worker."""
+
+    to: str
+    subject: str
+    html_content: str
+    status: EmailStatus = EmailStatus.PENDING
+    attempts: int = 0
+    # Next attempt, or end of the claim while sending
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    claim: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    sent_at: Optional[datetime] = None
+    # Set once sent or dead, for the TTL index
+    expires_at: Optional[datetime] = None
+
+    class Settings:
+        """Settings for outbox email document."""
+
+        name = "email_outbox"
+        indexes = [
+            IndexModel(
+                [
+                    ("status", pymongo.ASCENDING),
+                    ("next_attempt_at", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel([("claim", pymongo.ASCENDING)]),
+            IndexModel([("expires_at", pymongo.ASCENDING)], expireAfterSeconds=0),
+        ]
@@ -5,12 +5,10 @@ Module for sending emails.
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import From, Mail
 
-from app.config import settings
+from app.email.models import OutboxEmail
+from app.email.worker import email_worker
 
-sg_client = SendGridAPIClient(settings.SENDGRID_API_KEY)
 template_env = Environment(
     loader=FileSystemLoader(Path(__file__).parent / "templates"),
     autoescape=select_autoescape(["html", "xml"]),
@@ -18,7 +16,7 @@ template_env = Environment(
 
 
 class EmailService:
-    """Service for sending emails."""
+    """Service for sending emails, queued in the outbox."""
 
     @staticmethod
     async def is_test_email(email: str) -> bool:
@@ -27,53 +25,45 @@ class EmailService:
         domain = email.split("@")[-1]
         return domain in test_domains
 
+    @staticmethod
+    async def enqueue(
+        to: str, subject: str, template_name: str, **context
+    ) -> OutboxEmail:
+        """Render an email and queue it, to be sent by the email worker."""
+        template = template_env.get_template(template_name)
+        email = OutboxEmail(
+            to=to, subject=subject, html_content=template.render(**context)
+        )
+        await email.insert()
+        email_worker.notify()
+        return email
+
     @staticmethod
     async def send_welcome_email(user_email: str, user_name: str):
         """Send a welcome email to a new user."""
-        try:
-            template = template_env.get_template("auth/welcome.html")
-            html_content = template.render(user={"name": user_name})
-
-            message = Mail(
-                from_email=From("info@cafesansfil.com"),
-                to_emails=user_email,
-                subject="Welcome to our service",
-                html_content=html_content,
-            )
-            sg_client.send(message)
-        except Exception as e:
-            raise Exception(f"Failed to send welcome email: {str(e)}")
+        await EmailService.enqueue(
+            user_email,
+            "Welcome to our service",
+            "auth/welcome.html",
+            user={"name": user_name},
+        )
 
     @staticmethod
     async def send_password_reset(user_email: str, reset_link: str):
         """Send a password reset email to a user."""
-        try:
-            template = template_env.get_template("auth/password_reset.html")
-            html_content = template.render(reset_link=reset_link)
-
-            message = Mail(
-                from_email=From("info@cafesansfil.com"),
-                to_emails=user_email,
-                subject="Password Reset Request",
-                html_content=html_content,
-            )
-            sg_client.send(message)
-        except Exception as e:
-            raise Exception(f"Failed to send password reset email: {str(e)}")
+        await EmailService.enqueue(
+            user_email,
+            "Password Reset Request",
+            "auth/password_reset.html",
+            reset_link=reset_link,
+        )
 
     @staticmethod
     async def send_verification_email(user_email: str, verification_link: str):
         """Send a verification email to a new user."""
-        try:
-            template = template_env.get_template("auth/verification.html")
-            html_content = template.render(verification_link=verification_link)
-
-            message = Mail(
-                from_email=From("info@cafesansfil.com"),
-                to_emails=user_email,
-                subject="Verify your email",
-                html_content=html_content,
-            )
-            sg_client.send(message)
-        except Exception as e:
-            raise Exception(f"Failed to send verification email: {str(e)}")
+        await EmailService.enqueue(
+            user_email,
+            "Verify your email",
+            "auth/verification.html",
+            verification_link=verification_link,
+        )
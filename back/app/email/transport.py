@@ -0,0 +1,58 @@
+"""
+Module for handling email transports.
+"""
+
+import asyncio
+from typing import List, Protocol
+
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import From, Mail
+
+from app.config import settings
+from app.email.models import OutboxEmail
+
+
+class EmailTransport(Protocol):
+    """Transport delivering an email, raising if it could not."""
+
+    async def send(self, email: OutboxEmail) -> None: ...
+
+
+class SendGridTransport:
+    """Transport sending emails through the SendGrid API."""
+
+    def __init__(self, api_key: str, from_email: str):
+        """Initialize the transport"""
+        self.client = SendGridAPIClient(api_key)
+        self.from_email = from_email
+
+    async def send(self, email: OutboxEmail) -> None:
+        """Send an email, in a thread as the SendGrid client blocks."""
+        message = Mail(
+            from_email=From(self.from_email),
+            to_emails=email.to,
+            subject=email.subject,
+            html_content=email.html_content,
+        )
+        response = await asyncio.to_thread(self.client.send, message)
+        if response.status_code >= 300:
+            raise RuntimeError(f"SendGrid responded {response.status_code}")
+
+
+class MemoryTransport:
+    """Transport keeping emails in memory, for development and tests."""
+
+    def __init__(self):
+        """Initialize the transport"""
+        self.sent: List[OutboxEmail] = []
+
+    async def send(self, email: OutboxEmail) -> None:
+        """Keep an email."""
+        self.sent.append(email)
+
+
+def get_transport() -> EmailTransport:
+    """Get the transport configured by EMAIL_TRANSPORT."""
+    if settings.EMAIL_TRANSPORT == "memory":
+        return MemoryTransport()
+    return SendGridTransport(settings.SENDGRID_API_KEY, settings.EMAIL_FROM)
@@ -0,0 +1,186 @@
+"""
+Module for sending the outbox emails in the background.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.email.enums import EmailStatus
+from app.email.models import OutboxEmail
+from app.email.transport import EmailTransport, get_transport
+
+# Time for a worker to send a claimed batch, before others may claim it
+CLAIM_DURATION = timedelta(minutes=5)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Get the exponential backoff before the next attempt."""
+    seconds = settings.EMAIL_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_RETRY_MAX_DELAY))
+
+
+def outcome(
+    email: OutboxEmail, error: Optional[Exception], now: datetime
+) -> Dict[str, Any]:
+    """
+    Get the fields recording the outcome of an attempt, counted at claim.
+
+    Sent emails lose their content, which may hold live links, and sent or
+    dead emails expire after EMAIL_RETENTION_DAYS.
+    """
+    if error is None:
+        return {
+            "status": EmailStatus.SENT,
+            "sent_at": now,
+            "html_content": "",
+            "claim": None,
+            "expires_at": now + timedelta(days=settings.EMAIL_RETENTION_DAYS),
+        }
+    if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        return dead_letter(error, now)
+    return {
+        "status": EmailStatus.PENDING,
+        "next_attempt_at": now + retry_delay(email.attempts),
+        "last_error": str(error),
+        "claim": None,
+    }
+
+
+def dead_letter(error: Exception, now: datetime) -> Dict[str, Any]:
+    """Get the fields of an email given up after its last attempt."""
+    return {
+        "status": EmailStatus.DEAD,
+        "last_error": str(error),
+        "claim": None,
+        "expires_at": now + timedelta(days=settings.EMAIL_RETENTION_DAYS),
+    }
+
+
+class EmailWorker:
+    """
+    Background worker sending the outbox emails in batches.
+
+    A batch is claimed with a token, so that workers never send the same
+    email concurrently. A claim expires if its worker stops, and the email is
+    then sent again: delivery is at least once. Failed emails are retried
+    with exponential backoff, and marked DEAD after EMAIL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, transport: EmailTransport, batch_size: int):
+        """Initialize the worker"""
+        self.transport = transport
+        self.batch_size = batch_size
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start sending emails"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sending emails"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self) -> None:
+        """Wake the worker up, as an email was queued."""
+        self._wakeup.set()
+
+    async def process_batch(self) -> int:
+        """Send a batch of due emails, returning how many were claimed."""
+        emails = await self._claim()
+        if not emails:
+            return 0
+
+        updates = [
+            UpdateOne({"_id": email.id, "claim": email.claim}, {"$set": fields})
+            for email, fields in zip(emails, await self.send(emails))
+        ]
+        await OutboxEmail.get_motor_collection().bulk_write(updates, ordered=False)
+        return len(emails)
+
+    async def send(self, emails: List[OutboxEmail]) -> List[Dict[str, Any]]:
+        """Send claimed emails concurrently, returning the outcome of each."""
+        results = await asyncio.gather(
+            *(self.transport.send(email) for email in emails),
+            return_exceptions=True,
+        )
+        now = datetime.now(UTC)
+        return [
+            outcome(email, result if isinstance(result, Exception) else None, now)
+            for email, result in zip(emails, results)
+        ]
+
+    async def _claim(self) -> List[OutboxEmail]:
+        """
+        Claim a batch of due emails, including expired claims.
+
+        Claiming counts an attempt, so an email whose sending keeps crashing
+        its worker is given up once its last claim expires.
+        """
+        now = datetime.now(UTC)
+        collection = OutboxEmail.get_motor_collection()
+        await collection.update_many(
+            {
+                "status": EmailStatus.SENDING,
+                "next_attempt_at": {"$lte": now},
+                "attempts": {"$gte": settings.EMAIL_MAX_ATTEMPTS},
+            },
+            {"$set": dead_letter(TimeoutError("The last claim expired."), now)},
+        )
+
+        due = {
+            "status": {"$in": [EmailStatus.PENDING, EmailStatus.SENDING]},
+            "next_attempt_at": {"$lte": now},
+        }
+        ids = [
+            email["_id"]
+            async for email in collection.find(due, {"_id": 1})
+            .sort("next_attempt_at", 1)
+            .limit(self.batch_size)
+        ]
+        if not ids:
+            return []
+
+        # Emails claimed by another worker meanwhile are no longer due
+        claim = uuid4().hex
+        await collection.update_many(
+            {"_id": {"$in": ids}, **due},
+            {
+                "$set": {
+                    "status": EmailStatus.SENDING,
+                    "claim": claim,
+                    "next_attempt_at": now + CLAIM_DURATION,
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        return await OutboxEmail.find({"claim": claim}).to_list()
+
+    async def _run(self):
+        """Send due emails until stopped, polling and on notification."""
+        while True:
+            try:
+                while await self.process_batch() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Email worker error: {e}")
+
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.EMAIL_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+email_worker = EmailWorker(get_transport(), batch_size=settings.EMAIL_BATCH_SIZE)
@@ -6,22 +6,27 @@ from typing import Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from fastapi_pagination.links import Page
 
 from app.auth.dependencies import get_current_user, get_current_user_optional
-from app.event.models import EventAggregateOut, EventCreate, EventOut, EventUpdate
+from app.event.models import (
+    Event,
+    EventAggregateOut,
+    EventCreate,
+    EventOut,
+    EventUpdate,
+)
 from app.event.service import EventService
+from app.interaction.service import InteractionService
 from app.models import ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 from app.user.models import User
 
 T = TypeVar("T")
 
 
-class EventParams(Params):
+class EventParams(CursorParams):
     """Custom pagination parameters."""
 
     size: int = Query(20, ge=1, le=100, description="Page size")
@@ -37,6 +42,13 @@ EventPage = CustomizedPage[
     UseParams(EventParams),
 ]
 
+event_filter = QueryFilter(
+    Event,
+    filters=["cafe_ids", "start_date"],
+    sorts=["start_date"],
+    aliases={"cafe_id": "cafe_ids"},
+)
+
 
 event_router = APIRouter()
 
@@ -50,14 +62,14 @@ async def list_events(
     current_user: User = Depends(get_current_user_optional),
 ):
     """Get a list of events."""
-    filters = parse_query_params(dict(request.query_params))
-    events = await EventService.get_all(
-        to_list=False,
-        aggregate=True,
-        current_user_id=current_user.id if current_user else None,
-        **filters,
+    filters = event_filter.compile(request.query_params)
+    events = await EventService.get_all(to_list=False, aggregate=True, **filters)
+    return await paginate(
+        events,
+        transformer=lambda items: InteractionService.apply_user_interactions(
+            items, current_user.id if current_user else None
+        ),
     )
-    return await paginate(events)
 
 @event_router.get(
     "/events/{id}",
@@ -68,16 +80,15 @@ async def get_event(
     current_user: User = Depends(get_current_user_optional),
 ):
     """Get an event with full details"""
-    event = await EventService.get(
-        id,
-        aggregate=True,
-        current_user_id=current_user.id if current_user else None,
-    )
+    event = await EventService.get(id, aggregate=True)
     if not event:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=[{"msg": "An event with this id does not exist"}],
         )
+
+    if current_user:
+        await InteractionService.apply_user_interactions([event], current_user.id)
     return event
 
 @event_router.get(
@@ -89,14 +100,19 @@ async def get_events_for_user(
     current_user: User = Depends(get_current_user),
 ):
     """Get events created by current user with full details"""
-    filters = parse_query_params(dict(request.query_params))
+    filters = event_filter.compile(request.query_params)
     events = await EventService.get_all_for_user(
         to_list=False,
         aggregate=True,
         current_user_id=current_user.id,
         **filters,
     )
-    return await paginate(events)
+    return await paginate(
+        events,
+        transformer=lambda items: InteractionService.apply_user_interactions(
+            items, current_user.id
+        ),
+    )
 
 @event_router.post(
     "/events/",
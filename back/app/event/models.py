@@ -7,8 +7,9 @@ from typing import List, Optional
 
 from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field, HttpUrl
+from pymongo import ASCENDING, IndexModel
 
-from app.interaction.models import InteractionOut
+from app.interaction.models import InteractionCounts, InteractionOut
 from app.models import Id
 from app.user.models import UserOut
 
@@ -35,7 +36,7 @@ class EventBase(BaseModel):
     max_support: Optional[int] = 3
 
 
-class Event(Document, EventBase):
+class Event(Document, EventBase, InteractionCounts):
     """Event document model."""
 
     cafe_ids: List[PydanticObjectId] = []
@@ -46,6 +47,10 @@ class Event(Document, EventBase):
         """Settings for event document."""
 
         name = "events"
+        indexes = [
+            IndexModel([("start_date", ASCENDING)]),
+            IndexModel([("cafe_ids", ASCENDING), ("start_date", ASCENDING)]),
+        ]
 
 
 class EventCreate(EventBase):
@@ -9,7 +9,11 @@ from beanie.odm.queries.find import AggregationQuery, FindMany
 from pymongo import ASCENDING, DESCENDING
 
 from app.event.models import Event, EventCreate, EventUpdate
-from app.service import set_attributes
+from app.service import (
+    interaction_counts_expression,
+    set_attributes,
+    update_fields,
+)
 from app.user.models import User
 
 
@@ -21,7 +25,6 @@ class EventService:
     async def get_all(
         to_list: Literal[True] = True,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> List[Event]: ...
 
@@ -30,7 +33,6 @@ class EventService:
     async def get_all(
         to_list: Literal[False] = False,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> FindMany[Event]: ...
 
@@ -39,7 +41,6 @@ class EventService:
     async def get_all(
         to_list: Literal[True] = True,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> List[dict]: ...
 
@@ -48,7 +49,6 @@ class EventService:
     async def get_all(
         to_list: Literal[False] = False,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> AggregationQuery[dict]: ...
 
@@ -56,7 +56,6 @@ class EventService:
     async def get_all(
         to_list: bool = True,
         aggregate: bool = False,
-        current_user_id: Optional[PydanticObjectId] = None,
         **filters: dict,
     ) -> Union[List[Event], FindMany[Event], List[dict], AggregationQuery[dict]]:
         """Get events."""
@@ -66,7 +65,6 @@ class EventService:
             pipeline = EventService._build_pipeline(
                 filters=filters,
                 sort_by=sort_by,
-                current_user_id=current_user_id,
             )
             query = Event.aggregate(pipeline)
             return await query.to_list() if to_list else query
@@ -97,7 +95,6 @@ class EventService:
             pipeline = EventService._build_pipeline(
                 filters=user_filter,
                 sort_by=sort_by,
-                current_user_id=current_user_id,
             )
             query = Event.aggregate(pipeline)
             return await query.to_list() if to_list else query
@@ -110,7 +107,6 @@ class EventService:
     async def get(
         id: PydanticObjectId,
         aggregate: Literal[False] = False,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> Optional[Event]: ...
 
     @overload
@@ -118,14 +114,12 @@ class EventService:
     async def get(
         id: PydanticObjectId,
         aggregate: Literal[True] = True,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> Optional[dict]: ...
 
     @staticmethod
     async def get(
         id: PydanticObjectId,
         aggregate: bool = False,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> Union[Optional[Event], Optional[dict]]:
         """Get an event by ID."""
         if not aggregate:
@@ -181,8 +175,8 @@ class EventService:
         data: EventUpdate,
     ) -> Event:
         """Update an event."""
-        set_attributes(event, data)
-        await event.save()
+        previous = set_attributes(event, data)
+        await update_fields(event, previous)
         return event
 
     @staticmethod
@@ -196,7 +190,6 @@ class EventService:
         filters: Optional[dict] = None,
         sort_by: Optional[str] = None,
         event_id: Optional[PydanticObjectId] = None,
-        current_user_id: Optional[PydanticObjectId] = None,
     ) -> list:
         """Build aggregation pipeline."""
         pipeline = []
@@ -207,6 +200,12 @@ class EventService:
         elif filters:
             pipeline.append({"$match": filters})
 
+        # Sorting, before the lookups so pages can be cut early
+        if sort_by and not event_id:
+            direction = DESCENDING if sort_by.startswith("-") else ASCENDING
+            field = sort_by.lstrip("-")
+            pipeline.append({"$sort": {field: direction}})
+
         # Cafes lookup
         pipeline.extend(
             [
@@ -288,85 +287,22 @@ class EventService:
         )
 
         # Interaction
-        pipeline.extend(
-            [
-                {
-                    "$lookup": {
-                        "from": "interactions",
-                        "localField": "_id",
-                        "foreignField": "event_id",
-                        "as": "all_interactions",
-                    }
-                },
-                {
-                    "$addFields": {
-                        "interactions": {
-                            "$map": {
-                                "input": {"$setUnion": "$all_interactions.type"},
-                                "as": "type",
-                                "in": {
-                                    "type": "$$type",
-                                    "count": {
-                                        "$size": {
-                                            "$filter": {
-                                                "input": "$all_interactions",
-                                                "as": "ia",
-                                                "cond": {
-                                                    "$eq": ["$$ia.type", "$$type"]
-                                                },
-                                            }
-                                        }
-                                    },
-                                    "me": {
-                                        "$cond": [
-                                            {"$ifNull": [current_user_id, False]},
-                                            {
-                                                "$anyElementTrue": {
-                                                    "$map": {
-                                                        "input": "$all_interactions",
-                                                        "as": "ia",
-                                                        "in": {
-                                                            "$and": [
-                                                                {
-                                                                    "$eq": [
-                                                                        "$$ia.user_id",
-                                                                        current_user_id,
-                                                                    ]
-                                                                },
-                                                                {
-                                                                    "$eq": [
-                                                                        "$$ia.type",
-                                                                        "$$type",
-                                                                    ]
-                                                                },
-                                                            ]
-                                                        },
-                                                    }
-                                                }
-                                            },
-                                            False,
-                                        ]
-                                    },
-                                },
-                            }
-                        }
-                    }
-                },
-            ]
+        pipeline.append(
+            {
+                "$addFields": {
+                    "interactions": interaction_counts_expression(
+                        "$interaction_counts"
+                    )
+                }
+            }
         )
 
         # Projection
         pipeline.extend(
             [
                 {"$addFields": {"id": "$_id"}},
-                {"$unset": ["_id", "cafe_ids", "creator_id", "all_interactions"]},
+                {"$unset": ["_id", "cafe_ids", "creator_id", "interaction_counts"]},
             ]
         )
 
-        # Sorting
-        if sort_by and not event_id:
-            direction = DESCENDING if sort_by.startswith("-") else ASCENDING
-            field = sort_by.lstrip("-")
-            pipeline.append({"$sort": {field: direction}})
-
         return pipeline
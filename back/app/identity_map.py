@@ -0,0 +1,98 @@
+"""
+Module for handling the request-scoped identity map.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from beanie import PydanticObjectId
+from fastapi import Request
+
+from app.cafe.models import Cafe
+from app.cafe.service import CafeService
+from app.config import settings
+from app.user.models import User
+from app.user.service import UserService
+
+# Methods reading documents, which may come from the process-wide caches
+SAFE_METHODS = ["GET", "HEAD", "OPTIONS"]
+
+
+class IdentityMap:
+    """
+    Cache of the documents loaded during a request, by model and key.
+
+    With `cached`, cafes and users come from the process-wide caches, which
+    may be stale when another worker changed them. Requests that write load
+    them from the database instead.
+    """
+
+    def __init__(self, cached: bool = True):
+        """Initialize the identity map"""
+        self.cached = cached
+        self._documents: Dict[Tuple[str, Hashable], Any] = {}
+
+    async def get(
+        self,
+        model: type,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Get a document, loading it on first access."""
+        cache_key = (model.__name__, str(key))
+        if cache_key not in self._documents:
+            document = await loader()
+            self._documents[cache_key] = document
+            if document is not None:
+                self.add(document)
+        return self._documents[cache_key]
+
+    def add(self, document: Any, *keys: Hashable) -> None:
+        """Register a document under its ID and additional keys."""
+        model = type(document).__name__
+        for key in (document.id, *keys):
+            self._documents[(model, str(key))] = document
+
+    def discard(self, model: type, key: Hashable) -> None:
+        """Forget the document registered under a key."""
+        self._documents.pop((model.__name__, str(key)), None)
+
+    async def get_cafe(self, cafe_slug_or_id: str) -> Optional[Cafe]:
+        """Get a cafe by slug or ID."""
+        return await self.get(
+            Cafe,
+            cafe_slug_or_id,
+            lambda: CafeService.get(cafe_slug_or_id, cached=self.cached),
+        )
+
+    async def get_roles(self, cafe_slug_or_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get the roles of a cafe by user ID, or None if the cafe does not exist.
+
+        The cafe is shared with the rest of the request. Unless other workers
+        invalidate the caches, it is loaded from the database, as a cached
+        cafe may still list revoked staff.
+        """
+        roles = CafeService.get_cached_roles(cafe_slug_or_id)
+        if roles is not None:
+            return roles
+
+        cached = self.cached and settings.CAFE_CACHE_INVALIDATION == "change_stream"
+        cafe = await self.get(
+            Cafe,
+            cafe_slug_or_id,
+            lambda: CafeService.get(cafe_slug_or_id, cached=cached),
+        )
+        return CafeService.get_roles(cafe, cafe_slug_or_id) if cafe else None
+
+    async def get_user(self, id: PydanticObjectId) -> Optional[User]:
+        """Get an active user by ID."""
+        return await self.get(
+            User, id, lambda: UserService.get_principal(id, cached=self.cached)
+        )
+
+
+def get_identity_map(request: Request) -> IdentityMap:
+    """Get the identity map of the current request."""
+    if not hasattr(request.state, "identity_map"):
+        request.state.identity_map = IdentityMap(cached=request.method in SAFE_METHODS)
+    return request.state.identity_map
@@ -6,10 +6,7 @@ from typing import Literal, Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from fastapi_pagination.links import Page
 
 from app.auth.dependencies import get_current_user
 from app.cafe.announcement.service import AnnouncementService
@@ -17,17 +14,21 @@ from app.cafe.service import CafeService
 from app.menu.item.service import ItemService
 from app.event.service import EventService
 from app.interaction.enums import InteractionType
+from app.interaction.models import Interaction
 from app.interaction.service import InteractionService
 from app.models import ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CountStrategy, CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 from app.user.models import UserOut
 
 T = TypeVar("T")
 
 
-class InteractionParams(Params):
+class InteractionParams(CursorParams):
     """Custom pagination parameters."""
 
+    count_strategy = CountStrategy.CACHED
+
     size: int = Query(20, ge=1, le=100, description="Page size")
     page: int = Query(1, ge=1, description="Page number")
 
@@ -37,6 +38,8 @@ InteractionPage = CustomizedPage[
     UseParams(InteractionParams),
 ]
 
+interaction_filter = QueryFilter(Interaction, scope=["target_id", "type"])
+
 
 interaction_router = APIRouter()
 
@@ -60,8 +63,8 @@ async def list_item_interactions(
             detail=[{"msg": "An item with this ID does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
-    filters["item_id"] = item.id
+    filters = interaction_filter.compile(request.query_params)
+    filters["target_id"] = item.id
     filters["type"] = interaction.upper()
 
     items = await InteractionService.get_all(to_list=False, **filters)
@@ -88,8 +91,8 @@ async def list_announcement_interactions(
             detail=[{"msg": "An announcement with this ID does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
-    filters["announcement_id"] = id
+    filters = interaction_filter.compile(request.query_params)
+    filters["target_id"] = id
     filters["type"] = interaction.upper()
 
     announcement = await InteractionService.get_all(to_list=False, **filters)
@@ -115,8 +118,8 @@ async def list_event_interactions(
             detail=[{"msg": "An event with this ID does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
-    filters["event_id"] = id
+    filters = interaction_filter.compile(request.query_params)
+    filters["target_id"] = id
     filters["type"] = interaction.upper()
 
     events = await InteractionService.get_all(to_list=False, **filters)
@@ -141,8 +144,8 @@ async def list_cafe_interactions(
             detail=[{"msg": "A cafe with this ID does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
-    filters["cafe_id"] = id
+    filters = interaction_filter.compile(request.query_params)
+    filters["target_id"] = id
     filters["type"] = interaction.upper()
 
     cafes = await InteractionService.get_all(to_list=False, **filters)
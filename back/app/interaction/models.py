@@ -3,7 +3,7 @@ Module for handling interaction-related models.
 """
 
 from datetime import UTC, datetime
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
@@ -34,9 +34,24 @@ class Interaction(Document):
             IndexModel([("user_id", 1), ("item_id", 1), ("type", 1)]),
             IndexModel([("user_id", 1), ("announcement_id", 1), ("type", 1)]),
             IndexModel([("user_id", 1), ("event_id", 1), ("type", 1)]),
+            IndexModel([("user_id", 1), ("target_id", 1), ("type", 1)], unique=True),
+            IndexModel([("target_id", 1), ("type", 1), ("_id", 1)]),
         ]
 
 
+class InteractionCounts:
+    """Model for denormalized interaction counts, keyed by interaction type."""
+
+    interaction_counts: Dict[str, int] = {}
+
+
+class InteractionTargetOut(BaseModel):
+    """Model for the target and type of an interaction."""
+
+    target_id: PydanticObjectId
+    type: InteractionType
+
+
 class InteractionOut(BaseModel):
     """Model for interaction output."""
 
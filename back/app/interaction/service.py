@@ -2,22 +2,34 @@
 Module for handling interaction-related operations.
 """
 
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from beanie import PydanticObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from beanie.odm.queries.find import AggregationQuery
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
 
 from app.cafe.announcement.models import Announcement
 from app.cafe.models import Cafe
+from app.cafe.service import CafeService
 from app.menu.item.models import MenuItem
 from app.event.models import Event
 from app.interaction.models import (
     Interaction,
+    InteractionTargetOut,
     InteractionType,
     TargetType,
 )
+from app.search.suggest import suggestion_index
 from app.user.models import User
 
+# Targets storing denormalized interaction counts
+COUNTED_TARGETS = {
+    TargetType.ITEM: MenuItem,
+    TargetType.EVENT: Event,
+    TargetType.ANNOUNCEMENT: Announcement,
+}
+
 
 class InteractionService:
     """Service for handling interaction-related operations."""
@@ -30,6 +42,7 @@ class InteractionService:
         """Get users who interacted using a single aggregation query."""
         pipeline = [
             {"$match": filters},
+            {"$sort": {"_id": DESCENDING}},
             {
                 "$lookup": {
                     "from": "users",
@@ -39,17 +52,16 @@ class InteractionService:
                 }
             },
             {"$unwind": "$user"},
-            {"$group": {"_id": "$user._id", "user": {"$first": "$user"}}},
-            {"$replaceRoot": {"newRoot": "$user"}},
             {
                 "$project": {
-                    "id": {"$toString": "$_id"},
-                    "username": 1,
-                    "email": 1,
-                    "first_name": 1,
-                    "last_name": 1,
-                    "photo_url": 1,
-                    "_id": 0,
+                    # Interaction ID, kept for cursors
+                    "_id": 1,
+                    "id": "$user._id",
+                    "username": "$user.username",
+                    "email": "$user.email",
+                    "first_name": "$user.first_name",
+                    "last_name": "$user.last_name",
+                    "photo_url": "$user.photo_url",
                 }
             },
         ]
@@ -62,12 +74,43 @@ class InteractionService:
         user: User,
         type: InteractionType,
         item: MenuItem = None,
+        cafe: Cafe = None,
+        event: Event = None,
+        announcement: Announcement = None,
     ) -> Interaction:
         """Get an interaction."""
+        target_id, _ = InteractionService._get_target(item, cafe, event, announcement)
         return await Interaction.find_one(
-            {"user_id": user.id, "target_id": item.id, "type": type}
+            {"user_id": user.id, "target_id": target_id, "type": type}
         )
 
+    @staticmethod
+    async def apply_user_interactions(
+        targets: List[Dict[str, Any]],
+        user_id: Optional[PydanticObjectId],
+    ) -> List[Dict[str, Any]]:
+        """Set the `me` flags of aggregated targets for a user with one query."""
+        if not user_id or not targets:
+            return targets
+
+        interactions = await Interaction.find(
+            {"user_id": user_id, "target_id": {"$in": [t["id"] for t in targets]}},
+            projection_model=InteractionTargetOut,
+        ).to_list()
+
+        user_types: Dict[PydanticObjectId, Set[str]] = {}
+        for interaction in interactions:
+            user_types.setdefault(interaction.target_id, set()).add(
+                interaction.type.value
+            )
+
+        for target in targets:
+            types = user_types.get(target["id"], set())
+            for interaction in target.get("interactions", []):
+                interaction["me"] = interaction["type"] in types
+
+        return targets
+
     @staticmethod
     async def create(
         user: User,
@@ -77,72 +120,54 @@ class InteractionService:
         event: Event = None,
         announcement: Announcement = None,
     ) -> None:
-        """Create an interaction."""
-        if item:
-            await InteractionService._handle_mutual_exclusivity(
-                user,
-                item.id,
-                ItemInteraction,
-                "item_id",
-                type,
-            )
-
-            interaction = ItemInteraction(
-                user_id=user.id,
-                item_id=item.id,
-                type=type,
-            )
-            await interaction.insert()
-        if announcement:
-            await InteractionService._handle_mutual_exclusivity(
-                user,
-                announcement.id,
-                AnnouncementInteraction,
-                "announcement_id",
-                type,
-            )
-
-            interaction = AnnouncementInteraction(
-                user_id=user.id,
-                announcement_id=announcement.id,
-                type=type,
-            )
-            await interaction.insert()
-        if event:
-            await InteractionService._handle_mutual_exclusivity(
-                user,
-                event.id,
-                EventInteraction,
-                "event_id",
-                type,
-            )
-
-            interaction = EventInteraction(
-                user_id=user.id,
-                event_id=event.id,
-                type=type,
-            )
-            await interaction.insert()
-        if cafe:
-            await InteractionService._handle_mutual_exclusivity(
-                user,
-                cafe.id,
-                EventInteraction,
-                "cafe_id",
-                type,
-            )
+        """Create an interaction, unless it already exists."""
+        target_id, target_type = InteractionService._get_target(
+            item, cafe, event, announcement
+        )
+        await InteractionService._handle_mutual_exclusivity(
+            user, target_id, target_type, type
+        )
 
-            interaction = EventInteraction(
-                user_id=user.id,
-                event_id=event.id,
-                type=type,
-            )
+        interaction = Interaction(
+            user_id=user.id,
+            target_id=target_id,
+            target_type=target_type,
+            type=type,
+        )
+        try:
             await interaction.insert()
+        except DuplicateKeyError:
+            # Created concurrently, and already counted
+            return
+        await InteractionService._increment_count(target_id, target_type, type, 1)
 
     @staticmethod
     async def delete(interaction: Interaction) -> None:
-        """Delete an interaction."""
-        await interaction.delete()
+        """Delete an interaction, unless it was already deleted."""
+        result = await Interaction.find_one({"_id": interaction.id}).delete()
+        if not result or not result.deleted_count:
+            return
+        await InteractionService._increment_count(
+            interaction.target_id, interaction.target_type, interaction.type, -1
+        )
+
+    @staticmethod
+    def _get_target(
+        item: MenuItem = None,
+        cafe: Cafe = None,
+        event: Event = None,
+        announcement: Announcement = None,
+    ) -> Tuple[PydanticObjectId, TargetType]:
+        """Get the ID and type of the interaction target."""
+        if item:
+            return item.id, TargetType.ITEM
+        if announcement:
+            return announcement.id, TargetType.ANNOUNCEMENT
+        if event:
+            return event.id, TargetType.EVENT
+        if cafe:
+            return cafe.id, TargetType.CAFE
+        raise ValueError("An interaction target is required.")
 
     @staticmethod
     async def _get_opposite_type(
@@ -157,17 +182,86 @@ class InteractionService:
     @staticmethod
     async def _handle_mutual_exclusivity(
         user: User,
-        entity_id: PydanticObjectId,
-        model: type[Interaction],
-        id_field: str,
+        target_id: PydanticObjectId,
+        target_type: TargetType,
         interaction_type: InteractionType,
     ) -> None:
         """Handle mutually exclusive reactions."""
         opposite_type = await InteractionService._get_opposite_type(interaction_type)
 
         if opposite_type:
-            opposite_interaction = await model.find_one(
-                {id_field: entity_id, "user_id": user.id, "type": opposite_type}
-            )
-            if opposite_interaction:
-                await opposite_interaction.delete()
+            result = await Interaction.find(
+                {"target_id": target_id, "user_id": user.id, "type": opposite_type}
+            ).delete()
+            if result and result.deleted_count:
+                await InteractionService._increment_count(
+                    target_id,
+                    target_type,
+                    opposite_type,
+                    -result.deleted_count,
+                )
+
+    @staticmethod
+    async def _increment_count(
+        target_id: PydanticObjectId,
+        target_type: TargetType,
+        interaction_type: InteractionType,
+        amount: int,
+    ) -> None:
+        """
+        Atomically adjust the interaction count stored on a target. For a
+        menu item, also adjust it in the detail document of its cafe, and
+        its likes in the suggestion ranking.
+        """
+        model = COUNTED_TARGETS.get(target_type)
+        if not model:
+            return
+
+        field = f"interaction_counts.{interaction_type.value}"
+        filters = {"_id": target_id}
+        if amount < 0:
+            filters[field] = {"$gte": -amount}
+        target = await model.find_one(filters).update(
+            {"$inc": {field: amount}}, response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        if not target or target_type != TargetType.ITEM:
+            return
+
+        await CafeService.increment_view_interactions(
+            target.cafe_id, target_id, interaction_type.value, amount
+        )
+        if interaction_type == InteractionType.LIKE:
+            await suggestion_index.add_items(target)
+
+    @staticmethod
+    async def reconcile_counts(target_type: Optional[TargetType] = None) -> None:
+        """Rebuild the interaction counts of targets from the interactions."""
+        for counted_type, model in COUNTED_TARGETS.items():
+            if target_type and target_type != counted_type:
+                continue
+
+            pipeline = [
+                {
+                    "$lookup": {
+                        "from": Interaction.get_collection_name(),
+                        "localField": "_id",
+                        "foreignField": "target_id",
+                        "pipeline": [
+                            {"$match": {"target_type": counted_type.value}},
+                            {"$group": {"_id": "$type", "count": {"$sum": 1}}},
+                            {"$project": {"_id": 0, "k": "$_id", "v": "$count"}},
+                        ],
+                        "as": "counts",
+                    }
+                },
+                {"$project": {"interaction_counts": {"$arrayToObject": "$counts"}}},
+                {
+                    "$merge": {
+                        "into": model.get_collection_name(),
+                        "on": "_id",
+                        "whenMatched": "merge",
+                        "whenNotMatched": "discard",
+                    }
+                },
+            ]
+            await model.aggregate(pipeline).to_list()
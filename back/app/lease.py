@@ -0,0 +1,54 @@
+"""
+Module for handling leases, used to elect a single worker for a job.
+"""
+
+import os
+import socket
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
+
+# Identifies this process among the workers competing for a lease
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+class Lease(Document):
+    """Lease document model."""
+
+    name: str
+    owner: str
+    expires_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        """Settings for lease document."""
+
+        name = "leases"
+        indexes = [IndexModel([("name", 1)], unique=True)]
+
+    @staticmethod
+    async def acquire(name: str, duration: timedelta, owner: str = WORKER_ID) -> bool:
+        """Acquire or renew a lease, returning whether this owner holds it."""
+        now = datetime.now(UTC)
+        try:
+            await Lease.find_one(
+                {
+                    "name": name,
+                    "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}],
+                }
+            ).update(
+                {"$set": {"owner": owner, "expires_at": now + duration}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Held by another owner
+            return False
+        return True
+
+    @staticmethod
+    async def release(name: str, owner: str = WORKER_ID) -> None:
+        """Release a lease held by this owner."""
+        await Lease.find_one({"name": name, "owner": owner}).delete()
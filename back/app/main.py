@@ -10,16 +10,28 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi_pagination import add_pagination
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.cafe.models import Cafe
+from app.auth.hashing import password_hasher
+from app.auth.models import PasswordHashCost
+from app.cafe.cache import cafe_cache
+from app.cafe.models import Cafe, CafeView
 from app.cafe.announcement.models import Announcement
 from app.cafe.stock.stock_model import Stock
 from app.menu.item.models import MenuItem
-from app.order.models import Order
+from app.order.models import Order, OrderCounter
+from app.order.broker import order_broker
+from app.order.scheduler import order_scheduler
 from app.config import settings
+from app.email.models import OutboxEmail
+from app.email.worker import email_worker
 from app.event.models import Event
 from app.interaction.models import Interaction
+from app.lease import Lease
+from app.rate_limit import RateLimitCounter
 from app.notification.models import NotificationMessage, NotificationStatus, NotificationToken, SentNotification
+from app.query_filter import check_query_indexes
 from app.router import router
+from app.search.models import SearchEntry
+from app.search.suggest import suggestion_index
 from app.user.models import User, Diet
 
 description = """
@@ -41,6 +53,7 @@ async def lifespan(app: FastAPI):
         database=db_client[settings.MONGO_DB_NAME],
         document_models=[
             Cafe,
+            CafeView,
             Diet,
             NotificationMessage,
             NotificationStatus,
@@ -50,17 +63,41 @@ async def lifespan(app: FastAPI):
             Stock,
             User,
             Order,
+            OrderCounter,
             Announcement,
             Event,
             Interaction,
+            Lease,
+            OutboxEmail,
+            PasswordHashCost,
+            RateLimitCounter,
+            SearchEntry,
             # Views
             # UserNotification
         ],
         recreate_views=True,
     )
-    # await order_scheduler.start()
+    for problem in check_query_indexes():
+        print(f"Query filter warning: {problem}")
+    if settings.PASSWORD_HASH_ROUNDS == 0:
+        rounds = await password_hasher.calibrate_once(
+            settings.PASSWORD_HASH_TARGET_MS / 1000
+        )
+        print(f"Password hash cost calibrated to {rounds} rounds")
+    if settings.ORDER_SCHEDULER_ENABLED:
+        await order_scheduler.start()
+    await order_broker.start()
+    await cafe_cache.start()
+    if settings.EMAIL_WORKER_ENABLED:
+        await email_worker.start()
+    await suggestion_index.build()
     yield
-    # await order_scheduler.shutdown()
+    await email_worker.stop()
+    await cafe_cache.stop()
+    await order_broker.stop()
+    if settings.ORDER_SCHEDULER_ENABLED:
+        await order_scheduler.shutdown()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
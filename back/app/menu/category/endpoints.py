@@ -7,6 +7,7 @@ from typing import List
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 
+from app.identity_map import IdentityMap, get_identity_map
 from app.menu.category.models import (
     MenuCategoryCreate,
     MenuCategoryOut,
@@ -14,7 +15,6 @@ from app.menu.category.models import (
 )
 from app.menu.category.service import CategoryService
 from app.cafe.permissions import AdminPermission
-from app.cafe.service import CafeService
 from app.models import ErrorResponse
 
 category_router = APIRouter()
@@ -27,9 +27,12 @@ category_router = APIRouter()
         404: {"model": ErrorResponse},
     },
 )
-async def list_categories(slug: str = Path(..., description="Slug of the cafe")):
+async def list_categories(
+    slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
+):
     """Get a list of menu items for a cafe."""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,9 +57,10 @@ async def list_categories(slug: str = Path(..., description="Slug of the cafe"))
 async def create_category(
     data: MenuCategoryCreate,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Create a menu category. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -88,9 +92,10 @@ async def update_category(
     data: MenuCategoryUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the category"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update a menu category. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,9 +131,10 @@ async def update_category(
 async def delete_category(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the category"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Delete a menu category. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
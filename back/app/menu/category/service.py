@@ -5,6 +5,7 @@ Module for handling category-related operations.
 from typing import List
 
 from beanie import PydanticObjectId
+from beanie.odm.utils.encoder import Encoder
 
 from app.menu.category.models import (
     MenuCategory,
@@ -12,6 +13,8 @@ from app.menu.category.models import (
     MenuCategoryUpdate,
 )
 from app.cafe.models import Cafe
+from app.cafe.service import CafeService
+from app.service import update_document
 
 
 class CategoryService:
@@ -48,8 +51,11 @@ class CategoryService:
                 return
 
         category = MenuCategory(**data.model_dump())
+        await update_document(
+            cafe, {"$push": {"menu.categories": Encoder(to_db=True).encode(category)}}
+        )
         cafe.menu.categories.append(category)
-        await cafe.save()
+        await CafeService.refresh_view(cafe.id)
         return category
 
     @staticmethod
@@ -63,8 +69,17 @@ class CategoryService:
             if cat.id == id:
                 category = cat.model_copy(update=data.model_dump(exclude_unset=True))
                 category.id = id
+                await update_document(
+                    cafe,
+                    {
+                        "$set": {
+                            "menu.categories.$": Encoder(to_db=True).encode(category)
+                        }
+                    },
+                    {"menu.categories._id": id},
+                )
                 cafe.menu.categories[idx] = category
-                await cafe.save()
+                await CafeService.refresh_view(cafe.id)
                 return category
 
         raise None
@@ -78,18 +93,28 @@ class CategoryService:
         if len(cafe.menu.categories) == original_len:
             return
 
-        await cafe.save()
+        await update_document(cafe, {"$pull": {"menu.categories": {"_id": id}}})
+        await CafeService.refresh_view(cafe.id)
 
     @staticmethod
     async def create_many(
         cafe: Cafe, datas: List[MenuCategoryCreate]
     ) -> List[MenuCategory]:
         """Create multiple menu categories."""
+        categories = []
         for data in datas:
-            for category in cafe.menu.categories:
+            for category in [*cafe.menu.categories, *categories]:
                 if category.name == data.name:
                     return
-            category = MenuCategory(**data.model_dump())
-            cafe.menu.categories.append(category)
-        await cafe.save()
+            categories.append(MenuCategory(**data.model_dump()))
+        await update_document(
+            cafe,
+            {
+                "$push": {
+                    "menu.categories": {"$each": Encoder(to_db=True).encode(categories)}
+                }
+            },
+        )
+        cafe.menu.categories.extend(categories)
+        await CafeService.refresh_view(cafe.id)
         return cafe.menu.categories
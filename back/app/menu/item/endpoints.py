@@ -6,24 +6,27 @@ from typing import Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from fastapi_pagination.links import Page
 from pymongo.errors import DuplicateKeyError
 
+from app.identity_map import IdentityMap, get_identity_map
 from app.menu.category.service import CategoryService
-from app.menu.item.models import MenuItemCreate, MenuItemOut, MenuItemUpdate
+from app.menu.item.models import (
+    MenuItem,
+    MenuItemCreate,
+    MenuItemOut,
+    MenuItemUpdate,
+)
 from app.menu.item.service import ItemService
 from app.cafe.permissions import AdminPermission, VolunteerPermission
-from app.cafe.service import CafeService
 from app.models import ErrorConflictResponse, ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 
 T = TypeVar("T")
 
 
-class ItemParams(Params):
+class ItemParams(CursorParams):
     """Custom pagination parameters."""
 
     size: int = Query(20, ge=1, le=100, description="Page size")
@@ -37,6 +40,10 @@ ItemPage = CustomizedPage[
     UseParams(ItemParams),
 ]
 
+item_filter = QueryFilter(
+    MenuItem, filters=["in_stock", "category_ids"], sorts=["name"], scope=["cafe_id"]
+)
+
 
 item_router = APIRouter()
 
@@ -51,16 +58,17 @@ item_router = APIRouter()
 async def list_items(
     request: Request,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Get a list of menu items for a cafe."""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=[{"msg": "A cafe with this slug does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
+    filters = item_filter.compile(request.query_params)
     filters["cafe_id"] = cafe.id
 
     items = await ItemService.get_all(to_list=False, **filters)
@@ -81,9 +89,10 @@ async def list_items(
 async def create_item(
     data: MenuItemCreate,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Create a menu item for a cafe. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -128,9 +137,10 @@ async def create_item(
 async def get_item(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the menu item"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Get a menu item."""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,9 +171,10 @@ async def update_item(
     data: MenuItemUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the menu item"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update a menu item. (`VOLUNTEER`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -217,9 +228,10 @@ async def update_item(
 async def delete_item(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the menu item"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Delete a menu item. (`ADMIN`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -249,9 +261,10 @@ async def delete_item(
 async def toggle_item_highlight(
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the menu item"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Toggle the highlighted status of a menu item. (`VOLUNTEER`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
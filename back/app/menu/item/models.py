@@ -9,7 +9,7 @@ from beanie import DecimalAnnotation
 from pydantic import BaseModel, Field, HttpUrl, field_validator
 from pymongo import IndexModel
 
-from app.interaction.models import InteractionOut
+from app.interaction.models import InteractionCounts, InteractionOut
 from app.models import CafeId, CategoryIds, CustomDocument, Id
 
 
@@ -79,7 +79,9 @@ class MenuItemBase(BaseModel):
         return price
 
 
-class MenuItem(CustomDocument, MenuItemBase, CategoryIds, CafeId):
+class MenuItem(
+    CustomDocument, MenuItemBase, CategoryIds, CafeId, InteractionCounts
+):
     """Menu item document model."""
 
     class Settings:
@@ -96,6 +98,20 @@ class MenuItem(CustomDocument, MenuItemBase, CategoryIds, CafeId):
                 [("cafe_id", pymongo.ASCENDING), ("name", pymongo.ASCENDING)],
                 unique=True,
             ),
+            IndexModel(
+                [
+                    ("cafe_id", pymongo.ASCENDING),
+                    ("in_stock", pymongo.ASCENDING),
+                    ("name", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel(
+                [
+                    ("cafe_id", pymongo.ASCENDING),
+                    ("category_ids", pymongo.ASCENDING),
+                    ("name", pymongo.ASCENDING),
+                ]
+            ),
         ]
 
 
@@ -9,7 +9,10 @@ from beanie.odm.queries.find import FindMany
 
 from app.menu.item.models import MenuItem, MenuItemCreate, MenuItemUpdate
 from app.cafe.models import Cafe
-from app.service import set_attributes
+from app.cafe.service import CafeService
+from app.search.service import index_items, unindex
+from app.search.suggest import suggestion_index
+from app.service import set_attributes, update_fields
 
 
 class ItemService:
@@ -46,34 +49,50 @@ class ItemService:
         """Create a new menu item."""
         item = MenuItem(**data.model_dump(), cafe_id=cafe.id)
         await item.insert()
+        await CafeService.refresh_view(cafe.id)
+        await index_items(item)
+        await suggestion_index.add_items(item)
         return item
 
     @staticmethod
     async def update(item: MenuItem, data: MenuItemUpdate) -> MenuItem:
         """Update a menu item."""
-        set_attributes(item, data)
-        await item.save()
+        previous = set_attributes(item, data)
+        await update_fields(item, previous)
+        await CafeService.refresh_view(item.cafe_id)
+        await index_items(item)
+        await suggestion_index.add_items(item)
         return item
 
     @staticmethod
     async def delete(item: MenuItem) -> None:
         """Delete a menu item."""
         await item.delete()
+        await CafeService.refresh_view(item.cafe_id)
+        await unindex(item.id)
+        suggestion_index.remove(item.id)
 
     @staticmethod
     async def toggle_highlighted(item: MenuItem) -> MenuItem:
         """Toggle the highlighted status of a menu item."""
+        previous = {"is_highlighted": item.is_highlighted}
         item.is_highlighted = not item.is_highlighted
-        await item.save()
+        await update_fields(item, previous)
+        await CafeService.refresh_view(item.cafe_id)
         return item
 
     @staticmethod
     async def create_many(cafe: Cafe, data: List[MenuItemCreate]) -> List[MenuItem]:
         """Create multiple menu items."""
+        # Assign IDs upfront, insert_many does not set them on the documents
         items = [
-            MenuItem(**item_data.model_dump(), cafe_id=cafe.id) for item_data in data
+            MenuItem(**item_data.model_dump(), cafe_id=cafe.id, id=PydanticObjectId())
+            for item_data in data
         ]
         await MenuItem.insert_many(items)
+        await CafeService.refresh_view(cafe.id)
+        await index_items(*items)
+        await suggestion_index.add_items(*items)
         return items
 
     @staticmethod
@@ -87,9 +106,17 @@ class ItemService:
         if result.matched_count == 0:
             return None
 
-        return await MenuItem.find_many({"_id": {"$in": ids}}).to_list()
+        items = await MenuItem.find_many({"_id": {"$in": ids}}).to_list()
+        await CafeService.refresh_view(*{item.cafe_id for item in items})
+        await index_items(*items)
+        await suggestion_index.add_items(*items)
+        return items
 
     @staticmethod
     async def delete_many(ids: List[PydanticObjectId]) -> None:
         """Delete multiple menu items."""
+        cafe_ids = await MenuItem.distinct("cafe_id", {"_id": {"$in": ids}})
         await MenuItem.find_many({"_id": {"$in": ids}}).delete_many()
+        await CafeService.refresh_view(*cafe_ids)
+        await unindex(*ids)
+        suggestion_index.remove(*ids)
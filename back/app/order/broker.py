@@ -0,0 +1,137 @@
+"""
+Module for handling real-time order events.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Literal, Optional, Set
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel
+
+from app.config import settings
+from app.order.models import Order
+
+
+class OrderEvent(BaseModel):
+    """
+    Model for an order event.
+
+    A `resync` event, without order, tells a subscriber that events were
+    missed and it should reload the orders.
+    """
+
+    type: Literal["created", "updated", "resync"]
+    order: Optional[Order] = None
+
+
+class InMemoryOrderBroker:
+    """Order broker fanning out events to the subscribers of this process."""
+
+    def __init__(self, queue_size: int = 100):
+        """Initialize the broker"""
+        self.queue_size = queue_size
+        self.subscribers: Dict[PydanticObjectId, Set[asyncio.Queue]] = {}
+
+    async def start(self):
+        """Start the broker"""
+
+    async def stop(self):
+        """Stop the broker"""
+
+    async def publish(self, event: OrderEvent) -> None:
+        """Publish an order event to the subscribers of its cafe."""
+        self._dispatch(event)
+
+    @asynccontextmanager
+    async def subscribe(
+        self, cafe_id: PydanticObjectId
+    ) -> AsyncIterator[asyncio.Queue]:
+        """Subscribe to the order events of a cafe."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(cafe_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self.subscribers.get(cafe_id, set())
+            queues.discard(queue)
+            if not queues:
+                self.subscribers.pop(cafe_id, None)
+
+    def _dispatch(self, event: OrderEvent) -> None:
+        """Deliver an event to local subscribers, resyncing full queues."""
+        for queue in self.subscribers.get(event.order.cafe_id, set()):
+            if queue.full():
+                self._resync(queue)
+            else:
+                queue.put_nowait(event)
+
+    def _resync_all(self) -> None:
+        """Resync every local subscriber, as events may have been missed."""
+        for queues in self.subscribers.values():
+            for queue in queues:
+                self._resync(queue)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue) -> None:
+        """Replace the pending events of a subscriber with a resync event."""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(OrderEvent(type="resync"))
+
+
+class ChangeStreamOrderBroker(InMemoryOrderBroker):
+    """Order broker fed by a MongoDB change stream, shared by all workers."""
+
+    def __init__(self, queue_size: int = 100):
+        """Initialize the broker"""
+        super().__init__(queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start watching the orders collection"""
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Stop watching the orders collection"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def publish(self, event: OrderEvent) -> None:
+        """Events are published by the change stream."""
+
+    async def _watch(self):
+        """Dispatch order inserts and updates from the change stream"""
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update"]}}}]
+        while True:
+            try:
+                async with Order.get_motor_collection().watch(
+                    pipeline, full_document="updateLookup"
+                ) as stream:
+                    async for change in stream:
+                        if not change.get("fullDocument"):
+                            continue
+                        self._dispatch(
+                            OrderEvent(
+                                type=(
+                                    "created"
+                                    if change["operationType"] == "insert"
+                                    else "updated"
+                                ),
+                                order=Order.model_validate(change["fullDocument"]),
+                            )
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Order change stream interrupted: {e}")
+                self._resync_all()
+                await asyncio.sleep(5)
+
+
+order_broker = (
+    ChangeStreamOrderBroker()
+    if settings.ORDER_BROKER == "change_stream"
+    else InMemoryOrderBroker()
+)
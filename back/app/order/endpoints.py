@@ -2,32 +2,47 @@
 Module for handling order-related routes.
 """
 
-from typing import Optional, TypeVar
+import asyncio
+from typing import List, Optional, TypeVar
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
+from fastapi.responses import StreamingResponse
 from fastapi_pagination.customization import CustomizedPage, UseParams
-from fastapi_pagination.ext.beanie import paginate
-from fastapi_pagination.links import Page
 
 from app.auth.dependencies import get_current_user
+from app.identity_map import IdentityMap, get_identity_map
 from app.menu.item.service import ItemService
+from app.order.broker import order_broker
 from app.order.enums import OrderStatus
-from app.order.models import OrderCreate, OrderOut, OrderUpdate
+from app.order.models import (
+    Order,
+    OrderBatchCreate,
+    OrderBatchCreateOut,
+    OrderCreate,
+    OrderOut,
+    OrderStatusBatchOut,
+    OrderStatusBatchUpdate,
+    OrderUpdate,
+)
 from app.order.service import OrderService
 from app.cafe.permissions import VolunteerPermission
-from app.cafe.service import CafeService
 from app.models import ErrorResponse
-from app.service import parse_query_params
+from app.pagination import CountStrategy, CursorParams, Page, paginate
+from app.query_filter import QueryFilter
 from app.user.models import User
 
 T = TypeVar("T")
 
+# Seconds between keep-alive comments on idle order streams
+STREAM_KEEPALIVE = 15
+
 
-class OrderParams(Params):
+class OrderParams(CursorParams):
     """Custom pagination parameters."""
 
+    count_strategy = CountStrategy.CACHED
+
     size: int = Query(20, ge=1, le=100, description="Page size")
     page: int = Query(1, ge=1, description="Page number")
     sort_by: Optional[str] = Query(None, description="Sort by a specific field")
@@ -38,6 +53,13 @@ OrderPage = CustomizedPage[
     UseParams(OrderParams),
 ]
 
+cafe_order_filter = QueryFilter(
+    Order, filters=["status", "created_at"], sorts=["created_at"], scope=["cafe_id"]
+)
+user_order_filter = QueryFilter(
+    Order, filters=["status", "created_at"], sorts=["created_at"], scope=["user_id"]
+)
+
 
 order_router = APIRouter()
 
@@ -55,20 +77,73 @@ order_router = APIRouter()
 async def list_orders(
     request: Request,
     slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Get a list of orders for a cafe. (`VOLUNTEER`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=[{"msg": "A cafe with this slug does not exist."}],
         )
 
-    filters = parse_query_params(dict(request.query_params))
+    filters = cafe_order_filter.compile(request.query_params)
     orders = await OrderService.get_all(cafe_id=cafe.id, to_list=False, **filters)
     return await paginate(orders)
 
 
+@order_router.get(
+    "/cafes/{slug}/orders/stream",
+    response_class=StreamingResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(VolunteerPermission())],
+)
+async def stream_orders(
+    request: Request,
+    slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
+):
+    """
+    Stream order events of a cafe as server-sent events. (`VOLUNTEER`)
+
+    A `resync` event means events were missed: reload the orders.
+    """
+    cafe = await identity_map.get_cafe(slug)
+    if not cafe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=[{"msg": "A cafe with this slug does not exist."}],
+        )
+
+    async def event_stream():
+        async with order_broker.subscribe(cafe.id) as events:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        events.get(), timeout=STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if event.type == "resync":
+                    yield "event: resync\ndata: {}\n\n"
+                    continue
+
+                order = OrderOut.model_validate(event.order.model_dump())
+                yield f"event: {event.type}\ndata: {order.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @order_router.post(
     "/cafes/{slug}/orders",
     response_model=OrderOut,
@@ -83,9 +158,10 @@ async def create_order(
     data: OrderCreate,
     slug: str = Path(..., description="Slug of the cafe"),
     current_user: User = Depends(get_current_user),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Create an order. (`MEMBER`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -129,9 +205,10 @@ async def update_order(
     data: OrderUpdate,
     slug: str = Path(..., description="Slug of the cafe"),
     id: PydanticObjectId = Path(..., description="ID of the order"),
+    identity_map: IdentityMap = Depends(get_identity_map),
 ):
     """Update an order. (`VOLUNTEER`)"""
-    cafe = await CafeService.get(slug)
+    cafe = await identity_map.get_cafe(slug)
     if not cafe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -162,6 +239,83 @@ async def update_order(
     return await OrderService.update(order, data)
 
 
+@order_router.post(
+    "/cafes/{slug}/orders/batch",
+    response_model=List[OrderBatchCreateOut],
+    responses={
+        401: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(VolunteerPermission())],
+)
+async def create_orders(
+    data: OrderBatchCreate,
+    slug: str = Path(..., description="Slug of the cafe"),
+    current_user: User = Depends(get_current_user),
+    identity_map: IdentityMap = Depends(get_identity_map),
+):
+    """Create orders in bulk, with the result of each order. (`VOLUNTEER`)"""
+    cafe = await identity_map.get_cafe(slug)
+    if not cafe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=[{"msg": "A cafe with this slug does not exist."}],
+        )
+
+    requested_ids = list(
+        {item.item_id for order in data.orders for item in order.items}
+    )
+    items = await ItemService.get_by_ids_and_cafe_id(requested_ids, cafe.id)
+    found_ids = {item.id for item in items}
+
+    results = []
+    valid_orders = []
+    for order_data in data.orders:
+        missing_ids = {item.item_id for item in order_data.items} - found_ids
+        if missing_ids:
+            results.append(
+                {
+                    "msg": "Items not found in this cafe",
+                    "missing_ids": list(missing_ids),
+                }
+            )
+        else:
+            results.append(None)
+            valid_orders.append(order_data)
+
+    orders = iter(
+        await OrderService.create_many(current_user, cafe, items, valid_orders)
+    )
+    return [result or {"order": next(orders).model_dump()} for result in results]
+
+
+@order_router.put(
+    "/cafes/{slug}/orders/batch/status",
+    response_model=List[OrderStatusBatchOut],
+    responses={
+        401: {"model": ErrorResponse},
+        403: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    },
+    dependencies=[Depends(VolunteerPermission())],
+)
+async def update_orders_status(
+    data: OrderStatusBatchUpdate,
+    slug: str = Path(..., description="Slug of the cafe"),
+    identity_map: IdentityMap = Depends(get_identity_map),
+):
+    """Set orders READY or COMPLETED in bulk, with the result of each order. (`VOLUNTEER`)"""
+    cafe = await identity_map.get_cafe(slug)
+    if not cafe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=[{"msg": "A cafe with this slug does not exist."}],
+        )
+
+    return await OrderService.update_status_many(cafe.id, data.ids, data.status)
+
+
 @order_router.get(
     "/users/@me/orders",
     response_model=OrderPage[OrderOut],
@@ -175,7 +329,7 @@ async def list_my_orders(
     current_user: User = Depends(get_current_user),
 ):
     """Get a list of orders for the current user. (`MEMBER`)"""
-    filters = parse_query_params(dict(request.query_params))
+    filters = user_order_filter.compile(request.query_params)
     orders = await OrderService.get_all(
         user_id=current_user.id, to_list=False, **filters
     )
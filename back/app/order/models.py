@@ -3,15 +3,24 @@ Module for handling order-related models.
 """
 
 from datetime import UTC, datetime
-from typing import List, Optional
+from decimal import Decimal
+from typing import List, Literal, Optional
 
 import pymongo
-from beanie import DecimalAnnotation, Document, Insert, Save, before_event
+from beanie import (
+    DecimalAnnotation,
+    Document,
+    Insert,
+    PydanticObjectId,
+    Save,
+    before_event,
+)
 from pydantic import BaseModel, Field, field_validator
 from pymongo import IndexModel
 
 from app.menu.item.models import MenuItemOption
 from app.order.enums import OrderStatus
+from app.order.pricing import round_price
 from app.models import CafeId, Id, IdAlias, ItemId, UserId
 
 
@@ -54,20 +63,22 @@ class OrderBase(BaseModel):
 class Order(Document, OrderBase, CafeId, UserId):
     """Order document model."""
 
-    @before_event([Insert, Save])
     def calculate_total_price(self):
-        """Calculate total price."""
+        """
+        Calculate the total price from the ordered items.
+
+        Orders are priced once when built (see `OrderService`), so this is
+        not run on every save.
+        """
         total = sum(
-            DecimalAnnotation(item.quantity)
-            * (
-                item.price
-                + sum(DecimalAnnotation(option.fee) for option in item.options)
-            )
-            for item in self.items
+            (
+                item.quantity
+                * sum((option.fee for option in item.options), item.price)
+                for item in self.items
+            ),
+            Decimal(0),
         )
-        if total < 0:
-            raise ValueError("Total price must be a non-negative value.")
-        self.total_price = total.quantize(DecimalAnnotation("0.00"))
+        self.total_price = round_price(total)
 
     @before_event([Insert, Save])
     def update_update_at(self):
@@ -88,6 +99,53 @@ class Order(Document, OrderBase, CafeId, UserId):
             IndexModel(
                 [("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)]
             ),
+            # Order history, paginated by cursor and filtered by status
+            IndexModel(
+                [
+                    ("cafe_id", pymongo.ASCENDING),
+                    ("status", pymongo.ASCENDING),
+                    ("created_at", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel(
+                [
+                    ("user_id", pymongo.ASCENDING),
+                    ("status", pymongo.ASCENDING),
+                    ("created_at", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel(
+                [
+                    ("cafe_id", pymongo.ASCENDING),
+                    ("created_at", pymongo.ASCENDING),
+                    ("_id", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel(
+                [
+                    ("user_id", pymongo.ASCENDING),
+                    ("created_at", pymongo.ASCENDING),
+                    ("_id", pymongo.ASCENDING),
+                ]
+            ),
+        ]
+
+
+class OrderCounter(Document, CafeId):
+    """Order number sequence of a cafe for a business day."""
+
+    day: str
+    seq: int = 0
+
+    class Settings:
+        """Settings for order counter document."""
+
+        name = "order_counters"
+        indexes = [
+            IndexModel(
+                [("cafe_id", pymongo.ASCENDING), ("day", pymongo.ASCENDING)],
+                unique=True,
+            ),
         ]
 
 
@@ -146,3 +204,38 @@ class OrderOut(OrderBase, CafeId, UserId, Id):
     """Model for order output."""
 
     items: List[OrderedItemOut]
+
+
+class OrderBatchCreate(BaseModel):
+    """Model for creating orders in bulk."""
+
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=100)
+
+
+class OrderBatchCreateOut(BaseModel):
+    """Model for the result of each order created in bulk."""
+
+    order: Optional[OrderOut] = None
+    msg: Optional[str] = None
+    missing_ids: Optional[List[PydanticObjectId]] = None
+
+
+class OrderStatusBatchUpdate(BaseModel):
+    """Model for updating the status of orders in bulk."""
+
+    ids: List[PydanticObjectId] = Field(..., min_length=1, max_length=100)
+    status: Literal[OrderStatus.READY, OrderStatus.COMPLETED]
+
+    @field_validator("status", mode="before")
+    def capitalize(cls, value):
+        """Capitalize value."""
+        if isinstance(value, str):
+            return value.upper()
+        return value
+
+
+class OrderStatusBatchOut(BaseModel, Id):
+    """Model for the result of each order status updated in bulk."""
+
+    status: Optional[OrderStatus] = None
+    msg: Optional[str] = None
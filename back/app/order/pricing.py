@@ -0,0 +1,48 @@
+"""
+Module for pricing orders from the menu items they reference.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from app.menu.item.models import MenuItem, MenuItemOption
+
+CENTS = Decimal("0.01")
+
+
+class PriceTable:
+    """Base price and option fees of a menu item, read once per order batch."""
+
+    __slots__ = ("price", "fees")
+
+    def __init__(self, item: MenuItem):
+        """Initialize the table from a menu item"""
+        self.price: Decimal = item.price
+        self.fees: Dict[Tuple[str, str], Decimal] = {
+            (option.type, option.value): option.fee for option in item.options
+        }
+
+    def price_options(
+        self, options: List[MenuItemOption]
+    ) -> Tuple[Decimal, List[MenuItemOption]]:
+        """
+        Get the unit price with options, and the options at the menu fees.
+
+        Options missing from the menu item keep their given fee.
+        """
+        unit_price = self.price
+        priced = []
+        for option in options:
+            fee = self.fees.get((option.type, option.value), option.fee)
+            if fee != option.fee:
+                option = option.model_copy(update={"fee": fee})
+            unit_price += fee
+            priced.append(option)
+        return unit_price, priced
+
+
+def round_price(price: Decimal) -> Decimal:
+    """Round a price to cents, rejecting negative totals."""
+    if price < 0:
+        raise ValueError("Total price must be a non-negative value.")
+    return price.quantize(CENTS)
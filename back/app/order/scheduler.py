@@ -6,8 +6,12 @@ from datetime import UTC, datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from app.lease import Lease
+from app.order.broker import OrderEvent, order_broker
 from app.order.models import Order, OrderStatus
 
+CANCEL_INTERVAL = timedelta(minutes=5)
+
 
 class OrderScheduler:
     """Order scheduler class"""
@@ -22,30 +26,40 @@ class OrderScheduler:
         self.scheduler.add_job(
             self.cancel_old_orders,
             "interval",
-            seconds=300,
+            seconds=CANCEL_INTERVAL.total_seconds(),
             coalesce=True,
             max_instances=1,
         )
 
     async def cancel_old_orders(self):
         """Cancel orders older than 1 hour in bulk"""
+        # Only the worker holding the lease runs the job
+        if not await Lease.acquire("cancel_old_orders", CANCEL_INTERVAL * 2):
+            return
+
         now = datetime.now(UTC)
         hour_ago = now - timedelta(hours=1)
+        open_statuses = {"$in": [OrderStatus.PLACED, OrderStatus.READY]}
+
+        ids = await Order.get_motor_collection().distinct(
+            "_id", {"status": open_statuses, "created_at": {"$lt": hour_ago}}
+        )
+        if not ids:
+            return
 
         result = await Order.find(
-            {
-                "status": {"$in": [OrderStatus.PLACED, OrderStatus.READY]},
-                "created_at": {"$lt": hour_ago},
-            }
+            {"_id": {"$in": ids}, "status": open_statuses}
         ).update_many(
-            {
-                "$set": {
-                    "status": OrderStatus.CANCELLED,
-                    "updated_at": hour_ago + timedelta(hours=1),
-                }
-            }
+            {"$set": {"status": OrderStatus.CANCELLED, "updated_at": now}}
         )
 
+        # Subscribers of the in-memory broker only see published events
+        cancelled = await Order.find(
+            {"_id": {"$in": ids}, "status": OrderStatus.CANCELLED}
+        ).to_list()
+        for order in cancelled:
+            await order_broker.publish(OrderEvent(type="updated", order=order))
+
         print(f"Cancelled {result.modified_count} old orders")
 
     async def start(self):
@@ -56,6 +70,7 @@ class OrderScheduler:
     async def shutdown(self):
         """Graceful shutdown"""
         self.scheduler.shutdown()
+        await Lease.release("cancel_old_orders")
         print("Order scheduler stopped")
 
 
@@ -2,21 +2,31 @@
 Module for handling order-related operations.
 """
 
-from datetime import UTC, datetime, timedelta
-from typing import List, Optional, Union
+import asyncio
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
-from beanie import PydanticObjectId
+from beanie import PydanticObjectId, UpdateResponse
 from beanie.odm.queries.find import FindMany
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from app.menu.item.models import MenuItem
 from app.cafe.models import Cafe
+from app.config import settings
+from app.order.broker import OrderEvent, order_broker
+from app.order.enums import OrderStatus
 from app.order.models import (
     Order,
+    OrderCounter,
     OrderCreate,
     OrderedItem,
-    OrderStatus,
     OrderUpdate,
 )
+from app.order.pricing import PriceTable, round_price
+from app.service import update_document
 from app.user.models import User
 
 
@@ -25,6 +35,11 @@ class OrderService:
     Service class that provides methods for CRUD operations related to Orders.
     """
 
+    # Pre-allocated order numbers per (cafe, day): (next number, last number)
+    _number_blocks: Dict[Tuple[PydanticObjectId, str], Tuple[int, int]] = {}
+    # Per (cafe, day), so cafes do not wait on each other's allocations
+    _number_locks: Dict[Tuple[PydanticObjectId, str], asyncio.Lock] = {}
+
     @staticmethod
     async def get_all(
         user_id: Optional[str] = None,
@@ -38,12 +53,9 @@ class OrderService:
         if cafe_id is not None:
             filters["cafe_id"] = PydanticObjectId(cafe_id)
 
-        sort_by = filters.pop("sort_by", "-order_number")
+        sort_by = filters.pop("sort_by", "-created_at")
         query = Order.find(filters).sort(sort_by)
-        orders = await query.to_list()
-
-        await OrderService._update_expired_orders(orders)
-        return await orders if to_list else query
+        return await query.to_list() if to_list else query
 
     @staticmethod
     async def get(id: PydanticObjectId) -> Order:
@@ -59,72 +71,255 @@ class OrderService:
     ) -> Order:
         """Create a order."""
         item_map = {item.id: item for item in items}
+        tables = {item.id: PriceTable(item) for item in items}
+        order_number = await OrderService.get_next_order_number(cafe.id)
+        order = OrderService._build_order(
+            user, cafe, item_map, tables, data, order_number
+        )
+
+        await order.insert()
+        await order_broker.publish(OrderEvent(type="created", order=order))
+        return order
+
+    @staticmethod
+    async def create_many(
+        user: User,
+        cafe: Cafe,
+        items: list[MenuItem],
+        data: List[OrderCreate],
+    ) -> List[Order]:
+        """Create orders in bulk, with one counter update and one insert."""
+        if not data:
+            return []
+
+        item_map = {item.id: item for item in items}
+        # Price tables are built once and shared by every order of the batch
+        tables = {item.id: PriceTable(item) for item in items}
+        last_number = await OrderService._allocate_order_numbers(
+            cafe.id, OrderService._business_day(), len(data)
+        )
+        first_number = last_number - len(data) + 1
+        orders = [
+            OrderService._build_order(
+                user, cafe, item_map, tables, order_data, first_number + i
+            )
+            for i, order_data in enumerate(data)
+        ]
+        await Order.insert_many(orders)
+        for order in orders:
+            await order_broker.publish(OrderEvent(type="created", order=order))
+        return orders
+
+    @staticmethod
+    def _build_order(
+        user: User,
+        cafe: Cafe,
+        item_map: Dict[PydanticObjectId, MenuItem],
+        tables: Dict[PydanticObjectId, PriceTable],
+        data: OrderCreate,
+        order_number: int,
+    ) -> Order:
+        """Build and price an order from the menu items it references."""
         ordered_items = []
+        total = Decimal(0)
         for item_create in data.items:
-            menu_item = item_map[item_create.item_id]
+            table = tables[item_create.item_id]
+            unit_price, options = table.price_options(item_create.options)
+            total += item_create.quantity * unit_price
             ordered_items.append(
                 OrderedItem(
-                    _id=menu_item.id,
-                    name=menu_item.name,
-                    price=menu_item.price,
+                    _id=item_create.item_id,
+                    name=item_map[item_create.item_id].name,
+                    price=table.price,
                     quantity=item_create.quantity,
-                    options=item_create.options,
+                    options=options,
                 )
             )
 
-        order_number = await OrderService.get_next_order_number()
-
-        order = Order(
+        # Assign the ID upfront, insert_many does not set it on the documents
+        return Order(
             **data.model_dump(exclude={"items"}),
+            id=PydanticObjectId(),
             user_id=user.id,
             cafe_id=cafe.id,
             cafe_name=cafe.name,
             order_number=order_number,
-            items=ordered_items
+            items=ordered_items,
+            total_price=round_price(total),
         )
 
-        await order.insert()
-        return order
-
     @staticmethod
     async def update(order: Order, data: OrderUpdate) -> Order:
-        """Update an order by its ID."""
+        """
+        Update the status of an order, without rewriting the whole document.
+
+        The update is guarded on the status the caller checked, so an order
+        cancelled meanwhile (e.g. by the scheduler) is a conflict.
+        """
+        now = datetime.now(UTC)
+        await update_document(
+            order,
+            {"$set": {"status": data.status, "updated_at": now}},
+            expected={"status": order.status},
+        )
         order.status = data.status
-        await order.save()
+        order.updated_at = now
+        await order_broker.publish(OrderEvent(type="updated", order=order))
         return order
 
     @staticmethod
-    async def _update_expired_orders(orders: List[Order]) -> None:
-        """Update status expired orders PLACED/READY."""
-        now = datetime.now(UTC).replace(tzinfo=None)
-        expired_order_ids: List[PydanticObjectId] = []
+    async def update_status_many(
+        cafe_id: PydanticObjectId,
+        ids: List[PydanticObjectId],
+        status: OrderStatus,
+    ) -> List[Dict[str, Any]]:
+        """
+        Update the status of orders of a cafe in bulk.
 
-        for order in orders:
-            if order.status in [OrderStatus.PLACED, OrderStatus.READY]:
-                if order.created_at < now - timedelta(hours=1):
-                    expired_order_ids.append(order.id)
-
-        if expired_order_ids:
-            await Order.find({"_id": {"$in": expired_order_ids}}).update_many(
-                {
-                    "$set": {
-                        "status": OrderStatus.CANCELLED,
-                        "updated_at": order.created_at + timedelta(hours=1),
+        One bulk write updates each order still open, guarded on its cafe and
+        status, and one read gets the result of each order, in the order of
+        the IDs. An order already in the requested status is a success.
+        """
+        ids = list(dict.fromkeys(ids))
+        closed = [OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+        now = datetime.now(UTC)
+
+        await Order.get_motor_collection().bulk_write(
+            [
+                UpdateOne(
+                    {"_id": id, "cafe_id": cafe_id, "status": {"$nin": closed}},
+                    {"$set": {"status": status, "updated_at": now}},
+                )
+                for id in ids
+            ],
+            ordered=False,
+        )
+        orders = await Order.find({"_id": {"$in": ids}, "cafe_id": cafe_id}).to_list()
+        order_map = {order.id: order for order in orders}
+
+        results = []
+        for id in ids:
+            order = order_map.get(id)
+            if not order:
+                results.append(
+                    {
+                        "id": id,
+                        "msg": "An order with this ID does not exist in this cafe.",
                     }
-                }
-            )
+                )
+            elif order.status == status:
+                await order_broker.publish(OrderEvent(type="updated", order=order))
+                results.append({"id": id, "status": order.status})
+            elif order.status in closed:
+                results.append(
+                    {
+                        "id": id,
+                        "status": order.status,
+                        "msg": "An order with this ID is already completed or cancelled.",
+                    }
+                )
+            else:
+                results.append(
+                    {
+                        "id": id,
+                        "status": order.status,
+                        "msg": "The order was modified concurrently. Try again.",
+                    }
+                )
+        return results
 
     @staticmethod
-    async def get_next_order_number(cafe_id: PydanticObjectId = None) -> int:
+    async def get_next_order_number(cafe_id: PydanticObjectId) -> int:
         """Get the next available order number for a cafe."""
-        last_order = (
-            await Order.find(
-                # Order.cafe_id == cafe_id
+        day = OrderService._business_day()
+        block_size = max(settings.ORDER_NUMBER_BLOCK_SIZE, 1)
+        if block_size == 1:
+            return await OrderService._allocate_order_numbers(cafe_id, day, 1)
+
+        key = (cafe_id, day)
+        lock = OrderService._number_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            next_number, last_number = OrderService._number_blocks.get(key, (1, 0))
+            if next_number > last_number:
+                last_number = await OrderService._allocate_order_numbers(
+                    cafe_id, day, block_size
+                )
+                next_number = last_number - block_size + 1
+                # Blocks and locks of previous days are never used again
+                OrderService._number_blocks = {
+                    k: v for k, v in OrderService._number_blocks.items() if k[1] == day
+                }
+                OrderService._number_locks = {
+                    k: v for k, v in OrderService._number_locks.items() if k[1] == day
+                }
+            OrderService._number_blocks[key] = (next_number + 1, last_number)
+            return next_number
+
+    @staticmethod
+    async def _allocate_order_numbers(
+        cafe_id: PydanticObjectId, day: str, count: int
+    ) -> int:
+        """Atomically reserve order numbers and return the last one."""
+        try:
+            counter = await OrderCounter.find_one(
+                {"cafe_id": cafe_id, "day": day}
+            ).update(
+                {"$inc": {"seq": count}},
+                upsert=True,
+                response_type=UpdateResponse.NEW_DOCUMENT,
+            )
+        except DuplicateKeyError:
+            # Concurrent upsert created the counter first, retry as an update
+            counter = await OrderCounter.find_one(
+                {"cafe_id": cafe_id, "day": day}
+            ).update(
+                {"$inc": {"seq": count}},
+                response_type=UpdateResponse.NEW_DOCUMENT,
             )
-            .sort("-order_number")
-            .first_or_none()
+        return counter.seq
+
+    @staticmethod
+    def _business_day(moment: Optional[datetime] = None) -> str:
+        """Get the business day of a moment in the configured timezone."""
+        moment = moment or datetime.now(UTC)
+        return moment.astimezone(ZoneInfo(settings.ORDER_NUMBER_TIMEZONE)).strftime(
+            "%Y-%m-%d"
         )
 
-        if last_order and last_order.order_number:
-            return last_order.order_number + 1
-        return 1  # First order
+    @staticmethod
+    async def rebuild_counters() -> None:
+        """Seed the order counters from the highest order number of each day."""
+        pipeline = [
+            {
+                "$group": {
+                    "_id": {
+                        "cafe_id": "$cafe_id",
+                        "day": {
+                            "$dateToString": {
+                                "format": "%Y-%m-%d",
+                                "date": "$created_at",
+                                "timezone": settings.ORDER_NUMBER_TIMEZONE,
+                            }
+                        },
+                    },
+                    "seq": {"$max": "$order_number"},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "cafe_id": "$_id.cafe_id",
+                    "day": "$_id.day",
+                    "seq": 1,
+                }
+            },
+            {
+                "$merge": {
+                    "into": OrderCounter.get_collection_name(),
+                    "on": ["cafe_id", "day"],
+                    "whenMatched": [{"$set": {"seq": {"$max": ["$seq", "$$new.seq"]}}}],
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+        await Order.aggregate(pipeline).to_list()
@@ -0,0 +1,353 @@
+"""
+Module for handling pagination, by page or by cursor (keyset).
+"""
+
+import asyncio
+import base64
+import json
+from enum import Enum
+from typing import (
+    Any,
+    ClassVar,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from beanie import Document
+from beanie.odm.queries.aggregation import AggregationQuery
+from beanie.odm.queries.find import FindMany
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from fastapi_pagination import Params, create_page, resolve_params
+from fastapi_pagination.api import apply_items_transformer
+from fastapi_pagination.customization import (
+    CustomizedPage,
+    UseAdditionalFields,
+    UseOptionalFields,
+)
+from fastapi_pagination.ext.beanie import paginate as paginate_pages
+from fastapi_pagination.links import Page as LinksPage
+from fastapi_pagination.types import AsyncItemsTransformer
+from bson import json_util
+from pydantic import BaseModel
+
+from app.cache import TTLCache
+from app.config import settings
+
+T = TypeVar("T")
+
+# Sort order of a keyset: (field, direction) pairs ending with a unique field
+SortKeys = Sequence[Tuple[str, int]]
+
+Page = CustomizedPage[
+    LinksPage[T],
+    # Pages fetched by cursor have no total
+    UseOptionalFields(),
+    UseAdditionalFields(next_cursor=(Optional[str], None)),
+]
+
+
+class CountStrategy(str, Enum):
+    """How page totals are counted."""
+
+    EXACT = "exact"
+    # Exact count, reused for a few seconds per collection and filter
+    CACHED = "cached"
+    # Collection metadata when unfiltered, cached count otherwise
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+count_cache = TTLCache(maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL)
+
+
+class CursorParams(Params):
+    """
+    Pagination parameters, switching to keyset pagination when given a cursor.
+
+    Subclasses choose how the total of numbered pages is counted.
+    """
+
+    count_strategy: ClassVar[CountStrategy] = CountStrategy.EXACT
+
+    explain: bool = Query(
+        False,
+        description="Return the winning query plan instead of the page (debug only).",
+    )
+
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor of the next page, or empty for the first page. "
+        "Pages are then fetched by cursor, without a total count.",
+    )
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Model for a page of results with a cursor to the next page."""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+async def paginate(
+    query: Union[FindMany, AggregationQuery],
+    params: Optional[Params] = None,
+    transformer: Optional[AsyncItemsTransformer] = None,
+):
+    """Paginate a query by page, or by keyset when the request gives a cursor."""
+    params = resolve_params(params)
+    if getattr(params, "explain", False) and settings.QUERY_EXPLAIN:
+        return JSONResponse(await explain(query))
+
+    cursor = getattr(params, "cursor", None)
+    if cursor is None:
+        strategy = getattr(params, "count_strategy", CountStrategy.EXACT)
+        if strategy == CountStrategy.EXACT:
+            return await paginate_pages(query, params, transformer=transformer)
+
+        items, total = await _paginate_offset(query, params, strategy)
+        items = await apply_items_transformer(items, transformer, async_=True)
+        return create_page(items, total=total, params=params)
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        if isinstance(query, AggregationQuery):
+            items, next_cursor = await _paginate_aggregation(query, params.size, after)
+        else:
+            items, next_cursor = await _paginate_find(query, params.size, after)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[{"msg": "Invalid cursor."}],
+        )
+
+    items = await apply_items_transformer(items, transformer, async_=True)
+    return create_page(items, total=None, params=params, next_cursor=next_cursor)
+
+
+async def explain(query: Union[FindMany, AggregationQuery]) -> dict:
+    """Get the plan chosen by the database for a query."""
+    collection = query.document_model.get_motor_collection()
+    if isinstance(query, AggregationQuery):
+        pipeline = query.get_aggregation_pipeline()
+        plan = await collection.database.command(
+            "aggregate", collection.name, pipeline=pipeline, explain=True
+        )
+        request = {"pipeline": pipeline}
+    else:
+        filters = query.get_filter_query()
+        plan = await collection.find(
+            filters, sort=query.sort_expressions or None
+        ).explain()
+        request = {"filter": filters, "sort": query.sort_expressions}
+
+    result = {**request, "winning_plan": _find_key(plan, "winningPlan")}
+    return json.loads(json_util.dumps(result))
+
+
+def _find_key(document: Any, key: str) -> Any:
+    """Find the first value of a key in nested documents, depth first."""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        document = list(document.values())
+    if isinstance(document, list):
+        for value in document:
+            found = _find_key(value, key)
+            if found is not None:
+                return found
+    return None
+
+
+async def _paginate_offset(
+    query: Union[FindMany, AggregationQuery],
+    params: Params,
+    strategy: CountStrategy,
+) -> Tuple[list, Optional[int]]:
+    """Get a numbered page, counting the total with the given strategy."""
+    raw_params = params.to_raw_params()
+    if isinstance(query, AggregationQuery):
+        pipeline = query.aggregation_pipeline
+        filters = _pipeline_filter(pipeline)
+        # Cut the page right after the sort, before the lookups
+        position = _sort_position(pipeline)
+        position = len(pipeline) if position is None else position + 1
+        stages = [{"$skip": raw_params.offset}, {"$limit": raw_params.limit}]
+        query.aggregation_pipeline = pipeline[:position] + stages + pipeline[position:]
+    else:
+        filters = query.get_filter_query()
+        query = query.skip(raw_params.offset).limit(raw_params.limit)
+
+    return await asyncio.gather(
+        query.to_list(), count(query.document_model, filters, strategy)
+    )
+
+
+async def count(
+    model: Type[Document], filters: dict, strategy: CountStrategy
+) -> Optional[int]:
+    """Count the documents matching a filter with the given strategy."""
+    collection = model.get_motor_collection()
+    if strategy == CountStrategy.NONE:
+        return None
+    if strategy == CountStrategy.EXACT:
+        return await collection.count_documents(filters)
+    if strategy == CountStrategy.ESTIMATED and not filters:
+        return await collection.estimated_document_count()
+
+    key = (model.get_collection_name(), json_util.dumps(filters, sort_keys=True))
+    total = count_cache.get(key)
+    if total is None:
+        total = await collection.count_documents(filters)
+        count_cache.set(key, total)
+    return total
+
+
+def _pipeline_filter(pipeline: List[dict]) -> dict:
+    """Get the filter of the leading `$match` stages of a pipeline."""
+    filters = []
+    for stage in pipeline:
+        if "$match" not in stage:
+            break
+        filters.append(stage["$match"])
+    if len(filters) > 1:
+        return {"$and": filters}
+    return filters[0] if filters else {}
+
+
+def _sort_position(pipeline: List[dict]) -> Optional[int]:
+    """Get the position of the last `$sort` stage of a pipeline."""
+    return next(
+        (i for i in reversed(range(len(pipeline))) if "$sort" in pipeline[i]), None
+    )
+
+
+async def _paginate_find(
+    query: FindMany, size: int, after: Optional[List[Any]]
+) -> Tuple[list, Optional[str]]:
+    """Get the page of a find query after the given sort values."""
+    sort = with_tiebreaker(
+        [(field, int(direction)) for field, direction in query.sort_expressions]
+    )
+    query.sort_expressions = list(sort)
+    if after:
+        query = query.find(keyset_filter(sort, after))
+    items = await query.limit(size + 1).to_list()
+    return _cut_page(items, sort, size)
+
+
+async def _paginate_aggregation(
+    query: AggregationQuery, size: int, after: Optional[List[Any]]
+) -> Tuple[list, Optional[str]]:
+    """
+    Get the page of an aggregation after the given sort values.
+
+    The page is cut at the last `$sort` stage, so the stages after it only
+    run on the page.
+    """
+    pipeline = query.aggregation_pipeline
+    position = _sort_position(pipeline)
+    if position is None:
+        sort, position = with_tiebreaker([]), len(pipeline)
+    else:
+        sort = with_tiebreaker(list(pipeline.pop(position)["$sort"].items()))
+
+    stages = [{"$match": keyset_filter(sort, after)}] if after else []
+    stages.extend([{"$sort": dict(sort)}, {"$limit": size + 1}])
+    query.aggregation_pipeline = pipeline[:position] + stages + pipeline[position:]
+    items = await query.to_list()
+    return _cut_page(items, sort, size)
+
+
+def _cut_page(items: list, sort: SortKeys, size: int) -> Tuple[list, Optional[str]]:
+    """Cut the extra result fetched to know if there is a next page."""
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, encode_cursor(cursor_values(sort, items[-1]))
+
+
+def with_tiebreaker(sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """
+    Add the ID to a sort order, so that it is total.
+
+    The ID follows the direction of the last key, so a single index on the
+    keys then `_id` serves the sort.
+    """
+    if not any(field == "_id" for field, _ in sort):
+        sort.append(("_id", sort[-1][1] if sort else 1))
+    return sort
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort values of the last result into an opaque cursor."""
+    data = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor, raising ValueError if it is malformed."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(data)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor.")
+    return values
+
+
+def keyset_filter(sort: SortKeys, values: List[Any]) -> dict:
+    """
+    Build the filter matching the results after the given sort values.
+
+    Null and missing values sort first, and do not match `$gt` or `$lt`, so
+    they get their own conditions.
+    """
+    if len(values) != len(sort):
+        raise ValueError("Invalid cursor.")
+
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        after = _after(field, direction, values[i])
+        if after is not None:
+            clauses.append({**{sort[j][0]: values[j] for j in range(i)}, **after})
+    return {"$or": clauses} if clauses else {"_id": {"$exists": False}}
+
+
+def _after(field: str, direction: int, value: Any) -> Optional[dict]:
+    """Match the values of a field after a value, or None if there are none."""
+    if value is None:
+        return {field: {"$ne": None}} if direction > 0 else None
+    after = {field: {"$gt" if direction > 0 else "$lt": value}}
+    if direction > 0 or field == "_id":
+        return after
+    # Nulls come last in a descending sort
+    return {"$or": [after, {field: None}]}
+
+
+def cursor_values(sort: SortKeys, result: Any) -> List[Any]:
+    """Get the sort values of a document or model, to build the cursor after it."""
+    return [_get_value(result, field) for field, _ in sort]
+
+
+def _get_value(result: Any, field: str) -> Any:
+    """Get a possibly nested field, reading `_id` from `id` when projected."""
+    value = result
+    for part in field.split("."):
+        if isinstance(value, dict):
+            if part == "_id" and part not in value:
+                part = "id"
+            value = value.get(part)
+        else:
+            value = getattr(value, "id" if part == "_id" else part, None)
+    if hasattr(value, "value") and isinstance(value, str):
+        # String enums, stored by value
+        value = value.value
+    return value
@@ -0,0 +1,197 @@
+"""
+Module for compiling query parameters into typed, index-backed filters.
+"""
+
+import types
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from beanie import Document
+from beanie.odm.utils.encoder import Encoder
+from fastapi import HTTPException, status
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pymongo import IndexModel
+
+OPERATORS = ["eq", "gt", "gte", "in", "lt", "lte", "ne", "nin"]
+LIST_OPERATORS = ["in", "nin"]
+
+# Query parameters handled by pagination, `limit` being accepted from
+# older clients
+RESERVED = ["page", "size", "limit", "cursor", "explain"]
+
+
+class QueryFilter:
+    """
+    Filters and sort orders allowed on a list endpoint of a document model.
+
+    Values are coerced to the types of the model fields. `scope` lists the
+    fields the endpoint always matches itself (e.g. the cafe of its menu
+    items), so that the index check accounts for them. `aliases` maps query
+    parameters to the fields they filter.
+    """
+
+    registry: ClassVar[List["QueryFilter"]] = []
+
+    def __init__(
+        self,
+        model: Type[Document],
+        filters: Sequence[str] = (),
+        sorts: Sequence[str] = (),
+        scope: Sequence[str] = (),
+        aliases: Optional[Mapping[str, str]] = None,
+    ):
+        """Initialize the filter and register it for the index check."""
+        self.model = model
+        self.filters = list(filters)
+        self.sorts = list(sorts)
+        self.scope = list(scope)
+        self.aliases = dict(aliases or {})
+        self._adapters = {field: _field_adapter(model, field) for field in filters}
+        QueryFilter.registry.append(self)
+
+    def compile(self, query_params: Mapping[str, str]) -> Dict[str, Any]:
+        """Compile query parameters into Mongo filters, with `sort_by` if given."""
+        filters: Dict[str, Any] = {}
+        for key, value in query_params.items():
+            if key in RESERVED:
+                continue
+
+            if key == "sort_by":
+                sort = value.lstrip("-")
+                if sort not in self.sorts:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=[{"msg": f"Sorting by {sort} is not supported."}],
+                    )
+                filters[key] = value
+                continue
+
+            field, _, op = key.rpartition("__")
+            if op not in OPERATORS:
+                field, op = key, "eq"
+            field = self.aliases.get(field, field)
+            if field not in self.filters:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=[{"msg": f"Filtering by {field} is not supported."}],
+                )
+
+            try:
+                adapter = self._adapters[field]
+                if op in LIST_OPERATORS:
+                    value = [adapter.validate_python(v) for v in value.split(",")]
+                else:
+                    value = adapter.validate_python(value)
+            except ValidationError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=[{"msg": f"Invalid value for {key}."}],
+                )
+
+            value = Encoder().encode(value)
+            if op == "eq":
+                filters[field] = value
+            else:
+                condition = filters.get(field)
+                if not isinstance(condition, dict):
+                    condition = filters[field] = {}
+                condition[f"${op}"] = value
+        return filters
+
+    def check_indexes(self) -> List[str]:
+        """
+        Get the filter and sort combinations not covered by an index.
+
+        A combination is covered by an index starting with its equality
+        fields (the scope and the filter, in any order), then the sort field.
+        A filter on the sort field itself is a range on the sort. An
+        equality on a unique field matches at most one document, so it
+        needs no index for the sort.
+        """
+        settings = self.model.Settings
+        indexes = [["_id"]]
+        unique = {"_id"}
+        for index in getattr(settings, "indexes", []):
+            keys = _index_keys(index)
+            indexes.append(keys)
+            if len(keys) == 1 and _is_unique(index):
+                unique.add(keys[0])
+
+        problems = []
+        for field in [None, *self.filters]:
+            for sort in [None, *self.sorts]:
+                equality = set(self.scope)
+                if field and field != sort:
+                    equality.add(field)
+                if (not equality and not sort) or equality & unique:
+                    continue
+                if not any(_covers(keys, equality, sort) for keys in indexes):
+                    problems.append(
+                        f"{settings.name}: "
+                        f"{' + '.join(sorted(equality)) or 'no filter'}"
+                        f"{f' sorted by {sort}' if sort else ''}"
+                        " is not covered by an index"
+                    )
+        return problems
+
+
+def check_query_indexes() -> List[str]:
+    """Get the combinations of every list endpoint not covered by an index."""
+    return [
+        problem
+        for query_filter in QueryFilter.registry
+        for problem in query_filter.check_indexes()
+    ]
+
+
+def _covers(keys: List[str], equality: set, sort: Optional[str]) -> bool:
+    """Check if index keys serve equality matches then a sort."""
+    size = len(equality)
+    if set(keys[:size]) != equality:
+        return False
+    return sort is None or (len(keys) > size and keys[size] == sort)
+
+
+def _index_keys(index: Union[IndexModel, str, list]) -> List[str]:
+    """Get the fields of an index declared in `Settings.indexes`."""
+    if isinstance(index, IndexModel):
+        return list(index.document["key"].keys())
+    if isinstance(index, str):
+        return [index]
+    return [key if isinstance(key, str) else key[0] for key in index]
+
+
+def _is_unique(index: Union[IndexModel, str, list]) -> bool:
+    """Check if an index declared in `Settings.indexes` is unique."""
+    return isinstance(index, IndexModel) and index.document.get("unique", False)
+
+
+def _field_adapter(model: Type[BaseModel], field: str) -> TypeAdapter:
+    """Get the validator of a possibly nested field, or of its items if a list."""
+    annotation: Any = model
+    for part in field.split("."):
+        annotation = _unwrap(annotation).model_fields[part].annotation
+    return TypeAdapter(_unwrap(annotation))
+
+
+def _unwrap(annotation: Any) -> Any:
+    """Strip Optional and List from an annotation, as Mongo matches list items."""
+    while True:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if get_origin(annotation) in (Union, types.UnionType) and len(args) == 1:
+            annotation = args[0]
+        elif get_origin(annotation) in (list, List):
+            annotation = args[0]
+        else:
+            return annotation
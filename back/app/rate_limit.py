@@ -0,0 +1,210 @@
+"""
+Module for rate limiting requests per client IP and per credential.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+from beanie import Document
+from fastapi import HTTPException, Request, status
+from pymongo import IndexModel, ReturnDocument
+
+from app.config import settings
+
+# Get the credential of a request (e.g. the email of a login), if any
+CredentialGetter = Callable[[Request], Awaitable[Optional[str]]]
+
+
+class InMemoryRateLimitStore:
+    """
+    Request counters of this process, for the current and previous window.
+
+    Each key takes three integers, and the least recently used keys are
+    dropped past `max_keys`.
+    """
+
+    def __init__(self, max_keys: int):
+        """Initialize the store"""
+        self.max_keys = max_keys
+        self._counters: OrderedDict[str, Tuple[int, int, int]] = OrderedDict()
+
+    async def hit(self, key: str, window: int, period: float) -> Tuple[int, int]:
+        """Count a request, returning the counts of its window and the previous."""
+        start, current, previous = self._counters.pop(key, (window, 0, 0))
+        if start != window:
+            previous = current if start == window - 1 else 0
+            current = 0
+        current += 1
+
+        self._counters[key] = (window, current, previous)
+        if len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+        return current, previous
+
+
+class RateLimitCounter(Document):
+    """Request counter of a key in a window, shared by the workers."""
+
+    id: str
+    hits: int = 0
+    expires_at: datetime
+
+    class Settings:
+        """Settings for rate limit counter document."""
+
+        name = "rate_limits"
+        indexes = [IndexModel([("expires_at", 1)], expireAfterSeconds=0)]
+
+
+class MongoRateLimitStore:
+    """Request counters shared by the workers, expired by a TTL index."""
+
+    async def hit(self, key: str, window: int, period: float) -> Tuple[int, int]:
+        """Count a request, returning the counts of its window and the previous."""
+        collection = RateLimitCounter.get_motor_collection()
+        counter = await collection.find_one_and_update(
+            {"_id": f"{key}:{window}"},
+            {
+                "$inc": {"hits": 1},
+                "$setOnInsert": {
+                    # Kept while it is the previous window
+                    "expires_at": datetime.fromtimestamp((window + 2) * period, UTC)
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        previous = await collection.find_one({"_id": f"{key}:{window - 1}"})
+        return counter["hits"], previous["hits"] if previous else 0
+
+
+class RateLimiter:
+    """
+    Sliding window rate limiter.
+
+    The count over the last period is estimated from the fixed windows: the
+    current window count, plus the previous one weighted by how much of it
+    is still in the period.
+    """
+
+    def __init__(self, store: InMemoryRateLimitStore | MongoRateLimitStore):
+        """Initialize the rate limiter"""
+        self.store = store
+
+    async def check(self, key: str, limit: int, period: float) -> Optional[int]:
+        """Count a request, returning seconds to wait if over the limit."""
+        window, offset = divmod(time.time(), period)
+        current, previous = await self.store.hit(key, int(window), period)
+        if previous * (1 - offset / period) + current <= limit:
+            return None
+        return math.ceil(period - offset)
+
+
+class RateLimit:
+    """
+    Dependency limiting requests to an endpoint per client IP and, with a
+    `credential` getter, per credential, so that bursts are shed before
+    reaching the database or the password hash pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_ip: int,
+        per_credential: Optional[int] = None,
+        credential: Optional[CredentialGetter] = None,
+        period: Optional[float] = None,
+    ):
+        """Initialize the limit"""
+        self.name = name
+        self.per_ip = per_ip
+        self.per_credential = per_credential
+        self.credential = credential
+        self.period = period or settings.RATE_LIMIT_PERIOD
+
+    async def __call__(self, request: Request) -> None:
+        """Reject the request with a 429 if over a limit."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        limits = []
+        client = client_ip(request)
+        if client:
+            limits.append((f"{self.name}:ip:{client}", self.per_ip))
+        if self.credential and self.per_credential:
+            credential = await self.credential(request)
+            if credential:
+                key = f"{self.name}:credential:{credential.strip().lower()}"
+                limits.append((key, self.per_credential))
+
+        for key, limit in limits:
+            retry_after = await rate_limiter.check(key, limit, self.period)
+            if retry_after is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=[{"msg": "Too many requests. Try again later."}],
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    Get the IP of the client, or None if it is hidden behind a proxy.
+
+    Each of the RATE_LIMIT_TRUSTED_PROXIES proxies appends the address it
+    received the request from to X-Forwarded-For, so the client is that many
+    entries from the end. Entries before it may be forged by the client.
+    """
+    peer = request.client.host if request.client else None
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded:
+        return peer
+
+    proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if not proxies:
+        return None
+    entries = [entry.strip() for entry in forwarded.split(",")]
+    return entries[-proxies] if len(entries) >= proxies else entries[0]
+
+
+def form_field(name: str) -> CredentialGetter:
+    """Get a credential from a form field, as parsed for the endpoint."""
+
+    async def get(request: Request) -> Optional[str]:
+        value = (await request.form()).get(name)
+        return value if isinstance(value, str) else None
+
+    return get
+
+
+def json_field(name: str) -> CredentialGetter:
+    """Get a credential from a field of a JSON body."""
+
+    async def get(request: Request) -> Optional[str]:
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        value = body.get(name) if isinstance(body, dict) else None
+        return value if isinstance(value, str) else None
+
+    return get
+
+
+def query_param(name: str) -> CredentialGetter:
+    """Get a credential from a query parameter."""
+
+    async def get(request: Request) -> Optional[str]:
+        return request.query_params.get(name)
+
+    return get
+
+
+rate_limiter = RateLimiter(
+    MongoRateLimitStore()
+    if settings.RATE_LIMIT_STORE == "mongo"
+    else InMemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+)
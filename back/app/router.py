@@ -5,6 +5,7 @@ Module for routing endpoints.
 from fastapi import APIRouter
 
 from app.auth.endpoints import auth_router
+from app.auth.hashing import password_hasher
 from app.cafe.announcement.endpoints import announcement_router
 from app.cafe.endpoints import cafe_router
 from app.menu.category.endpoints import category_router
@@ -36,3 +37,9 @@ router.include_router(notification_router, tags=["notifications"])
 def health():
     """Health check."""
     return {"status": "ok"}
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Process metrics."""
+    return {"password_hashing": password_hasher.metrics()}
@@ -2,20 +2,89 @@
 Module for handling search-related routes.
 """
 
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
 
-from app.search.service import search
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.models import ErrorResponse
+from app.pagination import CursorPage
+from app.rate_limit import RateLimit
+from app.search.models import SearchResultOut, SuggestionOut
+from app.search.service import search, search_all
+from app.search.suggest import suggestion_index
 
 search_router = APIRouter()
 
+search_rate_limit = RateLimit("search", per_ip=settings.RATE_LIMIT_SEARCH_PER_IP)
+
+
+def _filters(is_open: Optional[bool], in_stock: Optional[bool]) -> dict:
+    """Get the search filters that were given."""
+    return {
+        key: value
+        for key, value in {"is_open": is_open, "in_stock": in_stock}.items()
+        if value is not None
+    }
 
-@search_router.get("/search")
-async def perform_search(query: str):
-    """Search for cafes and menu items."""
+
+@search_router.get(
+    "/search",
+    response_model=CursorPage[SearchResultOut],
+    responses={429: {"model": ErrorResponse}},
+    dependencies=[Depends(search_rate_limit)],
+)
+async def perform_search(
+    query: str = Query(..., min_length=1, description="Search query"),
+    size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor of the next page"),
+    is_open: Optional[bool] = Query(None, description="Only open or closed cafes"),
+    in_stock: Optional[bool] = Query(None, description="Only items in or out of stock"),
+):
+    """Search for cafes and menu items, ranked by relevance."""
     try:
-        results = await search(query)
-        return results
-    except Exception as e:
+        items, next_cursor = await search(
+            query, size, cursor, **_filters(is_open, in_stock)
+        )
+    except ValueError:
         raise HTTPException(
-            status_code=500, detail=f"Erreur lors de la recherche: {str(e)}"
+            status_code=400,
+            detail=[{"msg": "Invalid cursor."}],
         )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@search_router.get(
+    "/search/stream",
+    response_class=StreamingResponse,
+    responses={429: {"model": ErrorResponse}},
+    dependencies=[Depends(search_rate_limit)],
+)
+async def stream_search(
+    query: str = Query(..., min_length=1, description="Search query"),
+    is_open: Optional[bool] = Query(None, description="Only open or closed cafes"),
+    in_stock: Optional[bool] = Query(None, description="Only items in or out of stock"),
+):
+    """Stream every search result as newline-delimited JSON, ranked by relevance."""
+
+    async def result_stream():
+        async for result in search_all(query, **_filters(is_open, in_stock)):
+            yield SearchResultOut.model_validate(result).model_dump_json() + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+@search_router.get(
+    "/search/suggest",
+    response_model=List[SuggestionOut],
+    responses={429: {"model": ErrorResponse}},
+    dependencies=[Depends(search_rate_limit)],
+)
+async def suggest(
+    query: str = Query(..., min_length=1, description="Partial search query"),
+    limit: int = Query(10, ge=1, le=50, description="Number of suggestions"),
+):
+    """Suggest cafes, items, tags and pavillons completing a partial query."""
+    suggestions = await suggestion_index.suggest(query, limit)
+    return [{"text": text, "type": kind} for kind, text in suggestions]
@@ -4,9 +4,40 @@ Module for handling search-related models.
 
 from typing import List, Optional
 
+import pymongo
+from beanie import Document, PydanticObjectId
 from pydantic import BaseModel
+from pymongo import IndexModel
 
 from app.cafe.models import Cafe
+from app.interaction.enums import TargetType
+
+
+class SearchEntry(Document):
+    """Search index entry of a cafe or a menu item."""
+
+    target_id: PydanticObjectId
+    target_type: TargetType
+    cafe_id: PydanticObjectId
+    name: str
+    image_url: Optional[str] = None
+    is_open: Optional[bool] = None
+    in_stock: Optional[bool] = None
+    text: str
+    grams: List[str] = []
+
+    class Settings:
+        """Settings for search entry document."""
+
+        name = "search_entries"
+        indexes = [
+            IndexModel([("grams", pymongo.ASCENDING)]),
+            IndexModel(
+                [("target_type", pymongo.ASCENDING), ("target_id", pymongo.ASCENDING)],
+                unique=True,
+            ),
+            IndexModel([("cafe_id", pymongo.ASCENDING)]),
+        ]
 
 
 class SearchCreate(BaseModel):
@@ -15,6 +46,25 @@ class SearchCreate(BaseModel):
     query: str
 
 
+class SearchResultOut(BaseModel):
+    """Model for search result output."""
+
+    id: PydanticObjectId
+    type: TargetType
+    name: str
+    cafe_id: PydanticObjectId
+    cafe_slug: Optional[str] = None
+    image_url: Optional[str] = None
+    score: float
+
+
+class SuggestionOut(BaseModel):
+    """Model for search suggestion output."""
+
+    text: str
+    type: str
+
+
 class SearchOut(BaseModel):
     """Model for search output."""
 
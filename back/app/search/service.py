@@ -2,10 +2,30 @@
 Module for handling search-related operations.
 """
 
+import math
+import re
 import unicodedata
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import DeleteMany, UpdateMany, UpdateOne
 
 from app.cafe.models import Cafe
+from app.interaction.enums import TargetType
+from app.menu.item.models import MenuItem
+from app.pagination import (
+    SortKeys,
+    cursor_values,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+from app.search.models import SearchEntry
+
+GRAM_SIZE = 3
+# Share of the selective query grams an entry must have to be a candidate
+MIN_GRAM_SHARE = 0.5
+SEARCH_SORT: SortKeys = [("score", -1), ("name", 1), ("_id", 1)]
 
 
 async def normalize_query(query: str) -> str:
@@ -17,56 +37,240 @@ async def normalize_query(query: str) -> str:
     )
 
 
-async def search(query: str, **filters) -> Dict[str, List[Any]]:
-    """Search for cafes and menu items based on the provided query."""
-    normalized_query = await normalize_query(query)
-    regex_pattern = {"$regex": normalized_query, "$options": "i"}
-
-    for key in ["is_open", "in_stock"]:
-        if key in filters:
-            if filters[key].lower() == "true":
-                filters[key] = True
-            elif filters[key].lower() == "false":
-                filters[key] = False
-
-    # Combining the search for cafes by their name and by menu items
-    combined_query = {
-        "$or": [
-            {"name": regex_pattern},
-            {"menu_items": {"$elemMatch": {"name": regex_pattern}}},
-            {"menu_items": {"$elemMatch": {"tags": regex_pattern}}},
-        ]
-    }
-    combined_query.update(filters)
-    matching_cafes_full = await Cafe.find(combined_query).to_list()
-
-    matching_cafes_and_items = []
-    for cafe in matching_cafes_full:
-        filtered_menu_items = [
-            item
-            for item in cafe.menu_items
-            if normalized_query.lower() in item.name.lower()
-            or any(normalized_query.lower() in tag.lower() for tag in item.tags)
+async def fold(text: str) -> str:
+    """Fold text for matching: no diacritics, lowercase, single spaces."""
+    normalized = (await normalize_query(text)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", normalized))
+
+
+def ngrams(text: str, prefix: bool = False) -> List[str]:
+    """
+    Get the distinct trigrams of folded text.
+
+    Words are padded with spaces, so short words still have grams. In
+    `prefix` mode the last word is only padded on the left, so a partial
+    word matches the words starting with it.
+    """
+    words = text.split()
+    grams = []
+    for i, word in enumerate(words):
+        padded = " " * (GRAM_SIZE - 1) + word
+        if not (prefix and i == len(words) - 1):
+            padded += " "
+        for j in range(len(padded) - GRAM_SIZE + 1):
+            gram = padded[j : j + GRAM_SIZE]
+            if gram not in grams:
+                grams.append(gram)
+    return grams
+
+
+def selective_grams(grams: List[str]) -> List[str]:
+    """
+    Get the grams worth looking up, without the leading pad grams.
+
+    A leading pad gram only holds the first letter of a word, so it matches
+    most of the index. It is kept if there is no other gram.
+    """
+    selective = [gram for gram in grams if not gram.startswith(" " * (GRAM_SIZE - 1))]
+    return selective or grams
+
+
+def min_shared_grams(grams: List[str]) -> int:
+    """Get the number of query grams an entry must share to be a candidate."""
+    return max(1, math.ceil(len(grams) * MIN_GRAM_SHARE))
+
+
+async def search(
+    query: str, size: int, cursor: Optional[str] = None, **filters
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get a page of cafes and menu items, ranked by similarity to the query.
+
+    Pages are keyset paginated: `cursor` is the `next_cursor` of the
+    previous page, and is None on the last page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    pipeline = await _build_pipeline(query, after, size + 1, **filters)
+    results = await SearchEntry.aggregate(pipeline).to_list()
+
+    next_cursor = None
+    if len(results) > size:
+        results = results[:size]
+        next_cursor = encode_cursor(cursor_values(SEARCH_SORT, results[-1]))
+    return results, next_cursor
+
+
+async def search_all(query: str, **filters) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every cafe and menu item matching the query, ranked."""
+    pipeline = await _build_pipeline(query, **filters)
+    async for result in SearchEntry.get_motor_collection().aggregate(
+        pipeline, allowDiskUse=True, batchSize=100
+    ):
+        yield result
+
+
+async def _build_pipeline(
+    query: str,
+    after: Optional[List[Any]] = None,
+    limit: Optional[int] = None,
+    **filters,
+) -> List[Dict[str, Any]]:
+    """Build the ranked search pipeline, projected to the result fields."""
+    text = await fold(query)
+    grams = ngrams(text, prefix=True)
+    selective = selective_grams(grams)
+
+    pipeline = [
+        {"$match": {"grams": {"$in": selective}, **filters}},
+        # Drop entries sharing a few grams before scoring and sorting
+        {
+            "$match": {
+                "$expr": {
+                    "$gte": [
+                        {"$size": {"$setIntersection": ["$grams", selective]}},
+                        min_shared_grams(selective),
+                    ]
+                }
+            }
+        },
+        {
+            "$addFields": {
+                "score": {
+                    "$add": [
+                        # Share of the query grams found in the entry
+                        {
+                            "$divide": [
+                                {"$size": {"$setIntersection": ["$grams", grams]}},
+                                max(len(grams), 1),
+                            ]
+                        },
+                        # Bonus when the entry starts with the query
+                        {
+                            "$cond": [
+                                {"$eq": [{"$indexOfCP": ["$text", text]}, 0]},
+                                1,
+                                0,
+                            ]
+                        },
+                    ]
+                }
+            }
+        },
+    ]
+    if after:
+        pipeline.append({"$match": keyset_filter(SEARCH_SORT, after)})
+    pipeline.append({"$sort": dict(SEARCH_SORT)})
+    if limit:
+        pipeline.append({"$limit": limit})
+
+    pipeline.extend(
+        [
+            {
+                "$lookup": {
+                    "from": Cafe.get_collection_name(),
+                    "localField": "cafe_id",
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": {"_id": 0, "slug": 1}}],
+                    "as": "cafe",
+                }
+            },
+            {
+                "$project": {
+                    # Kept for the cursor
+                    "_id": 1,
+                    "id": "$target_id",
+                    "type": "$target_type",
+                    "name": 1,
+                    "cafe_id": 1,
+                    "cafe_slug": {"$arrayElemAt": ["$cafe.slug", 0]},
+                    "image_url": 1,
+                    "score": 1,
+                }
+            },
         ]
+    )
+    return pipeline
+
 
-        cafe_dict = {
-            "_id": str(cafe.id),
-            "cafe_id": str(cafe.id),
+async def index_cafes(*cafes: Cafe) -> None:
+    """Add or refresh cafes in the search index."""
+    operations = []
+    for cafe in cafes:
+        text = await fold(cafe.name)
+        entry = {
+            "cafe_id": cafe.id,
             "name": cafe.name,
-            "slug": cafe.slug,
-            "description": cafe.description,
-            "logo_url": cafe.logo_url,
-            "banner_url": cafe.banner_url,
-            "affiliation": cafe.affiliation,
+            "image_url": str(cafe.logo_url) if cafe.logo_url else None,
             "is_open": cafe.is_open,
-            "status_message": cafe.status_message,
-            "opening_hours": cafe.opening_hours,
-            "location": cafe.location,
-            "contact": cafe.contact,
-            "social_media": cafe.social_media,
-            "payment_details": cafe.payment_details,
-            "menu_items": filtered_menu_items,
+            "text": text,
+            "grams": ngrams(text),
         }
-        matching_cafes_and_items.append(cafe_dict)
+        operations.append(_upsert(TargetType.CAFE, cafe.id, entry))
+        # Items follow the opening status of their cafe
+        operations.append(
+            UpdateMany(
+                {"cafe_id": cafe.id, "target_type": TargetType.ITEM.value},
+                {"$set": {"is_open": cafe.is_open}},
+            )
+        )
+    await _write(operations)
+
+
+async def index_items(*items: MenuItem) -> None:
+    """Add or refresh menu items in the search index."""
+    if not items:
+        return
+
+    cafe_ids = list({item.cafe_id for item in items})
+    is_open = {
+        cafe["_id"]: cafe.get("is_open")
+        for cafe in await Cafe.get_motor_collection()
+        .find({"_id": {"$in": cafe_ids}}, {"is_open": 1})
+        .to_list(None)
+    }
+
+    operations = []
+    for item in items:
+        name = await fold(item.name)
+        text = " ".join([name, *[await fold(tag) for tag in item.tags or []]])
+        entry = {
+            "cafe_id": item.cafe_id,
+            "name": item.name,
+            "image_url": str(item.image_url) if item.image_url else None,
+            "is_open": is_open.get(item.cafe_id),
+            "in_stock": item.in_stock,
+            "text": name,
+            "grams": ngrams(text),
+        }
+        operations.append(_upsert(TargetType.ITEM, item.id, entry))
+    await _write(operations)
+
+
+async def unindex(*target_ids: PydanticObjectId) -> None:
+    """Remove targets from the search index."""
+    if target_ids:
+        await _write([DeleteMany({"target_id": {"$in": list(target_ids)}})])
+
+
+async def rebuild_index() -> None:
+    """Rebuild the search index from every cafe and menu item."""
+    await SearchEntry.delete_all()
+    await index_cafes(*await Cafe.find_all().to_list())
+    await index_items(*await MenuItem.find_all().to_list())
+
+
+def _upsert(
+    target_type: TargetType, target_id: PydanticObjectId, entry: Dict[str, Any]
+) -> UpdateOne:
+    """Build the upsert of a search entry."""
+    return UpdateOne(
+        {"target_type": target_type.value, "target_id": target_id},
+        {"$set": entry},
+        upsert=True,
+    )
+
 
-    return matching_cafes_and_items
+async def _write(operations: List[Any]) -> None:
+    """Apply search index operations in a single round trip."""
+    if operations:
+        await SearchEntry.get_motor_collection().bulk_write(operations, ordered=False)
@@ -0,0 +1,307 @@
+"""
+Module for handling search suggestions, served from an in-memory prefix trie.
+"""
+
+import heapq
+from itertools import count
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from app.cafe.models import Cafe
+from app.config import settings
+from app.menu.item.models import MenuItem
+from app.search.service import fold
+
+# Suggestion kinds
+CAFE = "CAFE"
+ITEM = "ITEM"
+TAG = "TAG"
+PAVILLON = "PAVILLON"
+
+
+class TrieNode:
+    """Node of the suggestion trie, reached through an edge of one or more chars."""
+
+    __slots__ = ("edge", "children", "entries", "best")
+
+    def __init__(self, edge: str = ""):
+        self.edge = edge
+        # First char of the child edge -> child
+        self.children: Dict[str, "TrieNode"] = {}
+        # (kind, label) -> {source: weight}, only on nodes ending a term
+        self.entries: Optional[Dict[Tuple[str, str], Dict[Hashable, int]]] = None
+        # Highest popularity in this subtree, to rank without a full walk
+        self.best = 0
+
+    def score(self) -> int:
+        """Get the highest popularity of the entries ending here."""
+        if not self.entries:
+            return 0
+        return max(sum(sources.values()) for sources in self.entries.values())
+
+
+class SuggestionTrie:
+    """
+    Compressed prefix trie of folded terms, ranking suggestions by popularity.
+
+    Chains of single-child nodes are merged into one edge, so the node count
+    stays close to the number of distinct terms. Every term points to
+    display entries (kind and label). An entry's popularity is the sum of
+    the weights given by its sources (a cafe or a menu item), so sources can
+    be updated or removed incrementally.
+    """
+
+    def __init__(self, max_nodes: int = 500_000):
+        """Initialize the trie"""
+        self.root = TrieNode()
+        self.max_nodes = max_nodes
+        self.nodes = 1
+        self._terms: Dict[Hashable, Set[Tuple[str, Tuple[str, str]]]] = {}
+
+    def add(
+        self, term: str, kind: str, label: str, source: Hashable, weight: int = 1
+    ) -> bool:
+        """Add a term for a source, unless it exceeds the memory budget."""
+        # A term adds at most a leaf and a split node
+        if self.nodes + 2 > self.max_nodes:
+            return False
+
+        path = [self.root]
+        i = 0
+        while i < len(term):
+            parent = path[-1]
+            child = parent.children.get(term[i])
+            if child is None:
+                child = parent.children[term[i]] = TrieNode(term[i:])
+                self.nodes += 1
+                path.append(child)
+                break
+
+            common = _common_prefix(child.edge, term, i)
+            if common < len(child.edge):
+                middle = TrieNode(child.edge[:common])
+                middle.best = child.best
+                child.edge = child.edge[common:]
+                middle.children[child.edge[0]] = child
+                parent.children[term[i]] = middle
+                self.nodes += 1
+                child = middle
+            path.append(child)
+            i += common
+
+        node = path[-1]
+        if node.entries is None:
+            node.entries = {}
+        sources = node.entries.setdefault((kind, label), {})
+        sources[source] = weight
+        self._terms.setdefault(source, set()).add((term, (kind, label)))
+
+        score = sum(sources.values())
+        for node in path:
+            node.best = max(node.best, score)
+        return True
+
+    def remove(self, source: Hashable) -> None:
+        """Remove every term added for a source."""
+        for term, key in self._terms.pop(source, set()):
+            path = self._path(term)
+            if path is None:
+                continue
+
+            node = path[-1]
+            sources = node.entries.get(key, {})
+            sources.pop(source, None)
+            if not sources:
+                node.entries.pop(key, None)
+            if not node.entries:
+                node.entries = None
+            self._compact(path)
+            for node in reversed(path):
+                node.best = max(
+                    [node.score(), *(child.best for child in node.children.values())]
+                )
+
+    def suggest(
+        self, prefix: str, limit: int = 10, max_distance: int = 0
+    ) -> List[Tuple[str, str]]:
+        """
+        Get the most popular entries whose terms start with a prefix.
+
+        Prefixes within `max_distance` edits also match, ranked after closer
+        ones.
+        """
+        candidates = self._fuzzy_nodes(prefix, max_distance)
+        tiebreak = count()
+        heap = [
+            (distance, -node.best, next(tiebreak), node)
+            for node, distance in candidates.items()
+        ]
+        heapq.heapify(heap)
+
+        results: List[Tuple[str, str]] = []
+        seen = set()
+        while heap and len(results) < limit:
+            distance, _, _, item = heapq.heappop(heap)
+            if isinstance(item, tuple):
+                if item not in seen:
+                    seen.add(item)
+                    results.append(item)
+                continue
+
+            for key, sources in (item.entries or {}).items():
+                score = sum(sources.values())
+                heapq.heappush(heap, (distance, -score, next(tiebreak), key))
+            for child in item.children.values():
+                heapq.heappush(heap, (distance, -child.best, next(tiebreak), child))
+        return results
+
+    def _path(self, term: str) -> Optional[List[TrieNode]]:
+        """Get the nodes from the root to the node ending a term."""
+        path = [self.root]
+        i = 0
+        while i < len(term):
+            node = path[-1].children.get(term[i])
+            if node is None or not term.startswith(node.edge, i):
+                return None
+            path.append(node)
+            i += len(node.edge)
+        return path
+
+    def _compact(self, path: List[TrieNode]) -> None:
+        """Remove or merge the nodes of a path left without entries."""
+        while len(path) > 1:
+            node, parent = path[-1], path[-2]
+            if node.entries:
+                return
+
+            if not node.children:
+                del parent.children[node.edge[0]]
+                self.nodes -= 1
+                path.pop()
+            elif len(node.children) == 1:
+                (child,) = node.children.values()
+                node.edge += child.edge
+                node.children = child.children
+                node.entries = child.entries
+                self.nodes -= 1
+                return
+            else:
+                return
+
+    def _fuzzy_nodes(self, prefix: str, max_distance: int) -> Dict[TrieNode, int]:
+        """
+        Get the nodes whose path is within `max_distance` edits of a prefix.
+
+        Walks the trie with one Levenshtein row per char, pruning branches
+        that cannot get back under the bound. The first char must match:
+        typos there are rare, and it keeps the walk to one branch.
+        """
+        first_row = list(range(len(prefix) + 1))
+        if first_row[-1] <= max_distance:
+            return {self.root: first_row[-1]}
+
+        matches: Dict[TrieNode, int] = {}
+        first_child = self.root.children.get(prefix[0])
+        stack = [(first_child, first_row)] if first_child else []
+        while stack:
+            node, row = stack.pop()
+            for char in node.edge:
+                previous_row, row = row, [row[0] + 1]
+                for i, prefix_char in enumerate(prefix, start=1):
+                    row.append(
+                        min(
+                            row[i - 1] + 1,
+                            previous_row[i] + 1,
+                            previous_row[i - 1] + (prefix_char != char),
+                        )
+                    )
+                if row[-1] <= max_distance:
+                    matches[node] = min(row[-1], matches.get(node, row[-1]))
+                if min(row) > max_distance:
+                    break
+            else:
+                stack.extend((child, row) for child in node.children.values())
+        return matches
+
+
+def _common_prefix(edge: str, term: str, start: int) -> int:
+    """Get the length of the common prefix of an edge and a term from start."""
+    length = 0
+    for a, b in zip(edge, term[start:]):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+def term_suffixes(text: str) -> List[str]:
+    """Get the folded text from each of its words, to match any word start."""
+    words = text.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def max_distance_for(prefix: str) -> int:
+    """Get the typo tolerance for a prefix length."""
+    if len(prefix) < 3:
+        return 0
+    if len(prefix) < 6:
+        return 1
+    return 2
+
+
+class SuggestionIndex:
+    """Suggestions of cafe names, item names, tags and pavillons."""
+
+    def __init__(self, max_nodes: int):
+        """Initialize the index"""
+        self.trie = SuggestionTrie(max_nodes)
+        self._over_budget = False
+
+    async def build(self) -> None:
+        """Build the index from every cafe and menu item."""
+        self.trie = SuggestionTrie(self.trie.max_nodes)
+        self._over_budget = False
+        await self.add_cafes(*await Cafe.find_all().to_list())
+        await self.add_items(*await MenuItem.find_all().to_list())
+
+    async def add_cafes(self, *cafes: Cafe) -> None:
+        """Add or refresh cafes."""
+        for cafe in cafes:
+            self.trie.remove(cafe.id)
+            self._add(await fold(cafe.name), CAFE, cafe.name, cafe.id)
+            pavillon = cafe.location.pavillon
+            self._add(await fold(pavillon), PAVILLON, pavillon, cafe.id)
+
+    async def add_items(self, *items: MenuItem) -> None:
+        """Add or refresh menu items, weighted by their likes."""
+        for item in items:
+            self.trie.remove(item.id)
+            likes = item.interaction_counts.get("LIKE", 0)
+            self._add(await fold(item.name), ITEM, item.name, item.id, 1 + likes)
+            for tag in item.tags or []:
+                self._add(await fold(tag), TAG, tag, item.id)
+
+    def remove(self, *ids: Hashable) -> None:
+        """Remove cafes or menu items."""
+        for id in ids:
+            self.trie.remove(id)
+
+    async def suggest(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Get suggestions for a partial query, as (kind, label) pairs."""
+        prefix = await fold(query)
+        if not prefix:
+            return []
+        return self.trie.suggest(prefix, limit, max_distance_for(prefix))
+
+    def _add(
+        self, text: str, kind: str, label: str, source: Hashable, weight: int = 1
+    ) -> None:
+        """Add every word suffix of a text."""
+        for term in term_suffixes(text):
+            if not self.trie.add(term, kind, label, source, weight):
+                if not self._over_budget:
+                    print("Suggestion index memory budget reached")
+                    self._over_budget = True
+                return
+
+
+suggestion_index = SuggestionIndex(max_nodes=settings.SUGGEST_MAX_NODES)
@@ -2,9 +2,12 @@
 Module for global service.
 """
 
-from typing import Dict
+from typing import Any, Dict, List, Mapping, Optional, Union
 
-from beanie import PydanticObjectId
+from beanie import Document, PydanticObjectId
+from beanie.odm.actions import ActionDirections, ActionRegistry, EventTypes
+from beanie.odm.utils.encoder import Encoder
+from fastapi import HTTPException, status
 from pydantic import BaseModel
 
 
@@ -29,7 +32,7 @@ def parse_query_params(query_params: Dict) -> Dict:
             value = PydanticObjectId(value)
 
         #  fastapi-pagination compatibility
-        if key in ["page", "size"]:
+        if key in ["page", "size", "cursor", "explain"]:
             continue
         if "__" in key:
             parts = key.split("__")
@@ -44,13 +47,106 @@ def parse_query_params(query_params: Dict) -> Dict:
     return parsed_params
 
 
-def set_attributes(obj: BaseModel, data: BaseModel):
-    """Set object attributes."""
+def interaction_counts_expression(counts: Union[str, Dict]) -> Dict:
+    """Build the aggregation expression exposing interaction counts."""
+    return {
+        "$map": {
+            "input": {
+                "$filter": {
+                    "input": {"$objectToArray": {"$ifNull": [counts, {}]}},
+                    "cond": {"$gt": ["$$this.v", 0]},
+                }
+            },
+            "as": "count",
+            "in": {"type": "$$count.k", "count": "$$count.v", "me": False},
+        }
+    }
+
+
+def set_attributes(obj: BaseModel, data: BaseModel) -> Dict[str, Any]:
+    """Set object attributes, returning the previous values of changed ones."""
+    previous = {}
     for field, value in data.model_dump(exclude_unset=True).items():
-        if field.endswith("_id"):
-            if value is None:
-                setattr(obj, field, None)
-            else:
-                setattr(obj, field, PydanticObjectId(value))
-        else:
-            setattr(obj, field, value)
+        if field.endswith("_id") and value is not None:
+            value = PydanticObjectId(value)
+        old_value = getattr(obj, field)
+        setattr(obj, field, value)
+        if getattr(obj, field) != old_value:
+            previous[field] = old_value
+    return previous
+
+
+async def update_document(
+    document: Document,
+    update: Mapping[str, Any],
+    expected: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """
+    Apply update operators (e.g. `$set`, `$addToSet`) to a stored document.
+
+    Unlike `save`, only the given fields are sent and the document is not
+    re-parsed. `expected` values must still be stored, or it is a conflict.
+    The after-update hooks of the model run, e.g. to invalidate caches.
+    """
+    filters = {"_id": document.id, **(expected or {})}
+    result = await document.find_one(filters).update(dict(update))
+    if result.matched_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=[{"msg": "The resource was modified concurrently. Try again."}],
+        )
+    await ActionRegistry.run_actions(
+        document, EventTypes.UPDATE, ActionDirections.AFTER, exclude=[]
+    )
+
+
+async def update_fields(
+    document: Document,
+    previous: Mapping[str, Any],
+    update: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """
+    Store changed fields of a document with `$set`.
+
+    `previous` holds the values before the change, as returned by
+    `set_attributes`. The update only applies if they are still stored, so
+    concurrent edits of the same fields are not silently overwritten. Other
+    operators can be given in `update`.
+    """
+    update = dict(update or {})
+    if not previous and not update:
+        return
+
+    encoder = Encoder(to_db=True)
+    conditions = []
+    for field, value in previous.items():
+        key = document.model_fields[field].alias or field
+        update.setdefault("$set", {})[key] = encoder.encode(getattr(document, field))
+        conditions.extend(stored_conditions(key, encoder.encode(value)))
+    await update_document(
+        document, update, {"$and": conditions} if conditions else None
+    )
+
+
+def stored_conditions(key: str, value: Any) -> List[Dict[str, Any]]:
+    """
+    Build the conditions matching an encoded value stored under a key.
+
+    Subdocuments and lists are compared leaf by leaf, so the key order of a
+    stored subdocument does not matter. A missing leaf matches, as it was
+    loaded with its default, e.g. a field added to the model since.
+    """
+    if isinstance(value, dict) and value:
+        return [
+            condition
+            for name, item in value.items()
+            for condition in stored_conditions(f"{key}.{name}", item)
+        ]
+    if isinstance(value, list) and value:
+        size = {"$or": [{key: {"$size": len(value)}}, {key: {"$exists": False}}]}
+        return [size] + [
+            condition
+            for index, item in enumerate(value)
+            for condition in stored_conditions(f"{key}.{index}", item)
+        ]
+    return [{"$or": [{key: value}, {key: {"$exists": False}}]}]
@@ -0,0 +1,35 @@
+"""
+Module for handling the user principal cache.
+"""
+
+from typing import Optional
+
+from beanie import Document, PydanticObjectId
+
+from app.cache import TTLCache
+from app.config import settings
+
+
+class UserCache:
+    """Process-wide cache of authenticated users by ID."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize the cache"""
+        self._users = TTLCache(maxsize, ttl)
+
+    def get(self, id: PydanticObjectId) -> Optional[Document]:
+        """Get a copy of a cached user, safe for the caller to modify."""
+        user = self._users.get(str(id))
+        return user.model_copy(deep=True) if user else None
+
+    def set(self, user: Document) -> None:
+        """Cache a copy of a user."""
+        self._users.set(str(user.id), user.model_copy(deep=True))
+
+    def invalidate(self, *ids: PydanticObjectId) -> None:
+        """Remove users from the cache."""
+        for id in ids:
+            self._users.pop(str(id))
+
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
@@ -2,17 +2,20 @@
 Module for handling user-related routes.
 """
 
-from typing import Optional, TypeVar, List
+from typing import Optional, TypeVar, List, Union
 
 from beanie import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
-from fastapi_pagination import Params
+from fastapi_pagination import Page as BasePage, Params, create_page
 from fastapi_pagination.customization import CustomizedPage, UseParams
 from fastapi_pagination.ext.beanie import paginate
 from fastapi_pagination.links import Page
 from pymongo.errors import DuplicateKeyError
 
-from app.auth.dependencies import get_current_user, get_current_user_aggregate
+from app.auth.dependencies import (
+    get_current_user as get_authenticated_user,
+    get_current_user_aggregate,
+)
 from app.models import ErrorConflictResponse, ErrorResponse
 from app.service import parse_query_params
 from app.user.models import User, UserAggregateOut, UserOut, UserUpdate, FavoriteRequest, ArticleFavoriteRequest, FavoriteType, BulkFavoriteRequest, FavoriteResponse
@@ -35,6 +38,19 @@ UserPage = CustomizedPage[
 ]
 
 
+class FavoriteParams(Params):
+    """Pagination parameters of favorites."""
+
+    size: int = Query(50, ge=1, le=500, description="Page size")
+    page: int = Query(1, ge=1, description="Page number")
+
+
+FavoritePage = CustomizedPage[
+    BasePage[T],
+    UseParams(FavoriteParams),
+]
+
+
 user_router = APIRouter()
 
 
@@ -55,17 +71,29 @@ async def get_current_user(
 @user_router.get(
     "/users/@me/favorites",
     summary="Get current user's favorite cafes or items",
-    response_model=List[PydanticObjectId],
-    responses={ 401: {"model": ErrorResponse} },
+    response_model=Union[List[PydanticObjectId], FavoritePage[PydanticObjectId]],
+    responses={401: {"model": ErrorResponse}},
 )
 async def get_current_user_favorites(
     type: FavoriteType = Query(..., description="Type of favorite to retrieve"),
-    current_user: User = Depends(get_current_user_aggregate),
+    page: Optional[int] = Query(
+        None, ge=1, description="Page number, to get a page instead of the list"
+    ),
+    size: int = Query(50, ge=1, le=500, description="Page size"),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if type == FavoriteType.CAFE:
-        return current_user.favorite_cafes
-    if type == FavoriteType.ITEM:
-        return current_user.favorite_items
+    """Get my favorite cafes or items, or a page of them with `page`. (`MEMBER`)"""
+    if page is None:
+        ids, _ = await UserService.get_favorites(current_user.id, type)
+        return ids
+
+    params = FavoriteParams(page=page, size=size)
+    raw_params = params.to_raw_params()
+    ids, total = await UserService.get_favorites(
+        current_user.id, type, raw_params.offset, raw_params.limit
+    )
+    return create_page(ids, total=total, params=params)
+
 
 @user_router.post(
     "/users/@me/favorites",
@@ -75,20 +103,12 @@ async def get_current_user_favorites(
 )
 async def add_favorites(
     data: FavoriteRequest,
-    current_user: User = Depends(get_current_user_aggregate),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if data.type == FavoriteType.CAFE:
-        await UserService.add_favorite_cafe(current_user, [data.id])
-    if data.type == FavoriteType.ITEM:
-        await UserService.add_favorite_item(current_user, [data.id])
-    else:
-        raise HTTPException(status_code=400, detail="Invalid favorite type.")
-
-    return FavoriteResponse(
-        type = data.type,
-        ids = [data.id],
-        status="added"
-    )
+    """Add a cafe or item to my favorites. (`MEMBER`)"""
+    await UserService.add_favorites(current_user, data.type, [data.id])
+    return FavoriteResponse(type=data.type, ids=[data.id], status="added")
+
 
 @user_router.delete(
     "/users/@me/favorites",
@@ -97,20 +117,11 @@ async def add_favorites(
 )
 async def remove_favorites(
     data: FavoriteRequest,
-    current_user: User = Depends(get_current_user_aggregate),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if data.type == FavoriteType.CAFE:
-        await UserService.remove_favorite_cafe(current_user, [data.id])
-    if data.type == FavoriteType.ITEM:
-        await UserService.remove_favorite_item(current_user, [data.id])
-    else:
-        raise HTTPException(status_code=400, detail="Invalid favorite type.")
-
-    return FavoriteResponse(
-        type = data.type,
-        ids = [data.id],
-        status="removed"
-    )
+    """Remove a cafe or item from my favorites. (`MEMBER`)"""
+    await UserService.remove_favorites(current_user, data.type, [data.id])
+    return FavoriteResponse(type=data.type, ids=[data.id], status="removed")
 
 
 @user_router.patch(
@@ -120,42 +131,25 @@ async def remove_favorites(
 )
 async def toggle_user_favorite(
     data: FavoriteRequest,
-    current_user: User = Depends(get_current_user_aggregate),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if data.type == FavoriteType.CAFE:
-        result = await UserService.toggle_favorite_cafe(current_user, data.id)
-    if data.type == FavoriteType.ITEM:
-        result = await UserService.toggle_favorite_item(current_user, data.id)
-    else:
-        raise HTTPException(status_code=400, detail="Invalid favorite type.")
-
-    return FavoriteResponse(
-        type = data.type,
-        ids = [data.id],
-        status = result.action
-    )
-    
-    
+    """Add a cafe or item to my favorites, or remove it. (`MEMBER`)"""
+    action = await UserService.toggle_favorite(current_user, data.type, data.id)
+    return FavoriteResponse(type=data.type, ids=[data.id], status=action)
+
+
 @user_router.post(
     "/users/@me/favorites/bulk",
     response_model=FavoriteResponse,
 )
 async def add_bulk_favorites(
     data: BulkFavoriteRequest,
-    current_user: User = Depends(get_current_user_aggregate),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if data.type == FavoriteType.CAFE:
-        await UserService.add_favorite_cafe(current_user, data.ids)
-    if data.type == FavoriteType.ITEM:
-        await UserService.add_favorite_item(current_user, data.ids)
-    else:
-        raise HTTPException(status_code=400, detail="Invalid favorite type.")
-    
-    return FavoriteResponse(
-        type = data.type,
-        ids = data.ids,
-        status="added"
-    )
+    """Add cafes or items to my favorites. (`MEMBER`)"""
+    await UserService.add_favorites(current_user, data.type, data.ids)
+    return FavoriteResponse(type=data.type, ids=data.ids, status="added")
+
 
 @user_router.delete(
     "/users/@me/favorites/bulk",
@@ -163,20 +157,11 @@ async def add_bulk_favorites(
 )
 async def remove_bulk_favorites(
     data: BulkFavoriteRequest,
-    current_user: User = Depends(get_current_user_aggregate),
+    current_user: User = Depends(get_authenticated_user),
 ):
-    if data.type == FavoriteType.CAFE:
-        await UserService.remove_favorite_cafe(current_user, data.ids)
-    if data.type == FavoriteType.ITEM:
-        await UserService.remove_favorite_item(current_user, data.ids)
-    else:
-        raise HTTPException(status_code=400, detail="Invalid favorite type.")
-    
-    return FavoriteResponse(
-        type = data.type,
-        ids = data.ids,
-        status="removed"
-    )
+    """Remove cafes or items from my favorites. (`MEMBER`)"""
+    await UserService.remove_favorites(current_user, data.type, data.ids)
+    return FavoriteResponse(type=data.type, ids=data.ids, status="removed")
 
 
 @user_router.put(
@@ -189,7 +174,7 @@ async def remove_bulk_favorites(
 )
 async def update_current_user(
     data: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Update current user. (`MEMBER`)"""
     try:
@@ -214,7 +199,7 @@ async def update_current_user(
     },
 )
 async def delete_my_account(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Delete my account permanently from the database. (`MEMBER`)"""
     await UserService.delete_my_account(current_user)
@@ -256,7 +241,7 @@ async def get_user(
 )
 async def update_my_cafes(
     cafe_id: str = Query(..., description="ID of the cafe to add to favorites"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Add a cafe to my favorites. (`MEMBER`)"""
     try:
@@ -286,7 +271,7 @@ async def update_my_cafes(
 )
 async def delete_my_cafes(
     cafe_id: str = Query(..., description="ID of the cafe to remove from favorites"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Remove a cafe from my favorites. (`MEMBER`)"""
     try:
@@ -317,7 +302,7 @@ async def delete_my_cafes(
 )
 async def update_my_articles(
     data: ArticleFavoriteRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Add an article to my favorites. (`MEMBER`)"""
     try:
@@ -347,7 +332,7 @@ async def update_my_articles(
 )
 async def delete_my_articles(
     data: ArticleFavoriteRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Remove an article from my favorites. (`MEMBER`)"""
     try:
@@ -380,7 +365,7 @@ async def delete_my_articles(
 async def update_user(
     data: UserUpdate,
     id: PydanticObjectId = Path(..., description="ID of the user"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Update a user. (`MEMBER`)"""
     user = await UserService.get_by_id(id)
@@ -420,7 +405,7 @@ async def update_user(
 )
 async def delete_user(
     id: PydanticObjectId = Path(..., description="ID of the user"),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_authenticated_user),
 ):
     """Delete a user. (`MEMBER`)"""
     user = await UserService.get_by_id(id)
@@ -7,12 +7,21 @@ from datetime import datetime
 from typing import List, Literal, Optional, Dict
 
 import pymongo
-from beanie import PydanticObjectId
+from beanie import (
+    Delete,
+    Insert,
+    PydanticObjectId,
+    Replace,
+    Save,
+    Update,
+    after_event,
+)
 from pydantic import BaseModel, EmailStr, Field, HttpUrl, field_validator
 from pymongo import IndexModel
 from enum import Enum
 from app.cafe.staff.enums import Role
 from app.models import CustomDocument, Id
+from app.user.cache import user_cache
 
 
 # --- Diet Model ---
@@ -103,6 +112,11 @@ class User(CustomDocument, UserBase):
     cafe_favs: List[str] = Field(default_factory=list)
     articles_favs: List[List[str]] = Field(default_factory=list)
 
+    @after_event([Insert, Save, Replace, Update, Delete])
+    def invalidate_cache(self):
+        """Invalidate cached copies."""
+        user_cache.invalidate(self.id)
+
     class Settings:
         """Settings for user document."""
 
@@ -115,6 +129,16 @@ class User(CustomDocument, UserBase):
         ]
 
 
+class UserCredentials(BaseModel):
+    """User projection checked at login, without the profile and favorites."""
+
+    id: PydanticObjectId = Field(alias="_id")
+    hashed_password: str
+    login_attempts: int = 0
+    last_login_attempt: Optional[datetime] = None
+    lockout_until: Optional[datetime] = None
+
+
 class UserCreate(UserBase):
     """Model for creating users."""
 
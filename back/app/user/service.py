@@ -2,15 +2,26 @@
 Module for handling user-related operations.
 """
 
-from typing import List, Literal, Optional, Union, overload
+from typing import List, Literal, Optional, Tuple, Union, overload
 from fastapi import HTTPException
 from beanie import PydanticObjectId
 from beanie.odm.queries.find import FindMany
 from pymongo import ASCENDING, DESCENDING
 
-from app.auth.security import get_password
+from app.auth.hashing import password_hasher
 from app.cafe.models import Cafe
-from app.user.models import User, UserCreate, UserUpdate
+from app.cafe.service import CafeService
+from app.service import update_document, update_fields
+from app.user.cache import user_cache
+from app.user.models import FavoriteType, User, UserCreate, UserUpdate
+
+# Stored list of favorite ids of each type
+FAVORITE_FIELDS = {
+    FavoriteType.CAFE: "favorite_cafes",
+    FavoriteType.ITEM: "favorite_items",
+}
+# User fields embedded as owner and staff in the cafe detail documents
+VIEW_FIELDS = {"username", "email", "first_name", "last_name", "photo_url"}
 
 
 class UserService:
@@ -52,6 +63,18 @@ class UserService:
         result = await User.aggregate(pipeline).to_list()
         return result[0] if result else None
 
+    @staticmethod
+    async def get_principal(
+        id: PydanticObjectId, cached: bool = True
+    ) -> Optional[User]:
+        """Get an authenticated user by id, through the user cache if `cached`."""
+        user = user_cache.get(id) if cached else None
+        if not user:
+            user = await UserService.get_by_id(id)
+            if user:
+                user_cache.set(user)
+        return user
+
     @staticmethod
     async def get_by_username(username: str) -> Optional[User]:
         """Get a user by username."""
@@ -68,7 +91,7 @@ class UserService:
         user = User(
             email=data.email,
             username=data.username,
-            hashed_password=get_password(data.password),
+            hashed_password=await password_hasher.hash(data.password),
             first_name=data.first_name,
             last_name=data.last_name,
             photo_url=data.photo_url,
@@ -89,16 +112,38 @@ class UserService:
 
         update_data = data.model_dump(exclude_unset=True)
 
+        previous = {}
         if "password" in update_data:
-            user.hashed_password = get_password(update_data["password"])
+            previous["hashed_password"] = user.hashed_password
+            user.hashed_password = await password_hasher.hash(update_data["password"])
             del update_data["password"]
 
         for field, value in update_data.items():
-            setattr(user, field, value)
+            if getattr(user, field) != value:
+                previous[field] = getattr(user, field)
+                setattr(user, field, value)
 
-        await user.save()
+        await update_fields(user, previous)
+        if previous.keys() & VIEW_FIELDS:
+            await UserService._refresh_cafe_views(user.id)
         return user
 
+    @staticmethod
+    async def _refresh_cafe_views(*user_ids: PydanticObjectId) -> None:
+        """Rebuild the detail documents of the cafes the users own or staff."""
+        ids = {"$in": list(user_ids)}
+        cafes = await Cafe.get_motor_collection().distinct(
+            "_id",
+            {
+                "$or": [
+                    {"owner_id": ids},
+                    {"staff.admin_ids": ids},
+                    {"staff.volunteer_ids": ids},
+                ]
+            },
+        )
+        await CafeService.refresh_view(*cafes)
+
     @staticmethod
     async def delete(user: User):
         """Delete a user."""
@@ -109,77 +154,80 @@ class UserService:
         #     )
         #     await user.update({"$set": {"is_active": False}})
 
+        await update_document(user, {"$set": {"is_active": False}})
         user.is_active = False
-        await user.save()
 
     @staticmethod
-    async def toggle_favorite_cafe(user: User, cafe_id: PydanticObjectId):
-        if cafe_id in user.favorite_cafes:
-            user.favorite_cafes.remove(cafe_id)
-            action = "removed"
-        else:
-            user.favorite_cafes.append(cafe_id)
-            action = "added"
-
-        await user.save()
-        return { "cafe_id": cafe_id, "action": action }
+    async def get_favorites(
+        user_id: PydanticObjectId,
+        type: FavoriteType,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[PydanticObjectId], int]:
+        """Get the favorites of a user, or a slice of them, with their total."""
+        field = FAVORITE_FIELDS[type]
+        ids = f"${field}" if limit is None else {"$slice": [f"${field}", offset, limit]}
+        pipeline = [
+            {"$match": {"_id": user_id}},
+            {
+                "$project": {
+                    "_id": 0,
+                    "ids": ids,
+                    "total": {"$size": f"${field}"},
+                }
+            },
+        ]
+        result = await User.aggregate(pipeline).to_list()
+        if not result:
+            return [], 0
+        return result[0]["ids"], result[0]["total"]
 
     @staticmethod
-    async def toggle_favorite_item(user: User, item_id: PydanticObjectId):
-        if item_id in user.favorite_items:
-            user.favorite_items.remove(item_id)
-            action = "removed"
-        else:
-            user.favorite_items.append(item_id)
-            action = "added"
+    async def add_favorites(
+        user: User, type: FavoriteType, ids: List[PydanticObjectId]
+    ) -> None:
+        """Add favorites, without rewriting the list."""
+        field = FAVORITE_FIELDS[type]
+        await update_document(user, {"$addToSet": {field: {"$each": ids}}})
+        favorites = getattr(user, field)
+        favorites.extend(id for id in dict.fromkeys(ids) if id not in favorites)
 
-        await user.save()
-        return { "item_id": item_id, "action": action }
-    
-    
     @staticmethod
-    async def add_favorite_cafe(user: User, cafe_ids: list[PydanticObjectId]) -> None:
-        """Add a cafe to the user list of favorite cafe."""
-        existing = set(user.favorite_cafes)
-        new_favs = list(existing.union(cafe_ids))
-        user.favorite_cafes = new_favs
-        await user.save()
-        
-        return user.favorite_cafes
-        
-    
-    @staticmethod
-    async def remove_favorite_cafe(user: User, cafe_ids: list[PydanticObjectId]) -> None:
-        """Remove a cafe to the user list of favorite cafe."""
-        existing = set(user.favorite_cafes)
-        updated_favs  = list(existing.difference(cafe_ids))
-        user.favorite_cafes = updated_favs
-        await user.save()
-        
-        return user.favorite_cafes
+    async def remove_favorites(
+        user: User, type: FavoriteType, ids: List[PydanticObjectId]
+    ) -> None:
+        """Remove favorites, without rewriting the list."""
+        field = FAVORITE_FIELDS[type]
+        await update_document(user, {"$pull": {field: {"$in": ids}}})
+        setattr(user, field, [id for id in getattr(user, field) if id not in ids])
 
-
-    @staticmethod
-    async def add_favorite_item(user: User, item_ids: list[PydanticObjectId]) -> None:
-        """Add an item to the user list of favorite items."""
-        existing = set(user.favorite_items)
-        new_favs = list(existing.union(item_ids))
-        user.favorite_items = new_favs
-        await user.save()
-        
-        return user.favorite_items
-        
-    
     @staticmethod
-    async def remove_favorite_item(user: User, item_ids: list[PydanticObjectId]) -> None:
-        """Remove an item to the user list of favorite items."""
-        existing = set(user.favorite_items)
-        updated_favs  = list(existing.difference(item_ids))
-        user.favorite_items = updated_favs
-        await user.save()
-        
-        return user.favorite_items
+    async def toggle_favorite(
+        user: User, type: FavoriteType, id: PydanticObjectId
+    ) -> Literal["added", "removed"]:
+        """
+        Add a favorite, or remove it if the user already has it.
+
+        The check and the change are one atomic update, so that concurrent
+        toggles never leave a duplicate or undo each other silently.
+        """
+        field = FAVORITE_FIELDS[type]
+        result = await User.find_one({"_id": user.id, field: {"$ne": id}}).update(
+            {"$addToSet": {field: id}}
+        )
+        if result.matched_count:
+            action = "added"
+        else:
+            await User.find_one({"_id": user.id}).update({"$pull": {field: id}})
+            action = "removed"
 
+        user_cache.invalidate(user.id)
+        favorites = getattr(user, field)
+        if action == "added" and id not in favorites:
+            favorites.append(id)
+        elif action == "removed" and id in favorites:
+            favorites.remove(id)
+        return action
 
     @staticmethod
     async def delete_my_account(user: Union[User, dict]):
@@ -201,8 +249,8 @@ class UserService:
         if cafe.id in user.cafe_ids:
             return
 
+        await update_document(user, {"$addToSet": {"cafe_ids": cafe.id}})
         user.cafe_ids.append(cafe.id)
-        await user.save()
 
 
     @staticmethod
@@ -211,8 +259,8 @@ class UserService:
         if cafe.id not in user.cafe_ids:
             return
 
+        await update_document(user, {"$pull": {"cafe_ids": cafe.id}})
         user.cafe_ids.remove(cafe.id)
-        await user.save()
 
     @staticmethod
     async def add_favorite_cafe(
@@ -231,8 +279,8 @@ class UserService:
         if cafe_id in user.cafe_favs:
             return user
 
+        await update_document(user, {"$addToSet": {"cafe_favs": cafe_id}})
         user.cafe_favs.append(cafe_id)
-        await user.save()
         return user
     
     @staticmethod
@@ -257,8 +305,8 @@ class UserService:
         if favorite_entry in user.articles_favs:
             return user
 
+        await update_document(user, {"$addToSet": {"articles_favs": favorite_entry}})
         user.articles_favs.append(favorite_entry)
-        await user.save()
         return user
 
     @staticmethod
@@ -283,8 +331,8 @@ class UserService:
         if favorite_entry not in user.articles_favs:
             return user
 
+        await update_document(user, {"$pull": {"articles_favs": favorite_entry}})
         user.articles_favs.remove(favorite_entry)
-        await user.save()
         return user
         
 
@@ -305,19 +353,20 @@ class UserService:
         if cafe_id not in user.cafe_favs:
             return user
 
+        await update_document(user, {"$pull": {"cafe_favs": cafe_id}})
         user.cafe_favs.remove(cafe_id)
-        await user.save()
         return user
 
     @staticmethod
     async def create_many(datas: List[UserCreate]) -> List[PydanticObjectId]:
         """Create multiple users."""
+        hashes = await password_hasher.hash_many([data.password for data in datas])
         users = []
-        for data in datas:
+        for data, hashed_password in zip(datas, hashes):
             user = User(
                 email=data.email,
                 username=data.username,
-                hashed_password=get_password(data.password),
+                hashed_password=hashed_password,
                 first_name=data.first_name,
                 last_name=data.last_name,
                 photo_url=data.photo_url,
@@ -332,14 +381,19 @@ class UserService:
         update_data = data.model_dump(exclude_unset=True)
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password(update_data["password"])
+            update_data["hashed_password"] = await password_hasher.hash(
+                update_data["password"]
+            )
             del update_data["password"]
 
         result = await User.find_many({"_id": {"$in": ids}}).update_many(
             {"$set": update_data}
         )
+        user_cache.invalidate(*ids)
         if result.matched_count == 0:
             return None
+        if update_data.keys() & VIEW_FIELDS:
+            await UserService._refresh_cafe_views(*ids)
 
         return await User.find_many({"_id": {"$in": ids}}).to_list()
 
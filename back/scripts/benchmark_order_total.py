@@ -0,0 +1,124 @@
+"""
+Benchmark for order pricing: the total computed by re-parsing every price as
+a Decimal on each save, against the price tables used when building orders,
+and a full document save against the `$set` of a status update.
+Run it with `python -m scripts.benchmark_order_total`.
+"""
+
+import random
+import time
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from beanie import DecimalAnnotation, PydanticObjectId
+
+from app.menu.item.models import MenuItem, MenuItemOption
+from app.order.enums import OrderStatus
+from app.order.models import Order, OrderedItem
+from app.order.pricing import PriceTable, round_price
+
+NUM_ORDERS = 10_000
+NUM_LINES = 5
+NUM_OPTIONS = 8
+
+
+def random_item() -> MenuItem:
+    """Generate a menu item with options, without a database."""
+    return MenuItem.model_construct(
+        id=PydanticObjectId(),
+        cafe_id=PydanticObjectId(),
+        name="Item",
+        in_stock=True,
+        price=Decimal(random.randint(100, 900)) / 100,
+        options=[
+            MenuItemOption(
+                type=f"type{i}",
+                value="value",
+                fee=Decimal(random.randint(0, 200)) / 100,
+            )
+            for i in range(NUM_OPTIONS)
+        ],
+    )
+
+
+def save_total(items: list) -> Decimal:
+    """Compute a total as the former before_event hook did on every save."""
+    total = sum(
+        DecimalAnnotation(item.quantity)
+        * (item.price + sum(DecimalAnnotation(option.fee) for option in item.options))
+        for item in items
+    )
+    return total.quantize(DecimalAnnotation("0.00"))
+
+
+def table_total(tables: list, lines: list) -> Decimal:
+    """Compute a total from price tables, as when building an order."""
+    total = Decimal(0)
+    for table, (quantity, options) in zip(tables, lines):
+        unit_price, _ = table.price_options(options)
+        total += quantity * unit_price
+    return round_price(total)
+
+
+def benchmark_order_total():
+    """Price synthetic orders both ways, then compare status update payloads."""
+    random.seed(0)
+    menu = [random_item() for _ in range(NUM_LINES)]
+    lines = [(random.randint(1, 3), item.options) for item in menu]
+    ordered_items = [
+        OrderedItem(
+            _id=item.id,
+            name=item.name,
+            price=item.price,
+            quantity=quantity,
+            options=options,
+        )
+        for item, (quantity, options) in zip(menu, lines)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(NUM_ORDERS):
+        expected = save_total(ordered_items)
+    save_time = time.perf_counter() - start
+
+    tables = [PriceTable(item) for item in menu]
+    start = time.perf_counter()
+    for _ in range(NUM_ORDERS):
+        total = table_total(tables, lines)
+    table_time = time.perf_counter() - start
+    assert total == expected
+
+    print(f"{NUM_ORDERS} orders of {NUM_LINES} items with {NUM_OPTIONS} options")
+    print(f"Total on save: {save_time / NUM_ORDERS * 1e6:.1f}us per order")
+    print(f"Price tables: {table_time / NUM_ORDERS * 1e6:.1f}us per order")
+
+    order = Order.model_construct(
+        id=PydanticObjectId(),
+        user_id=PydanticObjectId(),
+        cafe_id=PydanticObjectId(),
+        cafe_name="Cafe",
+        order_number=1,
+        items=ordered_items,
+        total_price=total,
+        status=OrderStatus.PLACED,
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+
+    start = time.perf_counter()
+    for _ in range(NUM_ORDERS):
+        save_total(order.items)
+        order.model_dump(by_alias=True)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(NUM_ORDERS):
+        {"$set": {"status": OrderStatus.READY, "updated_at": datetime.now(UTC)}}
+    set_time = time.perf_counter() - start
+
+    print(f"Status update, full save: {full_time / NUM_ORDERS * 1e6:.1f}us per order")
+    print(f"Status update, $set: {set_time / NUM_ORDERS * 1e6:.1f}us per order")
+
+
+if __name__ == "__main__":
+    benchmark_order_total()
@@ -0,0 +1,62 @@
+"""
+Benchmark for the search suggestion trie: cold-start build time, memory and
+query latency on a synthetic catalog.
+Run it with `python -m scripts.benchmark_suggest`.
+"""
+
+import random
+import string
+import time
+import tracemalloc
+
+from app.search.suggest import SuggestionTrie, max_distance_for, term_suffixes
+
+NUM_ITEMS = 20_000
+NUM_QUERIES = 1_000
+
+
+def random_name() -> str:
+    """Generate a name of one to four words."""
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9)))
+        for _ in range(random.randint(1, 4))
+    )
+
+
+def benchmark_suggest():
+    """Build a trie of synthetic items and query it."""
+    random.seed(0)
+    names = [random_name() for _ in range(NUM_ITEMS)]
+
+    def build() -> SuggestionTrie:
+        trie = SuggestionTrie(max_nodes=10_000_000)
+        for i, name in enumerate(names):
+            for term in term_suffixes(name):
+                trie.add(term, "ITEM", name, i, random.randint(1, 100))
+        return trie
+
+    start = time.perf_counter()
+    trie = build()
+    build_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Built {NUM_ITEMS} items in {build_time:.2f}s")
+    print(f"{trie.nodes} nodes, {peak / 1024 / 1024:.1f} MiB peak")
+
+    for length in [2, 4, 8]:
+        queries = [random.choice(names)[:length] for _ in range(NUM_QUERIES)]
+        start = time.perf_counter()
+        for query in queries:
+            trie.suggest(query, 10, max_distance_for(query))
+        latency = (time.perf_counter() - start) / NUM_QUERIES * 1000
+        print(
+            f"Suggest {length} chars ({max_distance_for('x' * length)} edits): "
+            f"{latency:.2f}ms per query"
+        )
+
+if __name__ == "__main__":
+    benchmark_suggest()
@@ -0,0 +1,35 @@
+"""
+Migration script to seed the per-cafe, per-day order counters from the
+existing orders. Run it once before deploying the order counters.
+"""
+
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.order.models import Order, OrderCounter
+from app.order.service import OrderService
+
+
+async def migrate_order_counters():
+    """Seed the order counters from the existing orders."""
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    await init_beanie(
+        database=client[settings.MONGO_DB_NAME],
+        document_models=[Order, OrderCounter],
+    )
+
+    try:
+        await OrderService.rebuild_counters()
+        count = await OrderCounter.count()
+        print(f"✅ Seeded {count} order counters")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_order_counters())
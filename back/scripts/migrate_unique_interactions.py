@@ -0,0 +1,53 @@
+"""
+Script to remove duplicate interactions and make the (user_id, target_id,
+type) index unique. Run this once before deploying the unique index, then
+run reconcile_interaction_counts.py to fix the counts of the duplicates.
+"""
+
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+
+INDEX_KEYS = [("user_id", 1), ("target_id", 1), ("type", 1)]
+
+
+async def migrate_unique_interactions():
+    """Keep the oldest of each duplicate interaction, then build the index."""
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    interactions = client[settings.MONGO_DB_NAME]["interactions"]
+
+    try:
+        for name, index in (await interactions.index_information()).items():
+            if index["key"] == INDEX_KEYS and not index.get("unique"):
+                await interactions.drop_index(name)
+                print(f"✅ Dropped index: {name}")
+
+        pipeline = [
+            {"$sort": {"_id": 1}},
+            {
+                "$group": {
+                    "_id": {k: f"${k}" for k, _ in INDEX_KEYS},
+                    "ids": {"$push": "$_id"},
+                }
+            },
+            {"$match": {"ids.1": {"$exists": True}}},
+        ]
+        duplicates = []
+        async for group in interactions.aggregate(pipeline, allowDiskUse=True):
+            duplicates.extend(group["ids"][1:])
+        if duplicates:
+            await interactions.delete_many({"_id": {"$in": duplicates}})
+        print(f"✅ Removed {len(duplicates)} duplicate interactions")
+
+        await interactions.create_index(INDEX_KEYS, unique=True)
+        print("✅ Created the unique interaction index")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_unique_interactions())
@@ -0,0 +1,35 @@
+"""
+Script to rebuild the materialized cafe detail documents (`cafe_views`).
+Run it once after deploying, or whenever the views drift from the cafes.
+"""
+
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.cafe.models import Cafe, CafeView
+from app.cafe.service import CafeService
+from app.config import settings
+
+
+async def rebuild_cafe_views():
+    """Rebuild the detail document of every cafe."""
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    await init_beanie(
+        database=client[settings.MONGO_DB_NAME],
+        document_models=[Cafe, CafeView],
+    )
+
+    try:
+        cafe_ids = [cafe.id for cafe in await Cafe.find_all().to_list()]
+        await CafeService.refresh_view(*cafe_ids)
+        print(f"✅ Rebuilt {len(cafe_ids)} cafe views")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_cafe_views())
@@ -0,0 +1,37 @@
+"""
+Script to rebuild the search index (`search_entries`) from every cafe and
+menu item. Run it once after deploying, or whenever the index drifts.
+"""
+
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.cafe.models import Cafe
+from app.config import settings
+from app.menu.item.models import MenuItem
+from app.search.models import SearchEntry
+from app.search.service import rebuild_index
+
+
+async def rebuild_search_index():
+    """Rebuild the search entries of every cafe and menu item."""
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    await init_beanie(
+        database=client[settings.MONGO_DB_NAME],
+        document_models=[Cafe, MenuItem, SearchEntry],
+    )
+
+    try:
+        await rebuild_index()
+        count = await SearchEntry.count()
+        print(f"✅ Rebuilt {count} search entries")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_search_index())
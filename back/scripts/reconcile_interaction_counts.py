@@ -0,0 +1,44 @@
+"""
+Script to rebuild the interaction counts of items, events and announcements
+from the `interactions` collection, then refresh the cafe views.
+Run it once after deploying, or whenever the counts drift.
+"""
+
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.cafe.announcement.models import Announcement
+from app.cafe.models import Cafe, CafeView
+from app.cafe.service import CafeService
+from app.config import settings
+from app.event.models import Event
+from app.interaction.models import Interaction
+from app.interaction.service import InteractionService
+from app.menu.item.models import MenuItem
+
+
+async def reconcile_interaction_counts():
+    """Rebuild the interaction counts of every target."""
+    client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)
+    await init_beanie(
+        database=client[settings.MONGO_DB_NAME],
+        document_models=[Announcement, Cafe, CafeView, Event, Interaction, MenuItem],
+    )
+
+    try:
+        await InteractionService.reconcile_counts()
+        print("✅ Reconciled interaction counts")
+
+        cafe_ids = [cafe.id for cafe in await Cafe.find_all().to_list()]
+        await CafeService.refresh_view(*cafe_ids)
+        print(f"✅ Rebuilt {len(cafe_ids)} cafe views")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_interaction_counts())
@@ -9,11 +9,16 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.cafe.announcement.models import Announcement
 from app.menu.item.models import MenuItem
-from app.cafe.models import Cafe
-from app.order.models import Order
+from app.cafe.models import Cafe, CafeView
+from app.cafe.service import CafeService
+from app.order.models import Order, OrderCounter
+from app.order.service import OrderService
+from app.search.models import SearchEntry
+from app.search.service import rebuild_index
 from app.config import settings
 from app.event.models import Event
 from app.interaction.models import Interaction
+from app.interaction.service import InteractionService
 from app.notification.models import NotificationMessage, NotificationStatus
 from app.user.models import User, Diet
 from scripts.seed.cafe import CafeSeeder
@@ -39,7 +44,7 @@ async def main():
     db_client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)[MONGO_DB_NAME]
     await init_beanie(
         database=db_client,
-        document_models=[Cafe, MenuItem, Announcement, Event, User, Diet, Order, Interaction, NotificationMessage, NotificationStatus],
+        document_models=[Cafe, CafeView, MenuItem, Announcement, Event, User, Diet, Order, OrderCounter, Interaction, NotificationMessage, NotificationStatus, SearchEntry],
     )
 
     await UserSeeder().seed_users(num_users=20)
@@ -48,10 +53,14 @@ async def main():
     await MenuSeeder().seed_menu(num_items=10)
     await DietSeeder().seed_diet(num_diets=10)
     await OrderSeeder().seed_orders(num_orders_per_cafe=30)
+    await OrderService.rebuild_counters()
     await AnnouncementSeeder().seed_announcements()
     await EventSeeder().seed_events()
     await InteractionSeeder().seed_interactions()
     await NotificationSeeder().seed_notifications(num_notifications=100, num_notifications_per_user=[5, 10])
+    await InteractionService.reconcile_counts()
+    await rebuild_index()
+    await CafeService.refresh_view(*[cafe.id for cafe in await Cafe.find_all().to_list()])
 
 
 if __name__ == "__main__":
@@ -6,12 +6,13 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from app.cafe.models import Cafe
-from app.order.models import Order
+from app.cafe.models import Cafe, CafeView
+from app.order.models import Order, OrderCounter
 
 # Application settings and router
 from app.config import settings
 from app.router import router
+from app.search.models import SearchEntry
 from app.user.models import User
 
 """
@@ -23,7 +24,7 @@ MONGO_DB_NAME = settings.MONGO_DB_NAME + "test"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     db_client = AsyncIOMotorClient(settings.MONGO_CONNECTION_STRING)[MONGO_DB_NAME]
-    await init_beanie(database=db_client, document_models=[User, Cafe, Order])
+    await init_beanie(database=db_client, document_models=[User, Cafe, CafeView, Order, OrderCounter, SearchEntry])
     yield
 
 
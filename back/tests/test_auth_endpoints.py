@@ -0,0 +1,64 @@
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth import endpoints, service
+from app.auth.endpoints import auth_router
+from app.auth.security import create_access_token
+from app.user.models import User
+from app.user.service import UserService
+
+
+def make_client(monkeypatch, user):
+    sent = []
+
+    async def get_by_id(id, aggregate=False):
+        return user if str(id) == str(user.id) else None
+
+    async def update_document(document, update, expected=None):
+        sent.append(update)
+
+    async def hash(password):
+        return "hashed:" + password
+
+    monkeypatch.setattr(UserService, "get_by_id", get_by_id)
+    monkeypatch.setattr(endpoints, "update_document", update_document)
+    monkeypatch.setattr(service, "update_document", update_document)
+    monkeypatch.setattr(service.password_hasher, "hash", hash)
+    app = FastAPI()
+    app.include_router(auth_router)
+    return TestClient(app), sent
+
+
+def test_reset_password(monkeypatch):
+    user = User.model_construct(id=PydanticObjectId(), hashed_password="old")
+    client, sent = make_client(monkeypatch, user)
+
+    response = client.put(
+        "/auth/reset-password",
+        json={"token": create_access_token(user.id), "password": "Newpass12"},
+    )
+
+    assert response.status_code == 200
+    assert sent == [{"$set": {"hashed_password": "hashed:Newpass12"}}]
+
+
+def test_verify_email(monkeypatch):
+    user = User.model_construct(id=PydanticObjectId(), is_verified=False)
+    client, sent = make_client(monkeypatch, user)
+
+    response = client.post("/auth/verify", json=create_access_token(user.id))
+
+    assert response.status_code == 200
+    assert sent == [{"$set": {"is_verified": True}}]
+    assert user.is_verified is True
+
+
+def test_verify_email_rejects_invalid_token(monkeypatch):
+    user = User.model_construct(id=PydanticObjectId(), is_verified=False)
+    client, sent = make_client(monkeypatch, user)
+
+    response = client.post("/auth/verify", json="invalid")
+
+    assert response.status_code == 403
+    assert sent == []
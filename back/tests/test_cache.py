@@ -0,0 +1,48 @@
+import time
+
+from beanie import PydanticObjectId
+
+from app.cache import TTLCache
+from app.cafe.cache import CafeCache
+from app.cafe.models import Cafe
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_cafe_cache_returns_copies_and_invalidates_all_keys():
+    cache = CafeCache(maxsize=10, ttl=60)
+    cafe = Cafe.model_construct(
+        id=PydanticObjectId(), slug="tore-et-fraction", previous_slugs=[]
+    )
+    cache.set("tore-et-fraction", cafe)
+    cache.set_roles("tore-et-fraction", cafe.id, {"user": "ADMIN"})
+
+    cached = cache.get("tore-et-fraction")
+    assert cached is not cafe
+    cached.slug = "changed"
+    assert cache.get(str(cafe.id)).slug == "tore-et-fraction"
+
+    cache.invalidate(cafe.id)
+    assert cache.get("tore-et-fraction") is None
+    assert cache.get(str(cafe.id)) is None
+    assert cache.get_roles("tore-et-fraction") is None
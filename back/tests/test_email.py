@@ -0,0 +1,72 @@
+import asyncio
+from datetime import timedelta
+
+from app.config import settings
+from app.email.enums import EmailStatus
+from app.email.models import OutboxEmail
+from app.email.transport import MemoryTransport
+from app.email.worker import EmailWorker, retry_delay
+
+
+class FailingTransport:
+    async def send(self, email):
+        raise RuntimeError("SendGrid responded 503")
+
+
+def make_email(attempts=1):
+    return OutboxEmail.model_construct(
+        to="a@example.com",
+        subject="Hello",
+        html_content="<p>Hi</p>",
+        attempts=attempts,
+        claim="claim",
+    )
+
+
+def test_retry_delay_doubles_up_to_max():
+    base = settings.EMAIL_RETRY_DELAY
+    assert retry_delay(1) == timedelta(seconds=base)
+    assert retry_delay(2) == timedelta(seconds=2 * base)
+    assert retry_delay(3) == timedelta(seconds=4 * base)
+    assert retry_delay(100) == timedelta(seconds=settings.EMAIL_RETRY_MAX_DELAY)
+
+
+def test_sent_emails_lose_their_content_and_expire():
+    transport = MemoryTransport()
+    worker = EmailWorker(transport, batch_size=10)
+    email = make_email()
+
+    (fields,) = asyncio.run(worker.send([email]))
+
+    assert transport.sent == [email]
+    assert fields["status"] == EmailStatus.SENT
+    assert fields["html_content"] == ""
+    assert fields["claim"] is None
+    assert fields["expires_at"] - fields["sent_at"] == timedelta(
+        days=settings.EMAIL_RETENTION_DAYS
+    )
+
+
+def test_failed_emails_are_retried_with_backoff():
+    worker = EmailWorker(FailingTransport(), batch_size=10)
+
+    (fields,) = asyncio.run(worker.send([make_email(attempts=2)]))
+
+    assert fields["status"] == EmailStatus.PENDING
+    assert fields["last_error"] == "SendGrid responded 503"
+    assert fields["claim"] is None
+    assert "expires_at" not in fields
+
+
+def test_emails_are_dead_lettered_after_the_last_attempt():
+    worker = EmailWorker(FailingTransport(), batch_size=10)
+    emails = [
+        make_email(attempts=settings.EMAIL_MAX_ATTEMPTS - 1),
+        make_email(attempts=settings.EMAIL_MAX_ATTEMPTS),
+    ]
+
+    retried, dead = asyncio.run(worker.send(emails))
+
+    assert retried["status"] == EmailStatus.PENDING
+    assert dead["status"] == EmailStatus.DEAD
+    assert "expires_at" in dead
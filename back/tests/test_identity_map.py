@@ -0,0 +1,91 @@
+import asyncio
+
+from beanie import PydanticObjectId
+from fastapi import Request
+
+from app.cafe.models import Cafe
+from app.cafe.service import CafeService
+from app.cafe.staff.enums import OWNER, Role
+from app.cafe.staff.models import Staff
+from app.identity_map import IdentityMap, get_identity_map
+
+
+def test_loads_each_key_once():
+    async def run():
+        identity_map = IdentityMap()
+        cafe = Cafe.model_construct(id=PydanticObjectId(), slug="tore-et-fraction")
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return cafe
+
+        assert await identity_map.get(Cafe, cafe.slug, loader) is cafe
+        assert await identity_map.get(Cafe, cafe.slug, loader) is cafe
+        # Also registered under its ID
+        assert await identity_map.get(Cafe, cafe.id, loader) is cafe
+        assert len(calls) == 1
+
+    asyncio.run(run())
+
+
+def test_caches_misses_until_discarded():
+    async def run():
+        identity_map = IdentityMap()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return None
+
+        assert await identity_map.get(Cafe, "unknown", loader) is None
+        assert await identity_map.get(Cafe, "unknown", loader) is None
+        identity_map.discard(Cafe, "unknown")
+        assert await identity_map.get(Cafe, "unknown", loader) is None
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_write_requests_bypass_process_caches(monkeypatch):
+    async def run():
+        calls = []
+
+        async def get(cafe_slug_or_id, aggregate=False, cached=True):
+            calls.append(cached)
+            return Cafe.model_construct(id=PydanticObjectId(), slug=cafe_slug_or_id)
+
+        monkeypatch.setattr(CafeService, "get", staticmethod(get))
+        for method in ["GET", "PUT"]:
+            request = Request({"type": "http", "method": method, "headers": []})
+            await get_identity_map(request).get_cafe("tore-et-fraction")
+        assert calls == [True, False]
+
+    asyncio.run(run())
+
+
+def test_roles_share_the_request_cafe(monkeypatch):
+    async def run():
+        owner_id, admin_id = PydanticObjectId(), PydanticObjectId()
+        calls = []
+
+        async def get(cafe_slug_or_id, aggregate=False, cached=True):
+            calls.append(cached)
+            return Cafe.model_construct(
+                id=PydanticObjectId(),
+                slug=cafe_slug_or_id,
+                owner_id=owner_id,
+                staff=Staff(admin_ids=[admin_id], volunteer_ids=[]),
+            )
+
+        monkeypatch.setattr(CafeService, "get", staticmethod(get))
+        identity_map = IdentityMap()
+        roles = await identity_map.get_roles("tore-et-fraction")
+        cafe = await identity_map.get_cafe("tore-et-fraction")
+
+        assert roles == {str(owner_id): OWNER, str(admin_id): Role.ADMIN}
+        assert cafe.owner_id == owner_id
+        # Loaded once, from the database with the default local invalidation
+        assert calls == [False]
+
+    asyncio.run(run())
@@ -0,0 +1,24 @@
+from app.auth.lockout import LockoutConfig
+
+
+def test_failed_attempt_update_follows_lockout_config():
+    reset, lockout = LockoutConfig.failed_attempt_update()
+
+    assert set(reset["$set"]) == {
+        "login_attempts",
+        "lockout_until",
+        "last_login_attempt",
+    }
+    branches = lockout["$set"]["lockout_until"]["$switch"]["branches"]
+    lockouts = [
+        (branch["case"]["$eq"][1], branch["then"]["$add"][1])
+        for branch in branches
+        if "$eq" in branch["case"]
+    ]
+    assert lockouts == [
+        (5, 5 * 60_000),
+        (10, 15 * 60_000),
+        (15, 30 * 60_000),
+        (20, 60 * 60_000),
+    ]
+    assert branches[-1]["case"]["$gt"][1] == 25
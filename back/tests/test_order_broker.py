@@ -0,0 +1,97 @@
+import asyncio
+
+from beanie import PydanticObjectId
+
+from app.order import scheduler
+from app.order.broker import InMemoryOrderBroker, OrderEvent
+from app.order.models import Order
+
+
+def make_event(cafe_id, type="created"):
+    order = Order.model_construct(
+        id=PydanticObjectId(), cafe_id=cafe_id, order_number=1, items=[]
+    )
+    return OrderEvent(type=type, order=order)
+
+
+def test_publish_reaches_cafe_subscribers():
+    async def run():
+        broker = InMemoryOrderBroker()
+        cafe_id, other_cafe_id = PydanticObjectId(), PydanticObjectId()
+        async with broker.subscribe(cafe_id) as first, broker.subscribe(
+            cafe_id
+        ) as second, broker.subscribe(other_cafe_id) as other:
+            event = make_event(cafe_id)
+            await broker.publish(event)
+
+            assert first.get_nowait() is event
+            assert second.get_nowait() is event
+            assert other.empty()
+
+    asyncio.run(run())
+
+
+def test_unsubscribe_on_exit():
+    async def run():
+        broker = InMemoryOrderBroker()
+        cafe_id = PydanticObjectId()
+        async with broker.subscribe(cafe_id):
+            assert cafe_id in broker.subscribers
+        assert cafe_id not in broker.subscribers
+
+        await broker.publish(make_event(cafe_id))
+
+    asyncio.run(run())
+
+
+def test_full_queue_is_replaced_by_resync():
+    async def run():
+        broker = InMemoryOrderBroker(queue_size=2)
+        cafe_id = PydanticObjectId()
+        async with broker.subscribe(cafe_id) as events:
+            for _ in range(3):
+                await broker.publish(make_event(cafe_id, "created"))
+
+            assert events.qsize() == 1
+            assert events.get_nowait().type == "resync"
+
+            await broker.publish(make_event(cafe_id, "updated"))
+            assert events.get_nowait().type == "updated"
+
+    asyncio.run(run())
+
+
+def test_scheduler_publishes_cancelled_orders(monkeypatch):
+    async def run():
+        broker = InMemoryOrderBroker()
+        cafe_id = PydanticObjectId()
+        cancelled = make_event(cafe_id, type="updated").order
+
+        class Collection:
+            async def distinct(self, key, filters):
+                return [cancelled.id]
+
+        class Query:
+            async def update_many(self, update):
+                return type("Result", (), {"modified_count": 1})()
+
+            async def to_list(self):
+                return [cancelled]
+
+        async def acquire(name, duration):
+            return True
+
+        monkeypatch.setattr(scheduler, "order_broker", broker)
+        monkeypatch.setattr(scheduler.Lease, "acquire", staticmethod(acquire))
+        monkeypatch.setattr(
+            Order, "get_motor_collection", classmethod(lambda cls: Collection())
+        )
+        monkeypatch.setattr(Order, "find", classmethod(lambda cls, filters: Query()))
+
+        async with broker.subscribe(cafe_id) as queue:
+            await scheduler.OrderScheduler().cancel_old_orders()
+            event = queue.get_nowait()
+            assert event.type == "updated"
+            assert event.order is cancelled
+
+    asyncio.run(run())
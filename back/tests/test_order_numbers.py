@@ -0,0 +1,37 @@
+import asyncio
+
+from beanie import PydanticObjectId
+
+from app.config import settings
+from app.order.service import OrderService
+
+
+def test_cafes_allocate_order_numbers_concurrently(monkeypatch):
+    async def run():
+        running = []
+        overlapped = []
+
+        async def allocate(cafe_id, day, count):
+            running.append(cafe_id)
+            await asyncio.sleep(0.01)
+            overlapped.append(len(running) > 1)
+            running.remove(cafe_id)
+            return count
+
+        monkeypatch.setattr(settings, "ORDER_NUMBER_BLOCK_SIZE", 10)
+        monkeypatch.setattr(OrderService, "_number_blocks", {})
+        monkeypatch.setattr(OrderService, "_number_locks", {})
+        monkeypatch.setattr(
+            OrderService, "_allocate_order_numbers", staticmethod(allocate)
+        )
+        a, b = PydanticObjectId(), PydanticObjectId()
+        numbers = await asyncio.gather(
+            OrderService.get_next_order_number(a),
+            OrderService.get_next_order_number(a),
+            OrderService.get_next_order_number(b),
+        )
+        assert sorted(numbers[:2]) == [1, 2]
+        assert numbers[2] == 1
+        assert any(overlapped)
+
+    asyncio.run(run())
@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.menu.item.models import MenuItem, MenuItemOption
+from app.order.pricing import PriceTable, round_price
+
+
+def make_item() -> MenuItem:
+    return MenuItem.model_construct(
+        id=PydanticObjectId(),
+        price=Decimal("2.50"),
+        options=[MenuItemOption(type="Size", value="Large", fee=Decimal("0.75"))],
+    )
+
+
+def test_price_options_uses_menu_fees():
+    table = PriceTable(make_item())
+    options = [MenuItemOption(type="Size", value="Large", fee=Decimal("0"))]
+
+    unit_price, priced = table.price_options(options)
+
+    assert unit_price == Decimal("3.25")
+    assert priced[0].fee == Decimal("0.75")
+    assert options[0].fee == Decimal("0")
+
+
+def test_price_options_keeps_unknown_option_fee():
+    table = PriceTable(make_item())
+    options = [MenuItemOption(type="Milk", value="Oat", fee=Decimal("0.50"))]
+
+    unit_price, priced = table.price_options(options)
+
+    assert unit_price == Decimal("3.00")
+    assert priced == options
+
+
+def test_round_price():
+    assert round_price(Decimal("3.255")) == Decimal("3.26")
+    with pytest.raises(ValueError):
+        round_price(Decimal("-1"))
@@ -0,0 +1,62 @@
+import asyncio
+
+from beanie import PydanticObjectId
+
+from app.order import service
+from app.order.broker import InMemoryOrderBroker
+from app.order.enums import OrderStatus
+from app.order.models import Order
+from app.order.service import OrderService
+
+
+def test_update_status_many_uses_one_bulk_write(monkeypatch):
+    cafe_id = PydanticObjectId()
+    ready, completed, missing = (
+        PydanticObjectId(),
+        PydanticObjectId(),
+        PydanticObjectId(),
+    )
+    writes = []
+
+    class Collection:
+        async def bulk_write(self, operations, ordered=True):
+            writes.append(operations)
+
+    class Query:
+        async def to_list(self):
+            return [
+                Order.model_construct(
+                    id=ready, cafe_id=cafe_id, status=OrderStatus.READY
+                ),
+                Order.model_construct(
+                    id=completed, cafe_id=cafe_id, status=OrderStatus.COMPLETED
+                ),
+            ]
+
+    monkeypatch.setattr(service, "order_broker", InMemoryOrderBroker())
+    monkeypatch.setattr(
+        Order, "get_motor_collection", classmethod(lambda cls: Collection())
+    )
+    monkeypatch.setattr(Order, "find", classmethod(lambda cls, filters: Query()))
+
+    results = asyncio.run(
+        OrderService.update_status_many(
+            cafe_id, [ready, completed, missing, ready], OrderStatus.READY
+        )
+    )
+
+    assert len(writes) == 1
+    assert [operation._filter["_id"] for operation in writes[0]] == [
+        ready,
+        completed,
+        missing,
+    ]
+    assert results == [
+        {"id": ready, "status": OrderStatus.READY},
+        {
+            "id": completed,
+            "status": OrderStatus.COMPLETED,
+            "msg": "An order with this ID is already completed or cancelled.",
+        },
+        {"id": missing, "msg": "An order with this ID does not exist in this cafe."},
+    ]
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.pagination import (
+    CountStrategy,
+    count,
+    count_cache,
+    cursor_values,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    with_tiebreaker,
+)
+
+
+def test_cursor_round_trip():
+    id = PydanticObjectId()
+    cursor = encode_cursor([1.5, "Café", id])
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == [1.5, "Café", id]
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({"a": 1}))
+
+
+def test_keyset_filter_follows_sort_directions():
+    sort = [("score", -1), ("name", 1), ("_id", 1)]
+    assert keyset_filter(sort, [2, "b", 3]) == {
+        "$or": [
+            {"$or": [{"score": {"$lt": 2}}, {"score": None}]},
+            {"score": 2, "name": {"$gt": "b"}},
+            {"score": 2, "name": "b", "_id": {"$gt": 3}},
+        ]
+    }
+    with pytest.raises(ValueError):
+        keyset_filter(sort, [2])
+
+
+def test_keyset_filter_sorts_nulls_first():
+    assert keyset_filter([("closed_at", 1), ("_id", 1)], [None, 3]) == {
+        "$or": [
+            {"closed_at": {"$ne": None}},
+            {"closed_at": None, "_id": {"$gt": 3}},
+        ]
+    }
+    assert keyset_filter([("closed_at", -1), ("_id", -1)], [None, 3]) == {
+        "$or": [{"closed_at": None, "_id": {"$lt": 3}}]
+    }
+
+
+def test_tiebreaker_follows_last_direction():
+    assert with_tiebreaker([("created_at", -1)]) == [("created_at", -1), ("_id", -1)]
+    assert with_tiebreaker([]) == [("_id", 1)]
+    assert with_tiebreaker([("_id", -1)]) == [("_id", -1)]
+
+
+def test_cursor_values_read_projected_ids():
+    id = PydanticObjectId()
+    sort = [("location.pavillon", 1), ("_id", 1)]
+    assert cursor_values(sort, {"location": {"pavillon": "A"}, "id": id}) == ["A", id]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.counts = 0
+
+    async def count_documents(self, filters):
+        self.counts += 1
+        return 42
+
+    async def estimated_document_count(self):
+        return 1000
+
+
+class FakeModel:
+    collection = FakeCollection()
+
+    @classmethod
+    def get_motor_collection(cls):
+        return cls.collection
+
+    @classmethod
+    def get_collection_name(cls):
+        return "fakes"
+
+
+def test_count_strategies():
+    count_cache.clear()
+    filters = {"status": "PLACED", "cafe_id": PydanticObjectId()}
+    reordered = dict(reversed(filters.items()))
+
+    assert asyncio.run(count(FakeModel, filters, CountStrategy.CACHED)) == 42
+    assert asyncio.run(count(FakeModel, reordered, CountStrategy.CACHED)) == 42
+    assert FakeModel.collection.counts == 1
+
+    assert asyncio.run(count(FakeModel, {}, CountStrategy.ESTIMATED)) == 1000
+    assert asyncio.run(count(FakeModel, filters, CountStrategy.ESTIMATED)) == 42
+    assert asyncio.run(count(FakeModel, filters, CountStrategy.NONE)) is None
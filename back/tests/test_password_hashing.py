@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth.hashing import MIN_ROUNDS, LatencyStats, PasswordHasher
+from app.auth.security import (
+    get_password_rounds,
+    needs_rehash,
+    set_password_rounds,
+    verify_password,
+)
+
+
+def test_hash_and_verify_in_pool():
+    async def run():
+        hasher = PasswordHasher(workers=2, queue_size=2, retry_after=1)
+        hashed = await hasher.hash("Cafepass1")
+
+        assert await hasher.verify("Cafepass1", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        assert hasher.pending == 0
+        assert hasher.metrics()["latency"]["verify"]["count"] == 2
+        hasher.shutdown()
+
+    asyncio.run(run())
+
+
+def test_rejects_when_queue_is_full():
+    async def run():
+        hasher = PasswordHasher(workers=1, queue_size=0, retry_after=3)
+        running = asyncio.create_task(hasher.hash("Cafepass1"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as error:
+            await hasher.hash("Cafepass1")
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "3"}
+        assert hasher.rejected == 1
+
+        await running
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    asyncio.run(run())
+
+
+def test_latency_buckets_are_cumulative():
+    stats = LatencyStats([0.1, 1])
+    stats.observe(0.05)
+    stats.observe(0.5)
+
+    assert stats.snapshot()["buckets"] == {"0.1": 1, "1": 2}
+    assert stats.count == 2
+
+
+@pytest.fixture
+def rounds():
+    previous = get_password_rounds()
+    set_password_rounds(4)
+    yield
+    set_password_rounds(previous)
+
+
+def test_verify_and_update_rehashes_lower_costs(rounds):
+    async def run():
+        hasher = PasswordHasher(workers=1, queue_size=0, retry_after=1)
+        current = await hasher.hash("Cafepass1")
+        assert await hasher.verify_and_update("Cafepass1", current) == (True, None)
+        assert await hasher.verify_and_update("wrong", current) == (False, None)
+
+        set_password_rounds(5)
+        valid, new_hash = await hasher.verify_and_update("Cafepass1", current)
+        assert valid
+        assert new_hash.startswith("$2b$05$")
+        assert not needs_rehash(new_hash)
+
+        # Hashes are only upgraded
+        set_password_rounds(4)
+        assert not needs_rehash(new_hash)
+        hasher.shutdown()
+
+    asyncio.run(run())
+
+
+def test_hash_many(rounds):
+    async def run():
+        hasher = PasswordHasher(workers=1, queue_size=0, retry_after=1, batch_workers=4)
+        hashes = await hasher.hash_many(["a", "b", "c"])
+
+        assert [verify_password(p, h) for p, h in zip("abc", hashes)] == [True] * 3
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    asyncio.run(run())
+
+
+def test_calibrate_stays_in_range(rounds):
+    async def run():
+        hasher = PasswordHasher(workers=1, queue_size=0, retry_after=1)
+
+        assert await hasher.calibrate(target=0) == MIN_ROUNDS
+        assert get_password_rounds() == MIN_ROUNDS
+        hasher.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+
+from app.event.models import Event
+from app.order.enums import OrderStatus
+from app.order.models import Order
+from app.query_filter import QueryFilter, check_query_indexes
+from app.router import router  # noqa: F401, registers the endpoint filters
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    registered = list(QueryFilter.registry)
+    yield
+    QueryFilter.registry[:] = registered
+
+
+def test_compile_coerces_model_types():
+    query_filter = QueryFilter(
+        Order, filters=["status", "created_at"], sorts=["created_at"]
+    )
+    filters = query_filter.compile(
+        {
+            "status__in": "PLACED,READY",
+            "created_at__gte": "2024-01-01",
+            "created_at__lt": "2025-01-01",
+            "sort_by": "-created_at",
+            "page": "2",
+        }
+    )
+    assert filters == {
+        "status": {"$in": [OrderStatus.PLACED, OrderStatus.READY]},
+        "created_at": {
+            "$gte": datetime(2024, 1, 1),
+            "$lt": datetime(2025, 1, 1),
+        },
+        "sort_by": "-created_at",
+    }
+
+
+def test_compile_maps_aliases():
+    query_filter = QueryFilter(
+        Event, filters=["cafe_ids"], aliases={"cafe_id": "cafe_ids"}
+    )
+    id = PydanticObjectId()
+    assert query_filter.compile({"cafe_id": str(id)}) == {"cafe_ids": id}
+
+
+@pytest.mark.parametrize(
+    "query_params",
+    [{"description": "x"}, {"sort_by": "description"}, {"status": "NOPE"}],
+)
+def test_compile_rejects_unknown_fields_and_values(query_params):
+    query_filter = QueryFilter(Order, filters=["status"], sorts=["created_at"])
+    with pytest.raises(HTTPException) as e:
+        query_filter.compile(query_params)
+    assert e.value.status_code == 400
+
+
+def test_index_check_reports_uncovered_combinations():
+    query_filter = QueryFilter(Order, filters=["total_price"], sorts=["created_at"])
+    assert query_filter.check_indexes() == [
+        "orders: total_price is not covered by an index",
+        "orders: total_price sorted by created_at is not covered by an index",
+    ]
+
+
+def test_endpoint_filters_are_covered_by_indexes():
+    assert check_query_indexes() == []
+
+
+def test_cafe_filter_accepts_existing_callers():
+    from app.cafe.endpoints import cafe_filter
+
+    assert cafe_filter.compile({"slug": "tore-et-fraction"}) == {
+        "slug": "tore-et-fraction"
+    }
+    assert cafe_filter.compile({"sort_by": "_id", "limit": "10"}) == {"sort_by": "_id"}
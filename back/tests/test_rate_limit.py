@@ -0,0 +1,93 @@
+import asyncio
+
+from fastapi import Depends, FastAPI, Form, Request
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.rate_limit import (
+    InMemoryRateLimitStore,
+    RateLimit,
+    RateLimiter,
+    client_ip,
+    form_field,
+)
+
+
+def test_store_keeps_previous_window():
+    async def run():
+        store = InMemoryRateLimitStore(max_keys=10)
+        assert await store.hit("a", 1, 60) == (1, 0)
+        assert await store.hit("a", 1, 60) == (2, 0)
+        assert await store.hit("a", 2, 60) == (1, 2)
+        assert await store.hit("a", 4, 60) == (1, 0)
+
+    asyncio.run(run())
+
+
+def test_store_drops_least_recently_used_keys():
+    async def run():
+        store = InMemoryRateLimitStore(max_keys=2)
+        for key in ["a", "b", "a", "c"]:
+            await store.hit(key, 1, 60)
+        assert await store.hit("a", 1, 60) == (3, 0)
+        assert await store.hit("b", 1, 60) == (1, 0)
+
+    asyncio.run(run())
+
+
+def test_limiter_rejects_over_limit(monkeypatch):
+    async def run():
+        limiter = RateLimiter(InMemoryRateLimitStore(max_keys=10))
+        monkeypatch.setattr("app.rate_limit.time.time", lambda: 90)
+        assert await limiter.check("a", 2, 60) is None
+        assert await limiter.check("a", 2, 60) is None
+        assert await limiter.check("a", 2, 60) == 30
+
+        # Half of the previous window still counts
+        monkeypatch.setattr("app.rate_limit.time.time", lambda: 150)
+        assert await limiter.check("a", 2, 60) == 30
+
+    asyncio.run(run())
+
+
+def test_dependency_limits_per_credential(monkeypatch):
+    limiter = RateLimiter(InMemoryRateLimitStore(max_keys=10))
+    monkeypatch.setattr("app.rate_limit.rate_limiter", limiter)
+    app = FastAPI()
+
+    @app.post(
+        "/login",
+        dependencies=[
+            Depends(
+                RateLimit(
+                    "login",
+                    per_ip=10,
+                    per_credential=1,
+                    credential=form_field("username"),
+                )
+            )
+        ],
+    )
+    async def login(username: str = Form(...)):
+        return {"username": username}
+
+    client = TestClient(app)
+    assert client.post("/login", data={"username": "a"}).status_code == 200
+    response = client.post("/login", data={"username": "A "})
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert client.post("/login", data={"username": "b"}).status_code == 200
+
+
+def test_client_ip_trusts_configured_proxies(monkeypatch):
+    def request(forwarded=None):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        scope = {"type": "http", "headers": headers, "client": ("10.0.0.1", 0)}
+        return Request(scope)
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", 0)
+    assert client_ip(request()) == "10.0.0.1"
+    assert client_ip(request("1.2.3.4")) is None
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", 1)
+    assert client_ip(request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
@@ -0,0 +1,96 @@
+import asyncio
+
+from app.search.service import fold, min_shared_grams, ngrams, selective_grams
+from app.search.suggest import SuggestionTrie, term_suffixes
+
+
+def test_fold_removes_diacritics_case_and_punctuation():
+    assert asyncio.run(fold("  Café-Crème  BRÛLÉE! ")) == "cafe creme brulee"
+
+
+def test_ngrams_pad_words():
+    assert ngrams("the") == ["  t", " th", "the", "he "]
+    assert ngrams("a a") == ["  a", " a "]
+
+
+def test_prefix_ngrams_match_longer_words():
+    assert set(ngrams("caf", prefix=True)) <= set(ngrams("cafe"))
+    assert not set(ngrams("caf")) <= set(ngrams("cafe"))
+
+
+def test_selective_grams_skip_word_starts():
+    grams = selective_grams(ngrams("pizza", prefix=True))
+    assert grams == [" pi", "piz", "izz", "zza"]
+    assert min_shared_grams(grams) == 2
+    # A typo still shares enough grams
+    assert len(set(ngrams("piza", prefix=True)) & set(grams)) >= 2
+    # Words only sharing the first letter do not
+    assert len(set(ngrams("poutine")) & set(grams)) < 2
+    assert selective_grams(ngrams("p", prefix=True)) == ["  p"]
+
+
+def make_trie():
+    trie = SuggestionTrie()
+    trie.add("cafe", "ITEM", "Café", "item-1", 5)
+    trie.add("cafe au lait", "ITEM", "Café au lait", "item-2", 10)
+    trie.add("caramel", "TAG", "caramel", "item-3", 1)
+    trie.add("croissant", "ITEM", "Croissant", "item-4", 3)
+    return trie
+
+
+def test_suggest_ranks_prefix_matches_by_popularity():
+    trie = make_trie()
+
+    assert trie.suggest("ca") == [
+        ("ITEM", "Café au lait"),
+        ("ITEM", "Café"),
+        ("TAG", "caramel"),
+    ]
+    assert trie.suggest("ca", limit=1) == [("ITEM", "Café au lait")]
+    assert trie.suggest("x") == []
+
+
+def test_suggest_tolerates_typos_after_exact_matches():
+    trie = make_trie()
+
+    assert trie.suggest("crois", max_distance=1) == [("ITEM", "Croissant")]
+    assert trie.suggest("croas", max_distance=0) == []
+    assert trie.suggest("croas", max_distance=1) == [("ITEM", "Croissant")]
+    # Exact matches first, even when a typo match is more popular
+    trie.add("carafe", "ITEM", "Carafe", "item-5", 100)
+    assert trie.suggest("caf", max_distance=1) == [
+        ("ITEM", "Café au lait"),
+        ("ITEM", "Café"),
+        ("ITEM", "Carafe"),
+        ("TAG", "caramel"),
+    ]
+
+
+def test_remove_source_compacts_trie():
+    trie = make_trie()
+    nodes = trie.nodes
+
+    trie.remove("item-2")
+    assert trie.suggest("cafe") == [("ITEM", "Café")]
+    assert trie.nodes < nodes
+
+    for source in ["item-1", "item-3", "item-4"]:
+        trie.remove(source)
+    assert trie.nodes == 1
+    assert trie.root.best == 0
+
+
+def test_add_respects_node_budget():
+    trie = SuggestionTrie(max_nodes=3)
+
+    assert trie.add("cafe", "ITEM", "Café", "item-1")
+    assert not trie.add("the", "ITEM", "Thé", "item-2")
+    assert trie.suggest("th") == []
+
+
+def test_term_suffixes_match_any_word_start():
+    assert term_suffixes("tore et fraction") == [
+        "tore et fraction",
+        "et fraction",
+        "fraction",
+    ]
@@ -0,0 +1,152 @@
+import asyncio
+from typing import List, Optional
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel
+
+from app import service
+from app.service import set_attributes, update_fields
+
+
+class Sample(BaseModel):
+    name: str
+    cafe_id: Optional[PydanticObjectId] = None
+    in_stock: bool = True
+
+
+class SampleUpdate(BaseModel):
+    name: Optional[str] = None
+    cafe_id: Optional[str] = None
+    in_stock: Optional[bool] = None
+
+
+def test_set_attributes_returns_previous_values_of_changed_fields():
+    cafe_id = PydanticObjectId()
+    sample = Sample(name="Latte")
+
+    previous = set_attributes(
+        sample, SampleUpdate(name="Mocha", cafe_id=str(cafe_id), in_stock=True)
+    )
+
+    assert previous == {"name": "Latte", "cafe_id": None}
+    assert sample.name == "Mocha"
+    assert sample.cafe_id == cafe_id
+
+
+def test_set_attributes_ignores_unset_fields():
+    sample = Sample(name="Latte", in_stock=False)
+
+    assert set_attributes(sample, SampleUpdate()) == {}
+    assert sample.in_stock is False
+
+
+class Location(BaseModel):
+    pavillon: str
+    local: str
+    floor: Optional[str] = None
+    accessible: bool = True
+
+
+class Place(BaseModel):
+    id: PydanticObjectId
+    location: Location
+    tags: List[str] = []
+
+
+MISSING = object()
+
+
+def lookup(document, path):
+    for part in path.split("."):
+        if isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        elif isinstance(document, dict) and part in document:
+            document = document[part]
+        else:
+            return MISSING
+    return document
+
+
+def matches(document, filters):
+    for key, condition in filters.items():
+        if key == "$and":
+            if not all(matches(document, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, c) for c in condition):
+                return False
+        else:
+            value = lookup(document, key)
+            if isinstance(condition, dict) and "$exists" in condition:
+                if (value is not MISSING) != condition["$exists"]:
+                    return False
+            elif isinstance(condition, dict) and "$size" in condition:
+                if not isinstance(value, list) or len(value) != condition["$size"]:
+                    return False
+            elif value != condition:
+                return False
+    return True
+
+
+def run_update(monkeypatch, place, previous):
+    sent = []
+
+    async def update_document(document, update, expected=None):
+        sent.append((update, expected))
+
+    monkeypatch.setattr(service, "update_document", update_document)
+    asyncio.run(update_fields(place, previous))
+    return sent[0]
+
+
+def test_update_fields_guard_ignores_missing_defaults_and_key_order(monkeypatch):
+    place = Place(
+        id=PydanticObjectId(),
+        location=Location(pavillon="Roger-Gaudry", local="A-1"),
+        tags=["coffee"],
+    )
+    previous = set_attributes(
+        place,
+        Place(
+            id=place.id,
+            location=Location(pavillon="Roger-Gaudry", local="B-2"),
+            tags=["tea"],
+        ),
+    )
+    update, expected = run_update(monkeypatch, place, previous)
+
+    # Stored before `floor` and `accessible` were added, with another key order
+    stored = {
+        "location": {"local": "A-1", "pavillon": "Roger-Gaudry"},
+        "tags": ["coffee"],
+    }
+    assert matches(stored, expected)
+    assert list(update["$set"]) == ["location", "tags"]
+
+
+def test_update_fields_guard_rejects_concurrent_changes(monkeypatch):
+    place = Place(
+        id=PydanticObjectId(),
+        location=Location(pavillon="Roger-Gaudry", local="A-1"),
+        tags=["coffee"],
+    )
+    previous = set_attributes(
+        place,
+        Place(
+            id=place.id,
+            location=Location(pavillon="Roger-Gaudry", local="B-2"),
+            tags=["tea"],
+        ),
+    )
+    _, expected = run_update(monkeypatch, place, previous)
+
+    changed_leaf = {
+        "location": {"pavillon": "Roger-Gaudry", "local": "C-3"},
+        "tags": ["coffee"],
+    }
+    added_item = {
+        "location": {"pavillon": "Roger-Gaudry", "local": "A-1"},
+        "tags": ["coffee", "tea"],
+    }
+    assert not matches(changed_leaf, expected)
+    assert not matches(added_item, expected)
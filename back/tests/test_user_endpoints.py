@@ -0,0 +1,44 @@
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.auth.dependencies import get_current_user
+from app.user.endpoints import user_router
+from app.user.models import User
+from app.user.service import UserService
+
+
+def make_client(monkeypatch, ids):
+    async def get_favorites(user_id, type, offset=0, limit=None):
+        return (ids if limit is None else ids[offset : offset + limit]), len(ids)
+
+    monkeypatch.setattr(UserService, "get_favorites", staticmethod(get_favorites))
+    app = FastAPI()
+    app.include_router(user_router)
+    app.dependency_overrides[get_current_user] = lambda: User.model_construct(
+        id=PydanticObjectId()
+    )
+    return TestClient(app)
+
+
+def test_favorites_list_all_by_default(monkeypatch):
+    ids = [PydanticObjectId() for _ in range(3)]
+    client = make_client(monkeypatch, ids)
+
+    response = client.get("/users/@me/favorites", params={"type": "cafe"})
+
+    assert response.status_code == 200
+    assert response.json() == [str(id) for id in ids]
+
+
+def test_favorites_page_on_request(monkeypatch):
+    ids = [PydanticObjectId() for _ in range(3)]
+    client = make_client(monkeypatch, ids)
+
+    response = client.get(
+        "/users/@me/favorites", params={"type": "cafe", "page": 2, "size": 2}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [str(ids[2])]
+    assert response.json()["total"] == 3
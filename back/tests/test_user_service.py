@@ -0,0 +1,46 @@
+import asyncio
+
+from beanie import PydanticObjectId
+
+from app.user import service
+from app.user.models import User, UserUpdate
+from app.user.service import UserService
+
+
+def test_delete_deactivates_user(monkeypatch):
+    sent = []
+
+    async def update_document(document, update, expected=None):
+        sent.append((update, expected))
+
+    monkeypatch.setattr(service, "update_document", update_document)
+    user = User.model_construct(id=PydanticObjectId(), is_active=True)
+
+    asyncio.run(UserService.delete(user))
+
+    assert sent == [({"$set": {"is_active": False}}, None)]
+    assert user.is_active is False
+
+
+def test_update_many_refreshes_cafe_views(monkeypatch):
+    ids = [PydanticObjectId(), PydanticObjectId()]
+    refreshed = []
+
+    class Query:
+        async def update_many(self, update):
+            return type("Result", (), {"matched_count": len(ids)})()
+
+        async def to_list(self):
+            return []
+
+    async def refresh(*user_ids):
+        refreshed.extend(user_ids)
+
+    monkeypatch.setattr(User, "find_many", classmethod(lambda cls, filters: Query()))
+    monkeypatch.setattr(UserService, "_refresh_cafe_views", staticmethod(refresh))
+
+    asyncio.run(UserService.update_many(ids, UserUpdate()))
+    assert refreshed == []
+
+    asyncio.run(UserService.update_many(ids, UserUpdate(first_name="Alice")))
+    assert refreshed == ids
@@ -104,15 +104,25 @@ export const CafeAPI = {
         return new CafeMenuItem(result);
     },
     /**
-     * Fetches all cafe matching a query.
+     * Fetches all cafe matching a query, or serving a menu item matching it.
      * @param {string} query - The query used to filter the cafe.
      * @param {Function} setLoading - Optional. A function to set loading state.
      * @param {boolean} cancel - Optional. Flag to cancel the request.
-     * @returns {Promise<Cafe[]>} - A promise that resolves with an array of Cafe objects.
+     * @returns {Promise<Cafe[]>} - A promise that resolves with an array of Cafe objects, most relevant first.
      */
     search: async function (query, setLoading = null, cancel = false) {
-        const result = await fetchData(`/search?query=${query}`, setLoading);
-        return result.map(cafeData => new Cafe(cafeData));
+        // Results are ranked cafes and menu items, each with the slug of its cafe
+        const { items: results } = await fetchData(`/search?query=${query}&size=100`, setLoading);
+        const slugs = [...new Set(results.map(result => result.cafe_slug).filter(Boolean))];
+        if (slugs.length === 0) {
+            return [];
+        }
+
+        const { items: cafes } = await fetchData(`/cafes?slug__in=${slugs.join(",")}&size=100`, setLoading);
+        const ranks = new Map(slugs.map((slug, rank) => [slug, rank]));
+        return cafes
+            .sort((a, b) => ranks.get(a.slug) - ranks.get(b.slug))
+            .map(cafeData => new Cafe(cafeData));
     },
 }
 